@@ -0,0 +1,48 @@
+"""
+Environment-driven cache configuration.
+
+CACHE_URL picks the default cache:
+
+    redis://host:6379/0                  (also rediss://, unix:// sockets)
+    memcached://host:11211               (several hosts comma-separated)
+    locmem://                            (the default, per process)
+
+Cache invalidation (generations, site stats, page and fragment caches),
+the view-count buffer in 'cache' mode and the fragment cache metrics all
+live in the default cache, so every web process and Celery worker has to
+share it. A per-process cache is only fine while tasks run eagerly,
+in-process; myapp.checks refuses it otherwise.
+"""
+import os
+from urllib.parse import urlsplit
+
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_config(url=None, environ=os.environ):
+    """A CACHES['default'] entry for ``url`` (or CACHE_URL, or a per-process cache)"""
+    url = url or environ.get('CACHE_URL') or 'locmem://'
+    parts = urlsplit(url)
+    if parts.scheme in ('redis', 'rediss', 'unix'):
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': url,
+        }
+    if parts.scheme == 'memcached':
+        return {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': parts.netloc.split(','),
+        }
+    if parts.scheme == 'locmem':
+        return {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': parts.netloc,
+        }
+    raise ValueError(f'Unsupported CACHE_URL scheme: {parts.scheme!r}')
+
+
+def is_shared(config):
+    return config['BACKEND'] not in PROCESS_LOCAL_BACKENDS
@@ -0,0 +1,18 @@
+"""
+Celery application for the project.
+
+Start a worker with ``celery -A core worker -l info``. Workers and web
+processes must share the cache (CACHE_URL, see core.caches). Without
+a CELERY_BROKER_URL, as in local development and tests, tasks run
+in-process instead (see the Celery block in core.settings).
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+app = Celery('core')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
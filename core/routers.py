@@ -0,0 +1,173 @@
+"""
+Primary/replica database routing.
+
+Every database alias other than ``default`` is treated as a read
+replica. Reads only go to a replica inside a read-only block: a view
+using ReplicaReadMixin (or the replica_reads decorator), or code wrapped
+in ``with replica_reads():``. Everything else, and every write, uses the
+primary.
+
+Replicas lag, so after a write the client is pinned to the primary for
+REPLICA_STICKY_SECONDS: for the rest of the request directly, and for
+following requests through a cookie set by PrimaryStickinessMiddleware,
+so the redirect after posting a comment shows the comment.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+STICKY_COOKIE = 'db_primary_until'
+
+_read_only = ContextVar('db_read_only', default=False)
+_pinned = ContextVar('db_pinned_to_primary', default=False)
+
+
+def replica_aliases():
+    return [alias for alias in connections if alias != DEFAULT_DB_ALIAS]
+
+
+def pin_to_primary():
+    _pinned.set(True)
+
+
+@contextmanager
+def replica_reads():
+    """Let reads inside the block go to a replica"""
+    token = _read_only.set(True)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+@contextmanager
+def primary_only():
+    """Force reads inside the block onto the primary"""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def replica_reads_view(view):
+    """Decorator for function views whose reads may come from a replica"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with replica_reads():
+            response = view(request, *args, **kwargs)
+            _render(response)
+        return response
+    return wrapper
+
+
+def _render(response):
+    # TemplateResponses are rendered after the view returns; render now
+    # so the template's queries happen inside the read-only block.
+    if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+        response.render()
+
+
+class ReplicaReadMixin:
+    """View mixin: the view's reads, including template rendering, may use a replica."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads():
+            response = super().dispatch(request, *args, **kwargs)
+            _render(response)
+        return response
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if not _read_only.get() or _pinned.get():
+            return DEFAULT_DB_ALIAS
+        replicas = replica_aliases()
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Anything read later in this request must see this write.
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class PrimaryStickinessMiddleware:
+    """
+    Pins a client to the primary for REPLICA_STICKY_SECONDS after any
+    request that wrote, or any unsafe-method request. Put it before the
+    views that read from replicas; with no replicas configured it does
+    nothing.
+
+    Under ASGI, sync_to_async copies the views' context changes back, so
+    a write in a sync_to_async'd query still pins the client.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not replica_aliases():
+            return self.get_response(request)
+
+        pinned = self.is_pinned(request)
+        token = _pinned.set(pinned)
+        try:
+            response = self.get_response(request)
+            wrote = _pinned.get() and not pinned
+        finally:
+            _pinned.reset(token)
+        return self.stick(request, response, wrote)
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+
+        pinned = self.is_pinned(request)
+        token = _pinned.set(pinned)
+        try:
+            response = await self.get_response(request)
+            wrote = _pinned.get() and not pinned
+        finally:
+            _pinned.reset(token)
+        return self.stick(request, response, wrote)
+
+    def is_pinned(self, request):
+        try:
+            return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def stick(self, request, response, wrote):
+        """Set the sticky cookie on ``response`` if this request wrote"""
+        if wrote or request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE'):
+            response.set_cookie(
+                STICKY_COOKIE,
+                f'{time.time() + self.sticky_seconds:.0f}',
+                max_age=self.sticky_seconds,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,236 @@
+"""
+File serving for deployments without a front-end web server in charge
+of /static/ and /media/.
+
+static() serves collectstatic's output from STATIC_ROOT. Files whose
+names are in the staticfiles manifest are content-hashed and never
+change, so they go out with ``Cache-Control: public, max-age=31536000,
+immutable`` and repeat visits don't even revalidate them; anything else
+(unhashed originals, admin files referenced by their plain names) gets
+STATIC_MAX_AGE seconds. When the client accepts it, the .br or .gz
+variant written by core.storage is sent instead, with Content-Encoding
+set and no compression work per request. In DEBUG, files that were
+never collected are looked up through the staticfiles finders.
+
+media() serves uploads from MEDIA_ROOT with MEDIA_MAX_AGE caching,
+ETag/Last-Modified revalidation and single byte ranges. The blob store
+under MEDIA_ROOT (core.storage's .cas directory) is never served: a
+blob is only reachable under the names that link to it, so deleting
+an upload really takes it offline. A front-end server serving
+/media/ itself needs the same rule (nginx: ``location /media/.cas/
+{ return 404; }``). With MEDIA_SENDFILE set, the bytes never pass
+through Python: the response only names the file and the front-end
+server sends it (and handles ranges itself):
+
+    'x-accel-redirect'  nginx, with an internal location mapping
+                        MEDIA_ACCEL_PREFIX onto MEDIA_ROOT:
+                            location /protected-media/ {
+                                internal;
+                                alias /srv/blog/media/;
+                            }
+    'x-sendfile'        Apache mod_xsendfile, lighttpd
+
+Otherwise the file goes out as a FileResponse whose file object keeps
+its fileno(), so a WSGI server with sendfile support (gunicorn) copies
+it in the kernel, byte ranges included.
+"""
+import mimetypes
+import os
+import re
+from functools import cache
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.staticfiles import views as staticfiles_views
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+from .storage import BLOB_DIR
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Content-Encoding -> suffix written by core.storage, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+@cache
+def hashed_names():
+    """Every content-hashed name in the staticfiles manifest"""
+    return frozenset(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+
+def file_etag(stat, suffix=''):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{suffix}"'
+
+
+def resolve_file(root, path):
+    """The absolute path of ``path`` under ``root``, or None if it isn't a file there"""
+    try:
+        fullpath = safe_join(root, path) if root else None
+    except SuspiciousFileOperation:
+        return None
+    return fullpath if fullpath and os.path.isfile(fullpath) else None
+
+
+def accepted_encodings(request):
+    accepted = set()
+    for item in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = item.strip().partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def static(request, path):
+    """Serve ``path`` from STATIC_ROOT with long-lived caching and precompressed variants"""
+    fullpath = resolve_file(settings.STATIC_ROOT, path)
+    if fullpath is None:
+        if settings.DEBUG:
+            return staticfiles_views.serve(request, path)
+        raise Http404(path)
+
+    content_type, _ = mimetypes.guess_type(fullpath)
+    variants = [
+        (coding, fullpath + suffix) for coding, suffix in ENCODINGS if os.path.isfile(fullpath + suffix)
+    ]
+    accepted = accepted_encodings(request)
+    encoding, filename = next(
+        ((coding, variant) for coding, variant in variants if coding in accepted), (None, fullpath)
+    )
+
+    stat = os.stat(filename)
+    etag = file_etag(stat, f'-{encoding}' if encoding else '')
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        response = FileResponse(
+            open(filename, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+            filename=os.path.basename(fullpath),
+        )
+        response.headers['Last-Modified'] = http_date(stat.st_mtime)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.headers['ETag'] = etag
+    if variants:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    if path.replace(os.sep, '/') in hashed_names():
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=getattr(settings, 'STATIC_MAX_AGE', 60))
+    return response
+
+
+class FileRange:
+    """
+    At most ``length`` bytes of ``file`` from ``start``. Keeps fileno() so
+    sendfile-capable servers still send it without reading it into Python.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def requested_range(request, stat, etag):
+    """
+    (start, end) of the requested single byte range, end inclusive, or
+    None for the whole file. Raises ValueError when it can't be satisfied.
+    """
+    header = request.headers.get('Range')
+    match = RANGE_RE.match(header.replace(' ', '')) if header else None
+    if match is None or match.groups() == ('', ''):
+        # Absent, malformed or multiple ranges: send everything
+        return None
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range != etag and parse_http_date_safe(if_range) != int(stat.st_mtime):
+        return None
+    size = stat.st_size
+    first, last = match.groups()
+    if first and last and int(last) < int(first):
+        return None
+    if first:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def sendfile_response(fullpath, content_type):
+    """An empty response telling the front-end server which file to send"""
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_SENDFILE == 'x-accel-redirect':
+        prefix = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+        relative = os.path.relpath(fullpath, settings.MEDIA_ROOT).replace(os.sep, '/')
+        response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(relative)
+    else:
+        response.headers['X-Sendfile'] = fullpath
+    return response
+
+
+def file_response(request, fullpath, stat, etag, content_type):
+    """The file, or the requested range of it, streamed by the WSGI server"""
+    try:
+        byte_range = requested_range(request, stat, etag)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response.headers['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    file = open(fullpath, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(FileRange(file, start, end - start + 1), content_type=content_type, status=206)
+        response.headers['Content-Length'] = end - start + 1
+        response.headers['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    response.block_size = STREAM_BLOCK_SIZE
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['Last-Modified'] = http_date(stat.st_mtime)
+    return response
+
+
+def is_blob(fullpath):
+    """Whether ``fullpath`` is inside core.storage's blob directory under MEDIA_ROOT"""
+    relative = os.path.relpath(fullpath, settings.MEDIA_ROOT)
+    return relative.split(os.sep, 1)[0] == BLOB_DIR
+
+
+def media(request, path):
+    """Serve ``path`` from MEDIA_ROOT, through the front-end server when MEDIA_SENDFILE is set"""
+    fullpath = resolve_file(settings.MEDIA_ROOT, path)
+    if fullpath is None or is_blob(fullpath):
+        raise Http404(path)
+
+    stat = os.stat(fullpath)
+    etag = file_etag(stat)
+    content_type = mimetypes.guess_type(fullpath)[0] or 'application/octet-stream'
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        if getattr(settings, 'MEDIA_SENDFILE', ''):
+            response = sendfile_response(fullpath, content_type)
+        else:
+            response = file_response(request, fullpath, stat, etag, content_type)
+    response.headers['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'MEDIA_MAX_AGE', 7 * 24 * 3600))
+    return response
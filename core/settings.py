@@ -2,6 +2,9 @@
 import os
 from pathlib import Path
 
+from .caches import cache_config
+from .db import database_config, replica_configs
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-^$yrt8ytm(wp&ca+(s-c=$38dz0uz+zeyn@m!+0%j$m833(%pl'
@@ -28,6 +31,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'myapp.middleware.QueryInstrumentationMiddleware',
+    'core.routers.PrimaryStickinessMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -35,6 +40,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'myapp.middleware.AnonymousPageCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -57,12 +63,19 @@ TEMPLATES = [
 WSGI_APPLICATION = 'core.wsgi.application'
 
 
+# Set DATABASE_URL for PostgreSQL; see core.db for the pool/pragma options.
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_config(default_sqlite_path=BASE_DIR / 'db.sqlite3'),
+    # Comma-separated DATABASE_REPLICA_URLS add read replicas (see core.routers).
+    **replica_configs(os.environ.get('DATABASE_REPLICA_URLS', '')),
 }
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+# Shared by web processes and Celery workers (see core.caches)
+CACHES = {
+    'default': cache_config(),
+}
+REPLICA_STICKY_SECONDS = 5
 
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -101,9 +114,31 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'static'
 
+# Media stored once per distinct content (gc_media collects the leftovers);
+# static files minified, content-hashed and precompressed by collectstatic
+# and served with immutable caching by core.serving (see core.storage)
+STORAGES = {
+    'default': {
+        'BACKEND': 'core.storage.ContentAddressableStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'core.storage.MinifiedManifestStorage',
+    },
+}
+STATIC_MINIFY_PATTERNS = ('myapp/*.css', 'myapp/*.js')
+STATIC_MAX_AGE = 60  # seconds, for files without a content hash
+
 MEDIA_URL = 'media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Media delivery (see core.serving). MEDIA_SENDFILE hands the bytes to the
+# front-end server: 'x-accel-redirect' (nginx, internal location at
+# MEDIA_ACCEL_PREFIX) or 'x-sendfile' (Apache, lighttpd). Empty streams
+# them from Django with sendfile where the WSGI server supports it.
+MEDIA_SENDFILE = os.environ.get('MEDIA_SENDFILE', '')
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_MAX_AGE = 7 * 24 * 3600  # seconds
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -125,3 +160,82 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For developm
 LOGIN_URL = '/members/login/'
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
+
+# Post view counting (see myapp.counters)
+VIEW_COUNT_BUFFER = 'memory'  # 'memory' (per process) or 'cache' (shared)
+VIEW_COUNT_FLUSH_THRESHOLD = 100
+VIEW_COUNT_FLUSH_INTERVAL = 10  # seconds
+
+# Cached sitewide stats (see myapp.stats)
+SITE_STATS_CACHE_TIMEOUT = 300
+
+# Full-text search (see myapp.search). Leave SEARCH_BACKEND unset to use
+# FTS5 on SQLite and a plain database scan elsewhere.
+# SEARCH_BACKEND = 'myapp.search.SQLiteFTSBackend'
+SEARCH_RESULT_LIMIT = 200
+
+# Template fragment caching (see myapp.templatetags.fragment_cache)
+FRAGMENT_CACHE_TIMEOUT = 600
+
+# Anonymous full-page cache (see myapp.middleware)
+PAGE_CACHE_TIMEOUT = 300
+
+# Batched like/follow writes for the async endpoints (see myapp.write_queue)
+WRITE_QUEUE_INTERVAL = 0.25  # seconds
+WRITE_QUEUE_THRESHOLD = 500
+
+# Precomputed related posts per post (see myapp.related)
+RELATED_POSTS_COUNT = 4
+
+# Trending lists (see myapp.trending)
+TRENDING_UPDATE_INTERVAL = 600  # seconds
+TRENDING_HALF_LIFE_HOURS = 24
+TRENDING_WINDOW_DAYS = 7
+TRENDING_LIST_SIZE = 10
+
+# Follower feeds (see myapp.feed)
+FEED_FANOUT_LIMIT = 5000  # authors with more followers are read on demand
+FEED_FANOUT_BATCH = 1000
+FEED_BACKFILL = 20
+
+# Resized image derivatives (see myapp.images)
+IMAGE_DERIVATIVE_WIDTHS = (160, 320, 640, 1024)
+
+# Background tasks (see core.celery and myapp.tasks), run by workers on
+# CELERY_BROKER_URL, which need a shared CACHE_URL. Without a broker they
+# run in-process right after the commit instead (CELERY_TASK_ALWAYS_EAGER,
+# for development and tests only; failures are then logged, not raised
+# into the request).
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'memory://')
+CELERY_TASK_ALWAYS_EAGER = os.environ.get(
+    'CELERY_TASK_ALWAYS_EAGER', '0' if 'CELERY_BROKER_URL' in os.environ else '1'
+) == '1'
+CELERY_TASK_EAGER_PROPAGATES = False
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TIMEZONE = TIME_ZONE
+# Run ``celery -A core beat`` next to the workers for the periodic tasks.
+CELERY_BEAT_SCHEDULE = {
+    'flush-post-views': {
+        'task': 'myapp.tasks.flush_post_views',
+        'schedule': VIEW_COUNT_FLUSH_INTERVAL,
+    },
+    'update-trending': {
+        'task': 'myapp.tasks.update_trending',
+        'schedule': TRENDING_UPDATE_INTERVAL,
+    },
+}
+
+# Absolute links in outgoing email
+SITE_URL = os.environ.get('SITE_URL', 'http://localhost:8000')
+
+# Newsletter delivery (see myapp.newsletter)
+NEWSLETTER_BATCH_SIZE = 100
+NEWSLETTER_RATE_LIMIT = 10  # messages per second per worker, 0 for no limit
+
+# SQL instrumentation (see myapp.queries and myapp.middleware)
+QUERY_INSTRUMENTATION = True
+QUERY_INSTRUMENTATION_ORIGINS = DEBUG  # trace queries to template lines
+QUERY_N_PLUS_ONE_THRESHOLD = 3
+QUERY_COUNT_WARNING = 50
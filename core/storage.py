@@ -0,0 +1,264 @@
+"""
+Static and media file storage.
+
+MinifiedManifestStorage is the staticfiles backend. collectstatic minifies
+the site's own CSS and JS (STATIC_MINIFY_PATTERNS) as they are written,
+and ManifestStaticFilesStorage copies every file to a content-hashed name
+(myapp/css/site.3f2a91c0b2e4.css) and records the mapping in
+staticfiles.json, which {% static %} reads outside DEBUG. A hashed name
+changes whenever the content does, so core.serving sends those files
+with a year-long immutable Cache-Control. Each hashed text file is also
+written precompressed next to itself (.gz, and .br when the brotli
+package is installed) so nothing is compressed per request.
+
+The minifiers are deliberately conservative: comments and indentation
+go, strings and line breaks stay (no reliance on semicolon insertion).
+
+ContentAddressableStorage is the default (media) storage. Uploads keep
+their usual names and URLs (posts/2025/08/09/Screenshot_9.png), but each
+name is a hard link to a blob named by the SHA-256 of its content,
+.cas/ab/cd/abcd1234..., so every copy of the same bytes, under any
+number of names, takes the space of one. The hash is computed while the
+upload is streamed to disk, one chunk at a time. A blob's reference
+count is its link count minus one; deleting a name only drops a link,
+and the gc_media command removes blobs nothing links to any more (and
+uploads no model refers to). Backups that preserve hard links (rsync
+-H, tar) store each blob once too.
+"""
+import gzip
+import hashlib
+import os
+import re
+import uuid
+from fnmatch import fnmatch
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.json', '.map', '.svg', '.txt', '.xml', '.html')
+COMPRESS_MIN_SIZE = 256  # bytes
+COMPRESSED_EXTENSIONS = ('.br', '.gz')
+BLOB_DIR = '.cas'
+
+CSS_TOKENS_RE = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|/\*.*?\*/)''', re.S)
+CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,])\s*')
+
+
+def minify_css(text):
+    """Drop comments and collapse whitespace, leaving strings untouched"""
+    parts, code = [], []
+
+    def flush():
+        collapsed = CSS_PUNCTUATION_RE.sub(r'\1', re.sub(r'\s+', ' ', ''.join(code)))
+        parts.append(collapsed.replace(';}', '}'))
+        code.clear()
+
+    for index, part in enumerate(CSS_TOKENS_RE.split(text)):
+        if not index % 2:
+            code.append(part)
+        elif not part.startswith('/*'):
+            flush()
+            parts.append(part)
+    flush()
+    return ''.join(parts).strip()
+
+
+def minify_js(text):
+    """
+    Drop indentation, blank lines, whole-line // comments and block
+    comments that start a line, outside template literals. Code after a
+    block comment's closing */ is kept.
+    """
+    lines, in_template, in_comment = [], False, False
+    for line in text.splitlines():
+        if in_template:
+            lines.append(line)
+        else:
+            stripped = line.strip()
+            if not in_comment and stripped.startswith('/*'):
+                in_comment, stripped = True, stripped[2:]
+            if in_comment:
+                end = stripped.find('*/')
+                if end < 0:
+                    continue
+                in_comment, stripped = False, stripped[end + 2:].strip()
+                # What follows may be another comment
+                while stripped.startswith('/*') and '*/' in stripped[2:]:
+                    stripped = stripped[stripped.index('*/', 2) + 2:].strip()
+                if stripped.startswith('/*'):
+                    in_comment = True
+                    continue
+            if not stripped or stripped.startswith('//'):
+                continue
+            lines.append(stripped)
+            line = stripped
+        if len(re.findall(r'(?<!\\)`', line)) % 2:
+            in_template = not in_template
+    return '\n'.join(lines) + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+class MinifiedManifestStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that minifies and precompresses what it collects"""
+
+    def minify_patterns(self):
+        return getattr(settings, 'STATIC_MINIFY_PATTERNS', ('myapp/*.css', 'myapp/*.js'))
+
+    def should_minify(self, name):
+        return (
+            name.endswith(tuple(MINIFIERS)) and '.min.' not in name
+            and any(fnmatch(name, pattern) for pattern in self.minify_patterns())
+        )
+
+    def _save(self, name, content):
+        # Both the plain copy and the hashed one are written through here.
+        if self.should_minify(name):
+            # The manifest pass saves (and hashes) the same file object more than once.
+            content.seek(0)
+            minified = MINIFIERS[name[name.rfind('.'):]](content.read().decode())
+            content = ContentFile(minified.encode())
+        return super()._save(name, content)
+
+    def precompress(self, name):
+        """Write ``name``.gz and ``name``.br, if they save anything"""
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return
+        variants = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', lambda data: brotli.compress(data, mode=brotli.MODE_TEXT)))
+        variants = [(suffix, compress) for suffix, compress in variants if not self.exists(name + suffix)]
+        if not variants:
+            return
+        with self.open(name) as original:
+            data = original.read()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return
+        for suffix, compress in variants:
+            compressed = compress(data)
+            if len(compressed) < len(data) * 0.9:
+                self._save(name + suffix, ContentFile(compressed))
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if not dry_run:
+            # Hashed names are content addresses: an existing variant is current.
+            for hashed_name in set(self.hashed_files.values()):
+                self.precompress(hashed_name)
+
+
+class ContentAddressableStorage(FileSystemStorage):
+    """FileSystemStorage that stores each distinct content once, as hard-linked blobs"""
+
+    def blob_path(self, digest):
+        return os.path.join(self.location, BLOB_DIR, digest[:2], digest[2:4], digest)
+
+    def _makedirs(self, directory):
+        if self.directory_permissions_mode is not None:
+            # os.makedirs() doesn't apply the mode to intermediate directories
+            old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+            try:
+                os.makedirs(directory, self.directory_permissions_mode, exist_ok=True)
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+    def _write_temporary(self, content):
+        """Stream ``content`` to a temporary file next to the blobs, returns (path, sha256 hex digest)"""
+        directory = os.path.join(self.location, BLOB_DIR, 'tmp')
+        self._makedirs(directory)
+        path = os.path.join(directory, uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        with open(path, 'xb') as temporary:
+            for chunk in content.chunks():
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                digest.update(chunk)
+                temporary.write(chunk)
+        if self.file_permissions_mode is not None:
+            os.chmod(path, self.file_permissions_mode)
+        return path, digest.hexdigest()
+
+    def _link_blob(self, path, digest):
+        """Make ``path``'s content the blob for ``digest`` unless there already is one"""
+        blob = self.blob_path(digest)
+        self._makedirs(os.path.dirname(blob))
+        try:
+            os.link(path, blob)
+        except FileExistsError:
+            pass
+        return blob
+
+    def _save(self, name, content):
+        temporary, digest = self._write_temporary(content)
+        try:
+            full_path = self.path(name)
+            self._makedirs(os.path.dirname(full_path))
+            while True:
+                blob = self._link_blob(temporary, digest)
+                try:
+                    os.link(blob, full_path)
+                except FileNotFoundError:
+                    # gc_media removed the blob in between: link it again
+                    continue
+                except FileExistsError:
+                    # Another upload took the name since get_available_name()
+                    name = self.get_available_name(name)
+                    full_path = self.path(name)
+                    continue
+                break
+        finally:
+            os.remove(temporary)
+        return str(name).replace('\\', '/')
+
+    def adopt(self, name):
+        """
+        Turn a file saved outside this storage into a link to its blob,
+        returns True if it now shares a blob it didn't have before.
+        """
+        full_path = self.path(name)
+        if os.stat(full_path).st_nlink > 1:
+            return False
+        with self.open(name) as content:
+            temporary, digest = self._write_temporary(content)
+        try:
+            blob = self._link_blob(temporary, digest)
+            shared = not os.path.samefile(blob, temporary)
+            replacement = f'{full_path}.{uuid.uuid4().hex}.tmp'
+            os.link(blob, replacement)
+            os.replace(replacement, full_path)
+        finally:
+            os.remove(temporary)
+        return shared
+
+    def blobs(self):
+        """(path, reference count) of every blob"""
+        root = os.path.join(self.location, BLOB_DIR)
+        for directory, subdirectories, files in os.walk(root):
+            if directory == root:
+                subdirectories[:] = [name for name in subdirectories if name != 'tmp']
+                continue
+            for filename in files:
+                path = os.path.join(directory, filename)
+                yield path, os.stat(path).st_nlink - 1
+
+    def names(self):
+        """Every stored name outside the blob directory"""
+        for directory, subdirectories, files in os.walk(self.location):
+            if directory == self.location:
+                subdirectories[:] = [name for name in subdirectories if name != BLOB_DIR]
+            relative = os.path.relpath(directory, self.location)
+            for filename in files:
+                name = filename if relative == '.' else os.path.join(relative, filename)
+                yield name.replace(os.sep, '/')
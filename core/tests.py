@@ -0,0 +1,204 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from myapp.models import Post
+
+from . import serving
+from .storage import BLOB_DIR, ContentAddressableStorage, minify_css, minify_js
+
+
+class MinifyJSTests(SimpleTestCase):
+
+    def test_drops_indentation_blank_lines_and_comments(self):
+        source = '// header\n\nfunction f() {\n    // note\n    return 1;\n}\n'
+        self.assertEqual(minify_js(source), 'function f() {\nreturn 1;\n}\n')
+
+    def test_keeps_code_after_a_block_comment(self):
+        self.assertEqual(minify_js('/* a */ var x = 1;\n'), 'var x = 1;\n')
+        self.assertEqual(minify_js('/*\n * a\n */ var x = 1;\n'), 'var x = 1;\n')
+
+    def test_consecutive_block_comments(self):
+        self.assertEqual(minify_js('/* a */ /* b */ var x = 1;\n'), 'var x = 1;\n')
+        self.assertEqual(minify_js('/* a */ /* b\n c */ var x = 1;\n'), 'var x = 1;\n')
+
+    def test_comment_markers_inside_code_are_kept(self):
+        source = 'var url = "http://example.com"; /* trailing */\n'
+        self.assertEqual(minify_js(source), source)
+
+    def test_template_literals_are_left_alone(self):
+        source = 'var html = `\n    // not a comment\n    /* nor this */\n`;\n'
+        self.assertEqual(minify_js(source), 'var html = `\n    // not a comment\n    /* nor this */\n`;\n')
+
+
+class MinifyCSSTests(SimpleTestCase):
+
+    def test_drops_comments_and_whitespace(self):
+        source = '/* header */\n.a {\n    color: red;\n    margin: 0 auto;\n}\n'
+        # Space after ':' is kept, it is significant in selectors (a :hover)
+        self.assertEqual(minify_css(source), '.a{color: red;margin: 0 auto}')
+
+    def test_strings_are_untouched(self):
+        source = '.a::before { content: "/* { ; } */"; }'
+        self.assertEqual(minify_css(source), '.a::before{content: "/* { ; } */"}')
+
+
+class MediaTestCase(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_SENDFILE='')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = ContentAddressableStorage()
+
+
+class ContentAddressableStorageTests(MediaTestCase):
+
+    def test_same_content_shares_one_blob(self):
+        first = self.storage.save('posts/a.txt', ContentFile(b'same bytes'))
+        second = self.storage.save('posts/b.txt', ContentFile(b'same bytes'))
+        self.storage.save('posts/c.txt', ContentFile(b'other bytes'))
+        self.assertTrue(os.path.samefile(self.storage.path(first), self.storage.path(second)))
+        self.assertEqual(sorted(references for _, references in self.storage.blobs()), [1, 2])
+        self.assertEqual(sorted(self.storage.names()), ['posts/a.txt', 'posts/b.txt', 'posts/c.txt'])
+
+    def test_taken_names_get_a_new_one(self):
+        first = self.storage.save('posts/a.txt', ContentFile(b'one'))
+        second = self.storage.save('posts/a.txt', ContentFile(b'two'))
+        self.assertNotEqual(first, second)
+        with self.storage.open(first) as stored:
+            self.assertEqual(stored.read(), b'one')
+
+    def test_delete_only_drops_a_link(self):
+        first = self.storage.save('posts/a.txt', ContentFile(b'same bytes'))
+        self.storage.save('posts/b.txt', ContentFile(b'same bytes'))
+        self.storage.delete(first)
+        self.assertEqual([references for _, references in self.storage.blobs()], [1])
+
+    def test_adopt_links_existing_files(self):
+        self.storage.save('posts/a.txt', ContentFile(b'same bytes'))
+        os.makedirs(os.path.join(self.media_root, 'uploads'))
+        with open(os.path.join(self.media_root, 'uploads', 'copy.txt'), 'wb') as copy:
+            copy.write(b'same bytes')
+        self.assertTrue(self.storage.adopt('uploads/copy.txt'))
+        self.assertFalse(self.storage.adopt('uploads/copy.txt'))
+        self.assertEqual([references for _, references in self.storage.blobs()], [2])
+
+
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'core.storage.ContentAddressableStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class GCMediaTests(MediaTestCase):
+
+    def age(self, name, hours):
+        then = time.time() - hours * 3600
+        os.utime(self.storage.path(name), (then, then))
+
+    def test_removes_old_unreferenced_uploads_and_unused_blobs(self):
+        author = get_user_model().objects.create_user('author', 'author@example.com', 'password')
+        kept = self.storage.save('posts/kept.png', ContentFile(b'kept'))
+        Post.objects.create(title='Kept', slug='kept', author=author, content='x', featured_image=kept)
+        orphan = self.storage.save('posts/orphan.png', ContentFile(b'orphan'))
+        recent = self.storage.save('posts/recent.png', ContentFile(b'recent'))
+        editor_upload = self.storage.save('uploads/editor.png', ContentFile(b'editor'))
+        for name in (kept, orphan, editor_upload):
+            self.age(name, 48)
+
+        call_command('gc_media', '--dry-run', stdout=io.StringIO())
+        self.assertTrue(self.storage.exists(orphan))
+
+        call_command('gc_media', stdout=io.StringIO())
+        self.assertFalse(self.storage.exists(orphan))
+        for name in (kept, recent, editor_upload):
+            self.assertTrue(self.storage.exists(name))
+        self.assertEqual(sorted(references for _, references in self.storage.blobs()), [1, 1, 1])
+
+
+class MediaServingTests(MediaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.name = self.storage.save('posts/file.txt', ContentFile(b'0123456789'))
+
+    def get(self, path=None, **headers):
+        request = RequestFactory().get('/media/' + (path or self.name), headers=headers)
+        return serving.media(request, path or self.name)
+
+    def content(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_whole_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.content(response), b'0123456789')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('ETag', response)
+
+    def test_byte_ranges(self):
+        for header, status, body, content_range in [
+            ('bytes=2-5', 206, b'2345', 'bytes 2-5/10'),
+            ('bytes=7-', 206, b'789', 'bytes 7-9/10'),
+            ('bytes=-3', 206, b'789', 'bytes 7-9/10'),
+            ('bytes=8-100', 206, b'89', 'bytes 8-9/10'),
+        ]:
+            with self.subTest(header):
+                response = self.get(Range=header)
+                self.assertEqual(response.status_code, status)
+                self.assertEqual(self.content(response), body)
+                self.assertEqual(response['Content-Range'], content_range)
+                self.assertEqual(int(response['Content-Length']), len(body))
+
+    def test_unsatisfiable_range(self):
+        response = self.get(Range='bytes=10-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    def test_malformed_or_multiple_ranges_send_everything(self):
+        for header in ('bytes=5-2', 'bytes=0-1,4-5', 'lines=1-2', 'bytes=-'):
+            with self.subTest(header):
+                response = self.get(Range=header)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(self.content(response), b'0123456789')
+
+    def test_if_range(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(Range='bytes=0-1', **{'If-Range': etag}).status_code, 206)
+        self.assertEqual(self.get(Range='bytes=0-1', **{'If-Range': '"stale"'}).status_code, 200)
+
+    def test_revalidation(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(**{'If-None-Match': etag}).status_code, 304)
+
+    def test_missing_and_outside_files(self):
+        for path in ('posts/missing.txt', '../settings.py', 'posts/'):
+            with self.subTest(path), self.assertRaises(Http404):
+                self.get(path)
+
+    def test_blobs_are_not_served(self):
+        blob, _ = next(self.storage.blobs())
+        relative = os.path.relpath(blob, self.media_root)
+        self.assertTrue(relative.startswith(BLOB_DIR))
+        for path in (relative, f'posts/../{relative}', f'./{relative}'):
+            with self.subTest(path), self.assertRaises(Http404):
+                self.get(path)
+
+    @override_settings(MEDIA_SENDFILE='x-accel-redirect', MEDIA_ACCEL_PREFIX='/protected-media/')
+    def test_x_accel_redirect(self):
+        response = self.get()
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + self.name)
+        self.assertEqual(response.content, b'')
+
+    @override_settings(MEDIA_SENDFILE='x-sendfile')
+    def test_x_sendfile(self):
+        self.assertEqual(self.get()['X-Sendfile'], self.storage.path(self.name))
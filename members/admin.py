@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, UserFollowing
+from .models import AuthorStats, CustomUser, UserFollowing
 
 @admin.register(CustomUser)
 class CustomUserAdmin(UserAdmin):
@@ -20,4 +20,14 @@ class UserFollowingAdmin(admin.ModelAdmin):
     list_display = ('user', 'following_user', 'created_at')
     list_filter = ('created_at',)
     search_fields = ('user__username', 'following_user__username')
-    ordering = ('-created_at',)
\ No newline at end of file
+    ordering = ('-created_at',)
+
+@admin.register(AuthorStats)
+class AuthorStatsAdmin(admin.ModelAdmin):
+    list_display = ('user', 'post_count', 'total_views', 'total_likes', 'total_comments', 'follower_count', 'updated_at')
+    search_fields = ('user__username',)
+    ordering = ('-total_views',)
+    readonly_fields = (
+        'user', 'post_count', 'category_count', 'total_views', 'total_likes', 'total_comments',
+        'follower_count', 'following_count', 'updated_at',
+    )
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.4 on 2026-10-17 04:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0001_initial'),
+        ('myapp', '0012_timelineentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='author_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('post_count', models.PositiveIntegerField(default=0)),
+                ('category_count', models.PositiveIntegerField(default=0)),
+                ('total_views', models.PositiveBigIntegerField(default=0)),
+                ('total_likes', models.PositiveIntegerField(default=0)),
+                ('total_comments', models.PositiveIntegerField(default=0)),
+                ('follower_count', models.PositiveIntegerField(default=0)),
+                ('following_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Author stats',
+                'indexes': [models.Index(fields=['-total_views'], name='members_aut_total_v_c62c4c_idx'), models.Index(fields=['-total_likes'], name='members_aut_total_l_cec7a6_idx'), models.Index(fields=['-post_count'], name='members_aut_post_co_f5a569_idx'), models.Index(fields=['-follower_count'], name='members_aut_followe_43a6cf_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AuthorCategoryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_count', models.PositiveIntegerField(default=0)),
+                ('views', models.PositiveBigIntegerField(default=0)),
+                ('likes', models.PositiveIntegerField(default=0)),
+                ('comments', models.PositiveIntegerField(default=0)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_stats', to=settings.AUTH_USER_MODEL)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='myapp.category')),
+            ],
+            options={
+                'verbose_name_plural': 'Author category stats',
+                'ordering': ['-views'],
+                'unique_together': {('author', 'category')},
+            },
+        ),
+    ]
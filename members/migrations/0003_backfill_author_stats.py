@@ -0,0 +1,55 @@
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+def backfill_author_stats(apps, schema_editor):
+    AuthorStats = apps.get_model('members', 'AuthorStats')
+    AuthorCategoryStats = apps.get_model('members', 'AuthorCategoryStats')
+    CustomUser = apps.get_model('members', 'CustomUser')
+    UserFollowing = apps.get_model('members', 'UserFollowing')
+    Post = apps.get_model('myapp', 'Post')
+
+    rows = {user_id: AuthorStats(user_id=user_id) for user_id in CustomUser.objects.values_list('pk', flat=True)}
+    categories = []
+    per_category = (
+        Post.objects.filter(status='published')
+        .values('author_id', 'category_id')
+        .annotate(posts=Count('id'), views=Sum('views'), likes=Sum('like_count'), comments=Sum('comment_count'))
+        .order_by()
+    )
+    for group in per_category:
+        stats = rows[group['author_id']]
+        stats.post_count += group['posts']
+        stats.total_views += group['views'] or 0
+        stats.total_likes += group['likes'] or 0
+        stats.total_comments += group['comments'] or 0
+        if group['category_id']:
+            stats.category_count += 1
+            categories.append(AuthorCategoryStats(
+                author_id=group['author_id'], category_id=group['category_id'], post_count=group['posts'],
+                views=group['views'] or 0, likes=group['likes'] or 0, comments=group['comments'] or 0,
+            ))
+    follows = defaultdict(lambda: [0, 0])
+    for follower_id, followed_id in UserFollowing.objects.values_list('user_id', 'following_user_id').iterator():
+        follows[follower_id][1] += 1
+        follows[followed_id][0] += 1
+    for user_id, (followers, following) in follows.items():
+        rows[user_id].follower_count, rows[user_id].following_count = followers, following
+
+    AuthorStats.objects.all().delete()
+    AuthorCategoryStats.objects.all().delete()
+    AuthorStats.objects.bulk_create(rows.values(), batch_size=500)
+    AuthorCategoryStats.objects.bulk_create(categories, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0002_authorstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_author_stats, migrations.RunPython.noop),
+    ]
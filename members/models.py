@@ -1,8 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.urls import reverse
-from PIL import Image
-import os
 
 class CustomUser(AbstractUser):
     email = models.EmailField(unique=True)
@@ -36,4 +34,74 @@ class UserFollowing(models.Model):
         unique_together = ('user', 'following_user')
         
     def __str__(self):
-        return f'{self.user} follows {self.following_user}'
\ No newline at end of file
+        return f'{self.user} follows {self.following_user}'
+
+class AuthorStats(models.Model):
+    """Totals over an author's published posts and follows, kept current by members.stats"""
+    user = models.OneToOneField(
+        CustomUser,
+        primary_key=True,
+        related_name='author_stats',
+        on_delete=models.CASCADE
+    )
+    post_count = models.PositiveIntegerField(default=0)
+    category_count = models.PositiveIntegerField(default=0)
+    total_views = models.PositiveBigIntegerField(default=0)
+    total_likes = models.PositiveIntegerField(default=0)
+    total_comments = models.PositiveIntegerField(default=0)
+    follower_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'Author stats'
+        indexes = [
+            models.Index(fields=['-total_views']),
+            models.Index(fields=['-total_likes']),
+            models.Index(fields=['-post_count']),
+            models.Index(fields=['-follower_count']),
+        ]
+    
+    def __str__(self):
+        return f'Stats for {self.user}'
+    
+    def _per_post(self, total):
+        return total / self.post_count if self.post_count else 0
+    
+    @property
+    def average_views(self):
+        return self._per_post(self.total_views)
+    
+    @property
+    def average_likes(self):
+        return self._per_post(self.total_likes)
+    
+    @property
+    def average_comments(self):
+        return self._per_post(self.total_comments)
+
+class AuthorCategoryStats(models.Model):
+    """An author's published posts in one category, kept current by members.stats"""
+    author = models.ForeignKey(
+        CustomUser,
+        related_name='category_stats',
+        on_delete=models.CASCADE
+    )
+    category = models.ForeignKey(
+        'myapp.Category',
+        related_name='+',
+        on_delete=models.CASCADE
+    )
+    post_count = models.PositiveIntegerField(default=0)
+    views = models.PositiveBigIntegerField(default=0)
+    likes = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ('author', 'category')
+        ordering = ['-views']
+        verbose_name_plural = 'Author category stats'
+    
+    def __str__(self):
+        return f'{self.author} in {self.category}'
+
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from myapp import tasks
+from myapp.images import image_changed, remember_images
+
+from .models import CustomUser, UserFollowing
+from .stats import add_follows
+
+
+@receiver(post_init, sender=CustomUser, dispatch_uid='members.remember_profile_picture')
+def remember_profile_picture(sender, instance, **kwargs):
+    remember_images(instance, 'profile_picture')
+
+
+@receiver(post_save, sender=CustomUser, dispatch_uid='members.profile_picture_derivatives')
+def profile_picture_saved(sender, instance, raw=False, **kwargs):
+    if raw or not image_changed(instance, 'profile_picture'):
+        return
+    if instance.profile_picture:
+        tasks.generate_image_derivatives.delay_on_commit(instance.profile_picture.name)
+    remember_images(instance, 'profile_picture')
+
+
+@receiver(post_save, sender=UserFollowing, dispatch_uid='members.follow_feed_saved')
+def follow_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        add_follows([(instance.user_id, instance.following_user_id)])
+        tasks.backfill_timelines.delay_on_commit([(instance.user_id, instance.following_user_id)])
+
+
+@receiver(post_delete, sender=UserFollowing, dispatch_uid='members.follow_feed_deleted')
+def follow_deleted(sender, instance, **kwargs):
+    add_follows([(instance.user_id, instance.following_user_id)], -1)
+    tasks.remove_from_timeline.delay_on_commit(instance.user_id, instance.following_user_id)
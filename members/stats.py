@@ -0,0 +1,188 @@
+"""
+Materialized author statistics.
+
+AuthorStats holds one row of totals per author (published posts,
+categories, views, likes, comments, followers, following) and
+AuthorCategoryStats the same per category, so a profile page reads one
+row joined to the user and top-author leaderboards are an index scan.
+
+High-frequency events are applied as ``F() + n`` increments: views when
+the view buffer is flushed, likes and unlikes with the post's like
+count, comments as they are approved, hidden or deleted, follows and
+unfollows as they happen. Rarer changes that can move a post between
+authors, categories or statuses (saves, deletes, imports) recompute the
+affected authors' rows from their posts with refresh_authors(), which
+also repairs any drift. Every increment is applied after the post or
+follow it counts was written, so an author without a row yet (a new
+user, a first post in a category) is recomputed instead: an empty row
+plus the increment would lose everything before it. Migration
+members.0003 fills in the rows of existing sites.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from myapp.models import Post
+
+from .models import AuthorCategoryStats, AuthorStats, CustomUser, UserFollowing
+
+# Post activity field -> (AuthorStats field, AuthorCategoryStats field)
+ACTIVITY_FIELDS = {
+    'views': ('total_views', 'views'),
+    'likes': ('total_likes', 'likes'),
+    'comments': ('total_comments', 'comments'),
+}
+
+
+def get_author_stats(user):
+    """The user's AuthorStats, or an unsaved all-zero one for authors without a row"""
+    try:
+        return user.author_stats
+    except AuthorStats.DoesNotExist:
+        return AuthorStats(user=user)
+
+
+def follower_count(user_id):
+    """The user's follower count, 0 before their first follower"""
+    return AuthorStats.objects.filter(user_id=user_id).values_list('follower_count', flat=True).first() or 0
+
+
+async def afollower_count(user_id):
+    return await AuthorStats.objects.filter(user_id=user_id).values_list('follower_count', flat=True).afirst() or 0
+
+
+def _increment(queryset, field, n):
+    if n < 0:
+        # Never below zero, like counters.adjust_like_count
+        queryset = queryset.filter(**{f'{field}__gte': -n})
+    queryset.update(**{field: F(field) + n})
+
+
+def _without_stats(user_ids):
+    """The ids among ``user_ids`` that have no AuthorStats row yet"""
+    return set(user_ids) - set(AuthorStats.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+
+
+def add_activity(counts, field):
+    """Add ``{post_id: n}`` views, likes or comments (n may be negative) to the posts' authors"""
+    counts = {post_id: n for post_id, n in counts.items() if n}
+    if not counts:
+        return
+    total_field, category_field = ACTIVITY_FIELDS[field]
+    by_author, by_category = defaultdict(int), defaultdict(int)
+    posts = Post.objects.filter(pk__in=counts, status='published').values_list('pk', 'author_id', 'category_id')
+    for post_id, author_id, category_id in posts:
+        by_author[author_id] += counts[post_id]
+        if category_id:
+            by_category[author_id, category_id] += counts[post_id]
+    if not by_author:
+        return
+
+    with transaction.atomic():
+        existing = set(AuthorCategoryStats.objects.filter(
+            author_id__in={author_id for author_id, _ in by_category},
+            category_id__in={category_id for _, category_id in by_category},
+        ).values_list('author_id', 'category_id'))
+        missing = _without_stats(by_author) | {key[0] for key in by_category if key not in existing}
+        refresh_authors(missing)
+        for author_id, n in by_author.items():
+            if author_id not in missing:
+                _increment(AuthorStats.objects.filter(user_id=author_id), total_field, n)
+        for (author_id, category_id), n in by_category.items():
+            if author_id not in missing:
+                _increment(
+                    AuthorCategoryStats.objects.filter(author_id=author_id, category_id=category_id),
+                    category_field, n,
+                )
+
+
+def add_follows(pairs, n=1):
+    """Count (follower id, followed id) pairs as new follows, or with n=-1 as removed ones"""
+    following, followers = defaultdict(int), defaultdict(int)
+    for follower_id, followed_id in pairs:
+        following[follower_id] += n
+        followers[followed_id] += n
+    if not following:
+        return
+    with transaction.atomic():
+        missing = _without_stats(set(following) | set(followers))
+        refresh_authors(missing)
+        for user_id, delta in following.items():
+            if user_id not in missing:
+                _increment(AuthorStats.objects.filter(user_id=user_id), 'following_count', delta)
+        for user_id, delta in followers.items():
+            if user_id not in missing:
+                _increment(AuthorStats.objects.filter(user_id=user_id), 'follower_count', delta)
+
+
+def refresh_authors(author_ids):
+    """Recompute the rows of the given authors from their posts and follows"""
+    author_ids = set(filter(None, author_ids))
+    if not author_ids:
+        return 0
+    per_category = (
+        Post.objects.filter(author_id__in=author_ids, status='published')
+        .values('author_id', 'category_id')
+        .annotate(
+            posts=Count('id'), views=Sum('views'), likes=Sum('like_count'), comments=Sum('comment_count'),
+        )
+        .order_by()
+    )
+    rows = {author_id: AuthorStats(user_id=author_id) for author_id in author_ids}
+    categories = []
+    for group in per_category:
+        stats = rows[group['author_id']]
+        stats.post_count += group['posts']
+        stats.total_views += group['views'] or 0
+        stats.total_likes += group['likes'] or 0
+        stats.total_comments += group['comments'] or 0
+        if group['category_id']:
+            stats.category_count += 1
+            categories.append(AuthorCategoryStats(
+                author_id=group['author_id'], category_id=group['category_id'], post_count=group['posts'],
+                views=group['views'] or 0, likes=group['likes'] or 0, comments=group['comments'] or 0,
+            ))
+    for field, counts in (
+        ('follower_count', UserFollowing.objects.filter(following_user_id__in=author_ids)
+            .values_list('following_user_id').annotate(n=Count('id')).order_by()),
+        ('following_count', UserFollowing.objects.filter(user_id__in=author_ids)
+            .values_list('user_id').annotate(n=Count('id')).order_by()),
+    ):
+        for user_id, n in counts:
+            setattr(rows[user_id], field, n)
+
+    with transaction.atomic():
+        AuthorStats.objects.bulk_create(
+            rows.values(),
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=[
+                'post_count', 'category_count', 'total_views', 'total_likes', 'total_comments',
+                'follower_count', 'following_count', 'updated_at',
+            ],
+        )
+        AuthorCategoryStats.objects.filter(author_id__in=author_ids).delete()
+        AuthorCategoryStats.objects.bulk_create(categories)
+    return len(rows)
+
+
+def rebuild(batch_size=500):
+    """Recompute every author's row, returns the number of authors"""
+    user_ids = CustomUser.objects.order_by('pk').values_list('pk', flat=True)
+    total, batch = 0, []
+    for user_id in user_ids.iterator(chunk_size=batch_size):
+        batch.append(user_id)
+        if len(batch) >= batch_size:
+            total += refresh_authors(batch)
+            batch = []
+    return total + refresh_authors(batch)
+
+
+def leaderboard(order_by='-total_views', limit=10):
+    """Top authors by one AuthorStats column, users joined in"""
+    return (
+        AuthorStats.objects.filter(post_count__gt=0)
+        .select_related('user')
+        .order_by(order_by, 'pk')[:limit]
+    )
@@ -12,6 +12,8 @@ urlpatterns = [
     path('profile/<str:username>/', views.ProfileView.as_view(), name='profile'),
     path('edit-profile/', views.ProfileUpdateView.as_view(), name='edit_profile'),
     path('followers/<str:username>/', views.FollowersListView.as_view(), name='followers'),
+    path('authors/', views.LeaderboardView.as_view(), name='leaderboard'),
 
     path('follow/', views.follow_unfollow_user, name='follow_unfollow'),
+    path('follow/async/', views.follow_unfollow_user_async, name='follow_unfollow_async'),
 ]
\ No newline at end of file
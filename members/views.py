@@ -1,4 +1,5 @@
-from django.shortcuts import redirect, get_object_or_404
+from django.shortcuts import redirect, get_object_or_404, aget_object_or_404
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.mixins import UserPassesTestMixin
@@ -10,8 +11,11 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from .models import CustomUser, UserFollowing
 from .forms import UserRegistrationForm, ProfileUpdateForm
-from myapp.models import Post, Category, Newsletter
-from django.db.models import Sum
+from .stats import add_follows, afollower_count, follower_count, get_author_stats, leaderboard
+from myapp import tasks
+from myapp.pagination import CursorPaginationMixin
+from myapp.stats import get_site_stats
+from myapp.write_queue import ToggleQueue
 
 class SignUpView(UserPassesTestMixin, CreateView):
     model = CustomUser
@@ -40,22 +44,45 @@ class ProfileView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
     def test_func(self):
         return self.request.user.is_superuser or self.request.user.is_staff
 
+    def get_queryset(self):
+        return CustomUser.objects.select_related('author_stats')
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.get_object() 
-
-        user_posts = Post.objects.filter(author=user, status='published')
-        context['total_posts'] = user_posts.count()
-        context['total_categories'] = Category.objects.filter(post__author=user).distinct().count()
-        context['total_views'] = user_posts.aggregate(Sum('views'))['views__sum'] or 0
-        context['total_subscribers'] = Newsletter.objects.filter(is_active=True).count()
-        context['average_views'] = (
-            context['total_views'] / context['total_posts']
-            if context['total_posts'] > 0 else 0
-        )
+        stats = get_author_stats(self.object)
+
+        context['author_stats'] = stats
+        context['total_posts'] = stats.post_count
+        context['total_categories'] = stats.category_count
+        context['total_views'] = stats.total_views
+        context['total_subscribers'] = get_site_stats()['total_subscribers']
+        context['average_views'] = stats.average_views
+        context['category_stats'] = self.object.category_stats.select_related('category')[:5]
 
         return context
 
+class LeaderboardView(ListView):
+    """Top authors by one of their materialized totals"""
+    template_name = 'members/leaderboard.html'
+    context_object_name = 'leaders'
+    orderings = {
+        'views': '-total_views',
+        'likes': '-total_likes',
+        'posts': '-post_count',
+        'followers': '-follower_count',
+    }
+
+    def get_queryset(self):
+        self.sort = self.request.GET.get('sort', 'views')
+        if self.sort not in self.orderings:
+            self.sort = 'views'
+        return leaderboard(self.orderings[self.sort], limit=25)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['sort'] = self.sort
+        return context
+
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     model = CustomUser
     form_class = ProfileUpdateForm
@@ -74,15 +101,22 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     def get_success_url(self):
         return reverse_lazy("members:profile", kwargs={"username": self.object.username})
     
-class FollowersListView(LoginRequiredMixin, ListView):
+class FollowersListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     template_name = 'members/followers.html'
     context_object_name = 'followers'
     paginate_by = 20
+    cursor_ordering = '-created_at'
     
     def get_queryset(self):
         username = self.kwargs['username']
-        user = get_object_or_404(CustomUser, username=username)
-        return user.followers.select_related('user').order_by('-created_at')
+        self.user = get_object_or_404(CustomUser.objects.select_related('author_stats'), username=username)
+        return self.user.followers.select_related('user__author_stats').order_by('-created_at')
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['followers_count'] = get_author_stats(self.user).follower_count
+        context['following_count'] = get_author_stats(self.request.user).following_count
+        return context
 
 @login_required
 @require_POST
@@ -109,5 +143,52 @@ def follow_unfollow_user(request):
     return JsonResponse({
         'is_following': is_following,
         'action': action,
-        'followers_count': user_to_follow.followers.count()
+        'followers_count': follower_count(user_to_follow.pk)
+    })
+
+
+def _follows_flushed(created, deleted):
+    # The queue writes without UserFollowing's signals, so both sides are
+    # counted and get their feed changes here.
+    if created:
+        add_follows(created)
+        tasks.backfill_timelines.delay_on_commit(created)
+    if deleted:
+        add_follows(deleted, -1)
+        tasks.remove_from_timelines.delay_on_commit(deleted)
+
+follow_queue = ToggleQueue(
+    UserFollowing, 'user', 'following_user',
+    on_flush=_follows_flushed,
+    interval=settings.WRITE_QUEUE_INTERVAL,
+    threshold=settings.WRITE_QUEUE_THRESHOLD,
+)
+
+@login_required
+@require_POST
+async def follow_unfollow_user_async(request):
+    """Async follow_unfollow_user: toggles go through follow_queue"""
+    user_id = request.POST.get('user_id')
+    user_to_follow = await aget_object_or_404(CustomUser, id=user_id)
+    user = await request.auser()
+    
+    if user_to_follow == user:
+        return JsonResponse({'error': 'Cannot follow yourself'}, status=400)
+    
+    exists = follow_queue.state(user.pk, user_to_follow.pk)
+    if exists is None:
+        exists = await UserFollowing.objects.filter(
+            user=user,
+            following_user=user_to_follow
+        ).aexists()
+    is_following = follow_queue.toggle(user.pk, user_to_follow.pk, exists)
+    
+    followers_count = await afollower_count(user_to_follow.pk)
+    
+    return JsonResponse({
+        'is_following': is_following,
+        'action': 'followed' if is_following else 'unfollowed',
+        'followers_count': followers_count + follow_queue.pending_delta(user_to_follow.pk),
+        # Written by the queue's next flush
+        'queued': True,
     })
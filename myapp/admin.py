@@ -2,7 +2,8 @@
 
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Category, Post, Comment, Like, Newsletter
+from . import generations
+from .models import Category, Post, Comment, Like, Newsletter, NewsletterIssue, PostImport, Tag
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
@@ -10,6 +11,7 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('status', 'is_featured', 'category', 'created_at')
     search_fields = ('title', 'content')
     prepopulated_fields = {'slug': ('title',)}
+    readonly_fields = ('like_count', 'comment_count')
     list_editable = ('status', 'is_featured')
     date_hierarchy = 'created_at'
     ordering = ('-created_at',)
@@ -25,19 +27,28 @@ class PostAdmin(admin.ModelAdmin):
         )
     featured_badge.short_description = 'Featured Status'
     
+    def _expire_featured(self, queryset):
+        # update() skips the post_save handlers that expire cached pages.
+        slugs = queryset.values_list('slug', flat=True)
+        generations.bump_generation(generations.POSTS, *map(generations.post_generation, slugs))
+
     def make_featured(self, request, queryset):
         count = queryset.update(is_featured=True)
+        self._expire_featured(queryset)
         self.message_user(request, f'{count} posts marked as featured.')
     make_featured.short_description = "Mark selected posts as featured"
     
     def make_not_featured(self, request, queryset):
         count = queryset.update(is_featured=False)
+        self._expire_featured(queryset)
         self.message_user(request, f'{count} posts removed from featured.')
     make_not_featured.short_description = "Remove featured status from selected posts"
     
     def reset_featured_posts(self, request, queryset):
 
-        Post.objects.all().update(is_featured=False)
+        featured = Post.objects.filter(is_featured=True)
+        self._expire_featured(featured)
+        featured.update(is_featured=False)
         top_posts = Post.objects.filter(status='published').order_by('-views')[:3]
         for post in top_posts:
             post.is_featured = True
@@ -55,6 +66,13 @@ class CategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
     search_fields = ('name',)
 
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'post_count')
+    search_fields = ('name',)
+    readonly_fields = ('post_count',)
+    ordering = ('-post_count',)
+
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
     list_display = ('author', 'post', 'is_approved', 'created_at')
@@ -70,4 +88,14 @@ class NewsletterAdmin(admin.ModelAdmin):
     search_fields = ('email',)
     list_editable = ('is_active',)
 
-admin.site.register(Like)
\ No newline at end of file
+admin.site.register(Like)
+@admin.register(NewsletterIssue)
+class NewsletterIssueAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'sent_count', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('post', 'status', 'last_subscriber_id', 'sent_count', 'started_at', 'finished_at')
+
+@admin.register(PostImport)
+class PostImportAdmin(admin.ModelAdmin):
+    list_display = ('source', 'imported', 'skipped', 'started_at', 'finished_at')
+    readonly_fields = ('source', 'position', 'imported', 'skipped', 'started_at', 'updated_at', 'finished_at')
@@ -0,0 +1,437 @@
+"""
+Benchmark fixtures and scenarios.
+
+seed() fills the database with synthetic users, categories, tagged posts,
+comment threads, likes, follows and newsletter subscribers at any scale.
+Rows are generated and bulk-inserted one chunk at a time, so a million
+comments never sit in memory at once, and all names are prefixed with
+``bench`` so clear() can remove them again. Everything is derived from a
+seeded random.Random, so the same arguments always build the same data.
+
+run() times each scenario from default_scenarios(), either in-process through the
+test client (which also counts queries per request) or against a running
+server over HTTP, and returns latency percentiles, throughput and query
+counts as a JSON-serialisable dict.
+"""
+import json
+import logging
+import platform
+import random
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from members import stats as author_stats
+from members.models import UserFollowing
+
+from . import feed, generations, related, trending
+from .counters import reconcile_post_counters, update_category_counts
+from .models import Category, Comment, Like, Newsletter, Post, PostActivity, PostTag, Tag
+from .queries import record_queries
+from .search import get_search_backend
+from .stats import invalidate_site_stats
+from .tags import update_tag_counts
+
+PREFIX = 'bench'
+PASSWORD = 'bench-password'
+
+DEFAULT_SCALE = {
+    'users': 200,
+    'categories': 12,
+    'tags': 60,
+    'posts': 2000,
+    'comments': 20000,
+    'likes': 20000,
+    'follows': 5000,
+    'subscribers': 10000,
+}
+
+WORDS = (
+    'django python cache query index latency throughput request response template '
+    'database replica shard vector search token stream batch queue worker signal '
+    'model view form field migration router session cookie header static media '
+    'image thumbnail feed follow like comment reply tag category newsletter post'
+).split()
+
+
+def sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def paragraphs(rng, count=4):
+    return ''.join(f'<p>{" ".join(sentence(rng) for _ in range(5))}</p>' for _ in range(count))
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def seed(scale=None, batch_size=1000, seed_value=0, log=print):
+    """
+    Create benchmark rows, returns {kind: rows generated}. Random likes
+    and follows that collide with existing pairs are skipped, so the
+    table counts can come out a little lower.
+    """
+    scale = {**DEFAULT_SCALE, **(scale or {})}
+    rng = random.Random(seed_value)
+    User = get_user_model()
+    created = {}
+    password = make_password(PASSWORD)
+
+    def insert(model, rows, **kwargs):
+        total = 0
+        for chunk in chunked(rows, batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(chunk, batch_size=batch_size, **kwargs)
+            total += len(chunk)
+        return total
+
+    log('users')
+    created['users'] = insert(User, (
+        User(
+            username=f'{PREFIX}_user_{i}', email=f'{PREFIX}_user_{i}@example.com',
+            password=password, first_name=rng.choice(WORDS).title(), is_staff=(i == 0),
+        )
+        for i in range(scale['users'])
+    ))
+    user_ids = list(User.objects.filter(username__startswith=f'{PREFIX}_user_').values_list('pk', flat=True))
+
+    log('categories and tags')
+    created['categories'] = insert(Category, (
+        Category(name=f'{PREFIX.title()} {i}', slug=f'{PREFIX}-category-{i}', description=sentence(rng))
+        for i in range(scale['categories'])
+    ))
+    category_ids = list(Category.objects.filter(slug__startswith=f'{PREFIX}-category-').values_list('pk', flat=True))
+    tag_names = [f'{PREFIX}-{word}-{i}' for i, word in enumerate(rng.choice(WORDS) for _ in range(scale['tags']))]
+    created['tags'] = insert(Tag, (Tag(name=name, slug=name) for name in tag_names), ignore_conflicts=True)
+    tag_ids = dict(Tag.objects.filter(slug__in=tag_names).values_list('slug', 'pk'))
+
+    log('posts')
+    now = timezone.now()
+
+    def posts():
+        for i in range(scale['posts']):
+            status = 'published' if rng.random() < 0.9 else 'draft'
+            post_tags = rng.sample(tag_names, k=min(3, len(tag_names)))
+            content = paragraphs(rng)
+            yield Post(
+                title=sentence(rng, 6)[:-1], slug=f'{PREFIX}-post-{i}', author_id=rng.choice(user_ids),
+                category_id=rng.choice(category_ids) if category_ids else None,
+                content=content, excerpt=strip_tags(content)[:197] + '...', status=status,
+                published_at=now if status == 'published' else None,
+                views=rng.randint(0, 5000), tags=', '.join(post_tags), is_featured=i < 3,
+            )
+
+    created['posts'] = insert(Post, posts())
+    bench_posts = Post.objects.filter(slug__startswith=f'{PREFIX}-post-')
+    post_ids = list(bench_posts.values_list('pk', flat=True))
+
+    log('post tags')
+    tag_pairs = (
+        PostTag(post_id=post_id, tag_id=tag_ids[name.strip()])
+        for post_id, value in bench_posts.values_list('pk', 'tags').iterator()
+        for name in value.split(',')
+    )
+    insert(PostTag, tag_pairs, ignore_conflicts=True)
+    update_tag_counts(list(tag_ids.values()))
+
+    log('comments')
+    created['comments'] = 0
+    for chunk in chunked(range(scale['comments']), batch_size):
+        with transaction.atomic():
+            top_level = Comment.objects.bulk_create([
+                Comment(post_id=rng.choice(post_ids), author_id=rng.choice(user_ids), content=sentence(rng))
+                for _ in chunk[:len(chunk) * 4 // 5]
+            ])
+            replies = []
+            for _ in chunk[len(top_level):]:
+                parent = rng.choice(top_level) if top_level else None
+                replies.append(Comment(
+                    post_id=parent.post_id if parent else rng.choice(post_ids), parent=parent,
+                    author_id=rng.choice(user_ids), content=sentence(rng),
+                ))
+            Comment.objects.bulk_create(replies)
+        created['comments'] += len(chunk)
+
+    log('likes')
+    created['likes'] = insert(Like, (
+        Like(user_id=rng.choice(user_ids), post_id=rng.choice(post_ids)) for _ in range(scale['likes'])
+    ), ignore_conflicts=True)
+
+    log('follows')
+    created['follows'] = insert(UserFollowing, (
+        UserFollowing(user_id=a, following_user_id=b)
+        for a, b in ((rng.choice(user_ids), rng.choice(user_ids)) for _ in range(scale['follows']))
+        if a != b
+    ), ignore_conflicts=True)
+
+    log('subscribers')
+    created['subscribers'] = insert(Newsletter, (
+        Newsletter(email=f'{PREFIX}_subscriber_{i}@example.com') for i in range(scale['subscribers'])
+    ), ignore_conflicts=True)
+
+    log('activity')
+    # A week of hourly buckets for a tenth of the posts, so the trending
+    # lists have something to rank.
+    hours = [trending.current_bucket(now) - timedelta(hours=h) for h in range(7 * 24)]
+    insert(PostActivity, (
+        PostActivity(
+            post_id=post_id, bucket=bucket, views=rng.randint(1, 50),
+            likes=rng.randint(0, 3), comments=rng.randint(0, 1),
+        )
+        for post_id in rng.sample(post_ids, k=len(post_ids) // 10)
+        for bucket in rng.sample(hours, k=12)
+    ), ignore_conflicts=True)
+
+    log('derived data')
+    refresh_derived(bench_posts)
+    return created
+
+
+def refresh_derived(posts):
+    """bulk_create skips signals: redo counters, search index, related and trending posts, feeds, author stats, caches"""
+    reconcile_post_counters(posts)
+    update_category_counts()
+    backend = get_search_backend()
+    with transaction.atomic():
+        for post in posts.iterator(chunk_size=500):
+            backend.index(post)
+    related.rebuild()
+    trending.update()
+    feed.rebuild()
+    author_stats.rebuild()
+    invalidate_site_stats()
+    generations.bump_generation(generations.POSTS, generations.CATEGORIES, generations.COMMENTS)
+
+
+def clear():
+    """Delete every benchmark row"""
+    User = get_user_model()
+    Newsletter.objects.filter(email__startswith=f'{PREFIX}_subscriber_').delete()
+    bench_posts = Post.objects.filter(slug__startswith=f'{PREFIX}-post-')
+    backend = get_search_backend()
+    for post_id in bench_posts.values_list('pk', flat=True).iterator():
+        backend.remove(post_id)
+    bench_posts.delete()
+    Tag.objects.filter(slug__startswith=f'{PREFIX}-').delete()
+    Category.objects.filter(slug__startswith=f'{PREFIX}-category-').delete()
+    User.objects.filter(username__startswith=f'{PREFIX}_user_').delete()
+    invalidate_site_stats()
+    generations.bump_generation(generations.POSTS, generations.CATEGORIES, generations.COMMENTS)
+
+
+@dataclass
+class Scenario:
+    name: str
+    view_name: str
+    kwargs: dict = field(default_factory=dict)
+    query: str = ''
+    login: bool = False
+
+    def path(self):
+        url = reverse(self.view_name, kwargs=self.kwargs or None)
+        return f'{url}?{self.query}' if self.query else url
+
+
+def default_scenarios():
+    """Scenarios over the public myapp pages and the members pages"""
+    post = Post.objects.filter(status='published', slug__startswith=f'{PREFIX}-post-').order_by('-comment_count').first()
+    post = post or Post.objects.filter(status='published').order_by('-comment_count').first()
+    if post is None:
+        return []
+    category = Category.objects.filter(pk=post.category_id).first()
+    tag = Tag.objects.order_by('-post_count').first()
+    staff = get_user_model().objects.filter(username=f'{PREFIX}_user_0').first()
+    # Offset pagination gets slower with depth; AllPostsView shows 12 a page.
+    deep_page = max(1, min(50, Post.objects.filter(status='published').count() // 12))
+    scenarios = [
+        Scenario('home', 'myapp:home'),
+        Scenario('all_posts', 'myapp:all_posts'),
+        Scenario('all_posts_popular', 'myapp:all_posts', query='sort=popular'),
+        Scenario('all_posts_deep_page', 'myapp:all_posts', query=f'page={deep_page}'),
+        Scenario('post_detail', 'myapp:post_detail', {'slug': post.slug}),
+        Scenario('search', 'myapp:search', query='q=django+cache'),
+        Scenario('about', 'myapp:about'),
+    ]
+    if category:
+        scenarios.append(Scenario('category_posts', 'myapp:category_posts', {'slug': category.slug}))
+    if tag:
+        scenarios.append(Scenario('tag_posts', 'myapp:tag_posts', {'slug': tag.slug}))
+    if staff:
+        scenarios += [
+            Scenario('profile', 'members:profile', {'username': post.author.username}, login=True),
+            Scenario('followers', 'members:followers', {'username': post.author.username}, login=True),
+            Scenario('feed', 'myapp:feed', login=True),
+        ]
+    return scenarios
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed, queries=None):
+    latencies = sorted(latencies)
+    result = {
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+    }
+    for label, fraction in (('p50_ms', 0.5), ('p95_ms', 0.95), ('p99_ms', 0.99)):
+        value = percentile(latencies, fraction)
+        result[label] = round(value * 1000, 2) if value is not None else None
+    result['mean_ms'] = round(statistics.fmean(latencies) * 1000, 2) if latencies else None
+    if queries is not None:
+        result['queries_per_request'] = round(statistics.fmean(queries), 1) if queries else None
+    return result
+
+
+def run_in_process(scenario, requests, warmup, cold=False):
+    """Time ``scenario`` through the test client, counting queries per request"""
+    overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+    if cold:
+        overrides['CACHES'] = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    with override_settings(**overrides):
+        client = Client()
+        if scenario.login:
+            client.force_login(get_user_model().objects.get(username=f'{PREFIX}_user_0'))
+        path = scenario.path()
+        for _ in range(warmup):
+            client.get(path)
+        latencies, queries, errors = [], [], 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            with record_queries() as recorder:
+                request_started = time.perf_counter()
+                response = client.get(path)
+                duration = time.perf_counter() - request_started
+            if response.status_code != 200:
+                errors += 1
+                continue
+            latencies.append(duration)
+            queries.append(recorder.count)
+        elapsed = time.perf_counter() - started
+    return summarize(latencies, errors, elapsed, queries)
+
+
+def run_over_http(scenario, base_url, requests, warmup, concurrency=1):
+    """Time ``scenario`` against a running server; logged-in scenarios use the session cookie"""
+    url = base_url.rstrip('/') + scenario.path()
+    headers = {}
+    if scenario.login:
+        client = Client()
+        client.force_login(get_user_model().objects.get(username=f'{PREFIX}_user_0'))
+        headers['Cookie'] = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+
+    def fetch(_):
+        request = urllib.request.Request(url, headers=headers)
+        request_started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+                ok = response.status == 200
+        except (urllib.error.URLError, OSError):
+            ok = False
+        return ok, time.perf_counter() - request_started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(fetch, range(warmup)))
+        started = time.perf_counter()
+        results = list(pool.map(fetch, range(requests)))
+        elapsed = time.perf_counter() - started
+    latencies = [duration for ok, duration in results if ok]
+    return summarize(latencies, len(results) - len(latencies), elapsed)
+
+
+def dataset_size():
+    User = get_user_model()
+    return {
+        'users': User.objects.count(),
+        'posts': Post.objects.count(),
+        'comments': Comment.objects.count(),
+        'likes': Like.objects.count(),
+        'follows': UserFollowing.objects.count(),
+        'subscribers': Newsletter.objects.count(),
+    }
+
+
+def run(scenarios=None, requests=50, warmup=5, base_url=None, concurrency=1, cold=False):
+    """Run the scenarios and return the report dict"""
+    scenarios = default_scenarios() if scenarios is None else scenarios
+    report = {
+        'meta': {
+            'timestamp': timezone.now().isoformat(),
+            'mode': 'http' if base_url else 'in-process',
+            'base_url': base_url,
+            'requests': requests,
+            'warmup': warmup,
+            'concurrency': concurrency if base_url else 1,
+            'cold_cache': cold and not base_url,
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'dataset': dataset_size(),
+        },
+        'scenarios': {},
+    }
+    # The N+1 warnings would be logged once per timed request.
+    query_logger = logging.getLogger('myapp.queries')
+    query_logger_disabled, query_logger.disabled = query_logger.disabled, True
+    try:
+        for scenario in scenarios:
+            report['scenarios'][scenario.name] = {'path': scenario.path(), **run_scenario(
+                scenario, requests, warmup, base_url, concurrency, cold,
+            )}
+    finally:
+        query_logger.disabled = query_logger_disabled
+    return report
+
+
+def run_scenario(scenario, requests, warmup, base_url, concurrency, cold):
+    if base_url:
+        return run_over_http(scenario, base_url, requests, warmup, concurrency)
+    return run_in_process(scenario, requests, warmup, cold)
+
+
+def compare(report, baseline):
+    """{scenario: {metric: percent change}} against an earlier report"""
+    changes = {}
+    for name, result in report['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        changes[name] = {
+            metric: round((result[metric] - previous[metric]) / previous[metric] * 100, 1)
+            for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request')
+            if result.get(metric) is not None and previous.get(metric)
+        }
+    return changes
+
+
+def load_report(path):
+    with open(path) as handle:
+        return json.load(handle)
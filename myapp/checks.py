@@ -0,0 +1,29 @@
+"""
+System checks for the deployment settings the background tasks rely on.
+"""
+from django.conf import settings
+from django.core.checks import Error, register
+
+from core.caches import is_shared
+
+
+@register()
+def check_task_settings(app_configs, **kwargs):
+    """Workers need a broker, and the cache invalidation they do must reach the web processes"""
+    if getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False):
+        return []
+    errors = []
+    if settings.CELERY_BROKER_URL.startswith('memory://'):
+        errors.append(Error(
+            'Celery tasks are not run eagerly but there is no broker: queued tasks are never run.',
+            hint='Set CELERY_BROKER_URL, or leave CELERY_TASK_ALWAYS_EAGER unset in development.',
+            id='myapp.E002',
+        ))
+    if not is_shared(settings.CACHES['default']):
+        errors.append(Error(
+            'Celery tasks run in workers but the default cache is per process, so their cache '
+            'invalidation never reaches the web processes.',
+            hint='Set CACHE_URL to a Redis or Memcached server.',
+            id='myapp.E001',
+        ))
+    return errors
@@ -0,0 +1,48 @@
+"""
+Comment thread loading.
+
+A post's approved comments are fetched in a single query (authors joined)
+and linked into a tree in memory, so rendering a thread costs the same
+number of queries however many replies it has.
+"""
+from .models import Comment
+
+
+def load_comment_thread(post):
+    """
+    Return the top-level approved comments of ``post``.
+
+    Each comment gets ``thread_children`` (its direct replies) and each
+    top-level comment gets ``thread_replies``, every reply below it in
+    depth-first order with a ``depth`` attribute, which is what the
+    template renders. Replies under an unapproved comment are hidden with
+    it.
+    """
+    comments = list(
+        Comment.objects.filter(post=post, is_approved=True)
+        .select_related('author')
+        .order_by('created_at', 'pk')
+    )
+    by_id = {}
+    for comment in comments:
+        comment.post = post
+        comment.thread_children = []
+        by_id[comment.pk] = comment
+
+    roots = []
+    for comment in comments:
+        if comment.parent_id is None:
+            roots.append(comment)
+        elif comment.parent_id in by_id:
+            by_id[comment.parent_id].thread_children.append(comment)
+
+    for root in roots:
+        root.depth = 0
+        root.thread_replies = []
+        stack = list(reversed(root.thread_children))
+        while stack:
+            reply = stack.pop()
+            reply.depth = by_id[reply.parent_id].depth + 1
+            root.thread_replies.append(reply)
+            stack.extend(reversed(reply.thread_children))
+    return roots
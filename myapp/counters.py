@@ -0,0 +1,355 @@
+"""
+Denormalized counters on Post.
+
+Page views are collected in a buffer and written back in batches with
+``F('views') + n`` updates, so rendering a post never takes a write lock
+and concurrent hits can't overwrite each other's increments. The same
+flush adds them to the hourly activity buckets behind myapp.trending
+and to the authors' totals in members.stats. Each process flushes from
+a background thread every VIEW_COUNT_FLUSH_INTERVAL seconds, or sooner
+once VIEW_COUNT_FLUSH_THRESHOLD views are pending. With the shared
+'cache' buffer, the flush_post_views beat task also drains what idle or
+exited web processes left behind.
+
+like_count and comment_count are kept in step by the signal handlers in
+myapp.signals; reconcile_post_counters() repairs any drift.
+Category.post_count is recounted by update_category_counts() whenever a
+post is saved or deleted, so category pages don't count their posts.
+"""
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+logger = logging.getLogger(__name__)
+
+class MemoryViewBuffer:
+    """Per-process buffer, flushed by its own process on a timer/threshold and at exit."""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, post_id, n=1):
+        with self._lock:
+            self._counts[post_id] += n
+
+    def pending(self, post_id):
+        return self._counts.get(post_id, 0)
+
+    def size(self):
+        return sum(self._counts.values())
+
+    def drain(self):
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        return dict(counts)
+
+    def restore(self, counts):
+        with self._lock:
+            self._counts.update(counts)
+
+
+class CacheViewBuffer:
+    """
+    Buffer shared by every worker through the cache backend.
+
+    Each post keeps its own counter key. The first view of a post since
+    it was last drained also sets a per-post "dirty" marker (cache.add,
+    so only one worker wins) and appends the post id to a log of slots
+    numbered by an atomic counter. drain() walks the log from where the
+    previous drain stopped, deletes the markers before reading the
+    counters, and decrements the counters by the amount read instead of
+    deleting them: a hit that lands while a flush is running is either
+    read now or re-marks its post for the next one.
+    """
+
+    key_prefix = 'views:pending:'
+    marker_prefix = 'views:dirty:'
+    slot_prefix = 'views:slot:'
+    head_key = 'views:slots:drained'
+    tail_key = 'views:slots:last'
+    gap_key = 'views:slots:gap'
+    lock_key = 'views:draining'
+    total_key = 'views:pending_total'
+    # A marker whose slot was never written (its worker died in between)
+    # expires, and the post's next view logs it again.
+    marker_timeout = 60 * 60
+    lock_timeout = 5 * 60
+
+    def _key(self, post_id):
+        return f'{self.key_prefix}{post_id}'
+
+    def _slot_key(self, slot):
+        return f'{self.slot_prefix}{slot}'
+
+    def _incr(self, key, n):
+        if not cache.add(key, n, timeout=None):
+            return cache.incr(key, n)
+        return n
+
+    def add(self, post_id, n=1):
+        # Count first: a drain that deleted the marker before this reads the count or sees the new slot.
+        self._incr(self._key(post_id), n)
+        self._incr(self.total_key, n)
+        if cache.add(f'{self.marker_prefix}{post_id}', True, timeout=self.marker_timeout):
+            slot = self._incr(self.tail_key, 1)
+            cache.set(self._slot_key(slot), post_id, timeout=None)
+
+    def pending(self, post_id):
+        return cache.get(self._key(post_id), 0)
+
+    def size(self):
+        return cache.get(self.total_key, 0)
+
+    def _dirty_post_ids(self):
+        """Post ids logged since the last drain, moving the drained position past them"""
+        drained, last = cache.get(self.head_key, 0), cache.get(self.tail_key, 0)
+        if last <= drained:
+            return set()
+        slots = range(drained + 1, last + 1)
+        entries = cache.get_many([self._slot_key(slot) for slot in slots])
+        # A slot can be reserved but not written yet; the drain after this one
+        # revisits it (and everything logged after it) once before giving up.
+        missing = [slot for slot in slots if self._slot_key(slot) not in entries]
+        known_gap = cache.get(self.gap_key)
+        waiting = [slot for slot in missing if slot != known_gap]
+        head = waiting[0] - 1 if waiting else last
+        if waiting:
+            cache.set(self.gap_key, waiting[0], timeout=None)
+        cache.set(self.head_key, head, timeout=None)
+        cache.delete_many([self._slot_key(slot) for slot in slots if slot <= head])
+        return set(entries.values())
+
+    def drain(self):
+        if not cache.add(self.lock_key, True, timeout=self.lock_timeout):
+            return {}
+        try:
+            post_ids = self._dirty_post_ids()
+            if not post_ids:
+                return {}
+            cache.delete_many([f'{self.marker_prefix}{post_id}' for post_id in post_ids])
+            values = cache.get_many([self._key(post_id) for post_id in post_ids])
+            counts = {}
+            for post_id in post_ids:
+                n = values.get(self._key(post_id), 0)
+                if n:
+                    cache.decr(self._key(post_id), n)
+                    counts[post_id] = n
+            if counts:
+                try:
+                    cache.decr(self.total_key, sum(counts.values()))
+                except ValueError:
+                    pass
+            return counts
+        finally:
+            cache.delete(self.lock_key)
+
+    def restore(self, counts):
+        for post_id, n in counts.items():
+            self.add(post_id, n)
+
+
+BUFFERS = {
+    'memory': MemoryViewBuffer,
+    'cache': CacheViewBuffer,
+}
+
+
+class ViewCounter:
+    """
+    Collects post views and flushes them from a background thread every
+    ``interval`` seconds, or as soon as ``threshold`` views were recorded.
+    """
+
+    def __init__(self, buffer, threshold=100, interval=10):
+        self.buffer = buffer
+        self.threshold = threshold
+        self.interval = interval
+        self._recorded = 0
+        # Guards _recorded; not held while flushing, so recording never waits on the database
+        self._recorded_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def record(self, post_id, n=1):
+        self.buffer.add(post_id, n)
+        self._ensure_worker()
+        with self._recorded_lock:
+            self._recorded += n
+            full = self._recorded >= self.threshold
+        if full:
+            self._wakeup.set()
+
+    def pending(self, post_id):
+        return self.buffer.pending(post_id)
+
+    def _ensure_worker(self):
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='view-counter', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Flushing buffered post views failed')
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        """Write pending views to the database, returns the number flushed."""
+        from members.stats import add_activity
+        from .models import Post
+        from .trending import record_activity
+
+        if not self._flush_lock.acquire(blocking=False):
+            return 0
+        try:
+            with self._recorded_lock:
+                self._recorded = 0
+            counts = self.buffer.drain()
+            if not counts:
+                return 0
+
+            # Posts with the same pending count share one UPDATE statement.
+            by_amount = defaultdict(list)
+            for post_id, n in counts.items():
+                by_amount[n].append(post_id)
+
+            try:
+                with transaction.atomic():
+                    for n, post_ids in by_amount.items():
+                        Post.objects.filter(pk__in=post_ids).update(views=F('views') + n)
+                    record_activity(counts, 'views')
+                    add_activity(counts, 'views')
+            except Exception:
+                self.buffer.restore(counts)
+                raise
+            return sum(counts.values())
+        finally:
+            self._flush_lock.release()
+
+
+_view_counter = None
+_view_counter_lock = threading.Lock()
+
+
+def get_view_counter():
+    global _view_counter
+    if _view_counter is None:
+        with _view_counter_lock:
+            if _view_counter is None:
+                buffer_class = BUFFERS[getattr(settings, 'VIEW_COUNT_BUFFER', 'memory')]
+                _view_counter = ViewCounter(
+                    buffer_class(),
+                    threshold=getattr(settings, 'VIEW_COUNT_FLUSH_THRESHOLD', 100),
+                    interval=getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', 10),
+                )
+                if isinstance(_view_counter.buffer, MemoryViewBuffer):
+                    atexit.register(_flush_at_exit)
+    return _view_counter
+
+
+def _flush_at_exit():
+    try:
+        get_view_counter().flush()
+    except Exception:
+        pass
+
+
+def record_view(post_id):
+    get_view_counter().record(post_id)
+
+
+def flush_views():
+    """
+    Flush this process's view counter. Other processes' buffers are only
+    reachable with VIEW_COUNT_BUFFER = 'cache'; a 'memory' buffer is
+    flushed by the web process that holds it.
+    """
+    return get_view_counter().flush()
+
+
+def _like_count_subquery():
+    from .models import Like
+
+    return Coalesce(Subquery(
+        Like.objects.filter(post=OuterRef('pk')).values('post').annotate(n=Count('id')).values('n')
+    ), 0)
+
+
+def _comment_count_subquery():
+    from .models import Comment
+
+    return Coalesce(Subquery(
+        Comment.objects.filter(
+            post=OuterRef('pk'), is_approved=True
+        ).values('post').annotate(n=Count('id')).values('n')
+    ), 0)
+
+
+def adjust_like_count(post_id, delta):
+    """Apply a like/unlike to Post.like_count and its author's totals without reading the rows"""
+    from members.stats import add_activity
+    from .models import Post
+
+    posts = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(like_count__gte=-delta)
+    posts.update(like_count=F('like_count') + delta)
+    add_activity({post_id: delta}, 'likes')
+
+
+def update_comment_count(post_id):
+    """
+    Recount approved comments for one post in a single UPDATE.
+
+    Comments can be approved or hidden after they're created, so the
+    count is recomputed rather than incremented.
+    """
+    from .models import Post
+
+    Post.objects.filter(pk=post_id).update(comment_count=_comment_count_subquery())
+
+
+def update_category_counts(category_ids=None):
+    """Recount the published posts of the given categories, or of all of them"""
+    from .models import Category, Post
+
+    categories = Category.objects.all() if category_ids is None else Category.objects.filter(pk__in=category_ids)
+    published = Post.objects.filter(
+        category=OuterRef('pk'), status='published'
+    ).values('category').annotate(n=Count('id')).values('n')
+    categories.update(post_count=Coalesce(Subquery(published), 0))
+
+
+def reconcile_post_counters(queryset=None):
+    """Recompute like_count and comment_count, returns the number of posts fixed"""
+    from .models import Post
+
+    queryset = Post.objects.all() if queryset is None else queryset
+    drifted = queryset.annotate(
+        actual_likes=_like_count_subquery(),
+        actual_comments=_comment_count_subquery(),
+    ).exclude(like_count=F('actual_likes'), comment_count=F('actual_comments'))
+    post_ids = list(drifted.values_list('pk', flat=True))
+    if post_ids:
+        Post.objects.filter(pk__in=post_ids).update(
+            like_count=_like_count_subquery(),
+            comment_count=_comment_count_subquery(),
+        )
+    return len(post_ids)
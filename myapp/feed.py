@@ -0,0 +1,242 @@
+"""
+Personal feeds: the newest posts by the people a user follows.
+
+Fan-out on write: when a post is published, fan_out_post() copies it
+into a TimelineEntry for every follower of its author, FEED_FANOUT_BATCH
+rows per INSERT, so reading a feed is one range scan of the reader's
+(owner, published_at, post) index instead of a join through
+UserFollowing on every request. Following someone backfills their
+FEED_BACKFILL newest posts; unfollowing removes their entries.
+
+Fan-out on read: authors with FEED_FANOUT_LIMIT followers or more would
+make one publish write that many rows, so their posts are not fanned
+out. Readers who follow such authors get their posts with one more
+range read on Post's author index, merged into the page. The set of
+these authors is read from members.stats' follower counts every few
+minutes; an author crossing the limit keeps the entries already
+written, and duplicates are dropped when merging.
+
+Migration 0016 fills the feeds of follows that existed before feeds
+did, as rebuild() (the rebuild_feeds command) would.
+
+Pages are keyset pages on (published_at, post id), addressed with the
+same opaque cursors as myapp.pagination.
+"""
+import base64
+import heapq
+import json
+from itertools import groupby
+from operator import attrgetter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .models import Post, TimelineEntry
+from .pagination import CursorPage, InvalidCursor
+
+HEAVY_AUTHORS_KEY = 'feed:heavy_authors'
+HEAVY_AUTHORS_TIMEOUT = 300
+
+
+def feed_setting(name, default):
+    return getattr(settings, f'FEED_{name}', default)
+
+
+def heavy_authors():
+    """Ids of the authors whose posts are read on demand instead of fanned out"""
+    from members.models import AuthorStats
+
+    authors = cache.get(HEAVY_AUTHORS_KEY)
+    if authors is None:
+        # An index range on AuthorStats' follower counts
+        authors = set(
+            AuthorStats.objects.filter(follower_count__gte=feed_setting('FANOUT_LIMIT', 5000))
+            .values_list('user_id', flat=True)
+        )
+        cache.set(HEAVY_AUTHORS_KEY, authors, HEAVY_AUTHORS_TIMEOUT)
+    return authors
+
+
+def _entry(owner_id, post):
+    return TimelineEntry(
+        owner_id=owner_id, post_id=post.pk, author_id=post.author_id, published_at=post.published_at,
+    )
+
+
+def fan_out_post(post_id):
+    """Add a published post to its author's followers' feeds, returns the number of rows written"""
+    from members.models import UserFollowing
+
+    post = Post.objects.filter(pk=post_id, status='published').first()
+    if post is None or post.published_at is None or post.author_id in heavy_authors():
+        return 0
+    batch_size = feed_setting('FANOUT_BATCH', 1000)
+    follower_ids = (
+        UserFollowing.objects.filter(following_user_id=post.author_id)
+        .order_by('pk').values_list('user_id', flat=True)
+    )
+    written, batch = 0, []
+    for follower_id in follower_ids.iterator(chunk_size=batch_size):
+        batch.append(_entry(follower_id, post))
+        if len(batch) >= batch_size:
+            TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            written, batch = written + len(batch), []
+    if batch:
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+        written += len(batch)
+    return written
+
+
+def fan_out_posts(posts):
+    """
+    fan_out_post() for every published post in the queryset ``posts``
+    (an import), reading each author's followers once. Returns the
+    number of rows written.
+    """
+    from members.models import UserFollowing
+
+    batch_size = feed_setting('FANOUT_BATCH', 1000)
+    posts = (
+        posts.filter(status='published', published_at__isnull=False)
+        .exclude(author_id__in=heavy_authors())
+        .order_by('author_id')
+        .only('pk', 'author_id', 'published_at')
+    )
+    written, batch = 0, []
+    for author_id, author_posts in groupby(posts.iterator(chunk_size=batch_size), key=attrgetter('author_id')):
+        author_posts = list(author_posts)
+        follower_ids = (
+            UserFollowing.objects.filter(following_user_id=author_id)
+            .order_by('pk').values_list('user_id', flat=True)
+        )
+        for follower_id in follower_ids.iterator(chunk_size=batch_size):
+            batch.extend(_entry(follower_id, post) for post in author_posts)
+            if len(batch) >= batch_size:
+                TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+                written, batch = written + len(batch), []
+    if batch:
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+        written += len(batch)
+    return written
+
+
+def backfill(follower_id, author_id):
+    """Copy an author's newest posts into a new follower's feed"""
+    if author_id in heavy_authors():
+        return 0
+    posts = Post.objects.filter(
+        author_id=author_id, status='published', published_at__isnull=False,
+    ).order_by('-published_at')[:feed_setting('BACKFILL', 20)]
+    entries = [_entry(follower_id, post) for post in posts]
+    TimelineEntry.objects.bulk_create(entries, ignore_conflicts=True)
+    return len(entries)
+
+
+def remove_author(follower_id, author_id):
+    """Drop an author's posts from a former follower's feed"""
+    return TimelineEntry.objects.filter(owner_id=follower_id, author_id=author_id).delete()[0]
+
+
+def rebuild(user_ids=None):
+    """Refill feeds from scratch (all users, or ``user_ids``), returns the number of entries"""
+    from members.models import UserFollowing
+
+    User = get_user_model()
+    users = User.objects.all() if user_ids is None else User.objects.filter(pk__in=user_ids)
+    total = 0
+    for user_id in users.values_list('pk', flat=True).iterator():
+        TimelineEntry.objects.filter(owner_id=user_id).delete()
+        for author_id in UserFollowing.objects.filter(user_id=user_id).values_list('following_user_id', flat=True):
+            total += backfill(user_id, author_id)
+    return total
+
+
+class FeedPaginator:
+    """
+    Keyset pages of a user's feed, newest first.
+
+    Each page reads at most ``per_page + 1`` timeline entries and, if the
+    user follows any heavy authors, as many of their posts, and merges
+    the two.
+    """
+
+    def __init__(self, user, per_page):
+        self.user = user
+        self.per_page = per_page
+
+    def encode_cursor(self, post, direction):
+        raw = json.dumps([direction, post.published_at.isoformat(), post.pk]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, value, pk = json.loads(raw)
+            published_at = parse_datetime(value)
+            if direction not in ('next', 'prev') or published_at is None:
+                raise ValueError(direction)
+            return direction, published_at, int(pk)
+        except Exception as exc:
+            raise InvalidCursor(cursor) from exc
+
+    def _range(self, queryset, date_field, id_field, backwards, bound):
+        # Newest first going forwards; oldest first when paging back.
+        op, prefix = ('gt', '') if backwards else ('lt', '-')
+        if bound:
+            published_at, pk = bound
+            queryset = queryset.filter(
+                Q(**{f'{date_field}__{op}': published_at}) |
+                Q(**{date_field: published_at, f'{id_field}__{op}': pk})
+            )
+        return queryset.order_by(f'{prefix}{date_field}', f'{prefix}{id_field}')[:self.per_page + 1]
+
+    def fetch(self, backwards, bound):
+        entries = self._range(
+            TimelineEntry.objects.filter(owner=self.user, post__status='published')
+            .select_related('post__author', 'post__category'),
+            'published_at', 'post_id', backwards, bound,
+        )
+        sources = [[entry.post for entry in entries]]
+
+        heavy = heavy_authors()
+        if heavy:
+            followed = list(self.user.following.filter(following_user_id__in=heavy).values_list(
+                'following_user_id', flat=True
+            ))
+            if followed:
+                sources.append(list(self._range(
+                    Post.objects.filter(author_id__in=followed, status='published')
+                    .select_related('author', 'category'),
+                    'published_at', 'pk', backwards, bound,
+                )))
+
+        posts, seen = [], set()
+        for post in heapq.merge(*sources, key=lambda post: (post.published_at, post.pk), reverse=not backwards):
+            if post.pk not in seen:
+                seen.add(post.pk)
+                posts.append(post)
+        return posts
+
+    def page(self, cursor=None):
+        direction, published_at, pk = self.decode_cursor(cursor) if cursor else ('next', None, None)
+        backwards = direction == 'prev'
+        posts = self.fetch(backwards, (published_at, pk) if cursor else None)
+
+        has_more = len(posts) > self.per_page
+        posts = posts[:self.per_page]
+        if backwards:
+            posts.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+
+        return CursorPage(
+            posts,
+            has_next=has_next,
+            has_previous=has_previous,
+            next_cursor=self.encode_cursor(posts[-1], 'next') if posts and has_next else None,
+            previous_cursor=self.encode_cursor(posts[0], 'prev') if posts and has_previous else None,
+        )
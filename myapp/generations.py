@@ -0,0 +1,57 @@
+"""
+Generation counters for cache invalidation.
+
+Cached content puts the current generation of everything it depends on
+into its cache key. Bumping a generation (from the signal handlers in
+myapp.signals) makes every key built from the old value unreachable, so
+nothing has to know which keys exist in order to invalidate them.
+"""
+import time
+
+from django.core.cache import cache
+
+POSTS = 'posts'
+CATEGORIES = 'categories'
+COMMENTS = 'comments'
+# Not a page cache: bumped by myapp.related.rebuild() so workers reload their corpus
+RELATED = 'related-corpus'
+
+
+def _key(name):
+    return f'generation:{name}'
+
+
+def _initial():
+    # A missing counter (evicted, or a cold cache) restarts from the clock
+    # rather than from 1, so it can't collide with keys built before.
+    return time.time_ns()
+
+
+def get_generations(names):
+    """Return {name: generation} for ``names`` in one cache round trip"""
+    values = cache.get_many([_key(name) for name in names])
+    generations = {}
+    for name in names:
+        value = values.get(_key(name))
+        if value is None:
+            value = _initial()
+            if not cache.add(_key(name), value, timeout=None):
+                value = cache.get(_key(name), value)
+        generations[name] = value
+    return generations
+
+
+def bump_generation(*names):
+    for name in names:
+        try:
+            cache.incr(_key(name))
+        except ValueError:
+            cache.set(_key(name), _initial(), timeout=None)
+
+
+def post_generation(slug):
+    return f'post:{slug}'
+
+
+def category_generation(slug):
+    return f'category:{slug}'
@@ -0,0 +1,104 @@
+"""
+Resized derivatives of uploaded images.
+
+Featured images and profile pictures get WebP and JPEG copies at each of
+IMAGE_DERIVATIVE_WIDTHS (narrower than the original), stored under
+``derivatives/`` with the original's path. They are generated by the
+generate_image_derivatives task when an image is uploaded or replaced,
+and by the command of the same name for existing media. Templates use
+{% responsive_image %} from myapp.templatetags.images to emit srcsets.
+"""
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+DERIVATIVE_DIR = 'derivatives'
+# extension -> (Pillow format, save options)
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def derivative_widths():
+    return tuple(getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', (160, 320, 640, 1024)))
+
+
+def derivative_name(name, width, extension):
+    stem, _ = os.path.splitext(name)
+    return f'{DERIVATIVE_DIR}/{stem}-{width}w.{extension}'
+
+
+def _widths_key(name):
+    return f'image_derivatives:{name}'
+
+
+def generate_derivatives(name, overwrite=False):
+    """Write every derivative of ``name``, returns the widths produced"""
+    from PIL import Image, ImageOps
+
+    with default_storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    widths = [width for width in derivative_widths() if width < image.width]
+    for width in widths:
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for extension, (image_format, options) in FORMATS.items():
+            target = derivative_name(name, width, extension)
+            if default_storage.exists(target):
+                if not overwrite:
+                    continue
+                default_storage.delete(target)
+            frame = resized
+            if image_format == 'JPEG' and frame.mode not in ('RGB', 'L'):
+                frame = frame.convert('RGB')
+            buffer = BytesIO()
+            frame.save(buffer, image_format, **options)
+            default_storage.save(target, ContentFile(buffer.getvalue()))
+    return widths
+
+
+def available_widths(name):
+    """Widths with both derivatives in storage, cached per image"""
+    widths = cache.get(_widths_key(name))
+    if widths is None:
+        widths = [
+            width for width in derivative_widths()
+            if all(default_storage.exists(derivative_name(name, width, ext)) for ext in FORMATS)
+        ]
+        # Re-check soon while nothing has been generated yet.
+        timeout = getattr(settings, 'IMAGE_DERIVATIVE_CACHE_TIMEOUT', 3600) if widths else 60
+        cache.set(_widths_key(name), widths, timeout)
+    return widths
+
+
+def forget_widths(name):
+    cache.delete(_widths_key(name))
+
+
+def srcset(name, extension):
+    return ', '.join(
+        f'{default_storage.url(derivative_name(name, width, extension))} {width}w'
+        for width in available_widths(name)
+    )
+
+
+def image_changed(instance, field_name):
+    """Whether ``field_name`` holds a different file than when the instance was loaded"""
+    original = getattr(instance, '_original_images', {}).get(field_name)
+    return getattr(instance, field_name).name != original
+
+
+def remember_images(instance, *field_names):
+    # Read from __dict__ so deferred fields aren't loaded one by one.
+    instance._original_images = {
+        field_name: getattr(instance.__dict__.get(field_name), 'name', instance.__dict__.get(field_name))
+        for field_name in field_names
+    }
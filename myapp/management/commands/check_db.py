@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.db import check_connection
+
+
+class Command(BaseCommand):
+    help = 'Check each configured database is reachable and tuned (SQLite pragmas, Postgres pooling)'
+
+    def handle(self, *args, **options):
+        failed = 0
+        for alias in connections:
+            connection = connections[alias]
+            try:
+                problems = check_connection(connection)
+            except Exception as exc:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'{alias}: cannot connect ({exc})'))
+                continue
+
+            details = [connection.vendor, str(connection.settings_dict['NAME'])]
+            if connection.vendor == 'postgresql':
+                pool = connection.settings_dict['OPTIONS'].get('pool')
+                details.append('pooled' if pool else f"CONN_MAX_AGE={connection.settings_dict['CONN_MAX_AGE']}")
+            if problems:
+                failed += 1
+                for name, expected, actual in problems:
+                    self.stdout.write(self.style.ERROR(f'{alias}: {name} is {actual}, expected {expected}'))
+            else:
+                self.stdout.write(f"{alias}: OK ({', '.join(details)})")
+
+        if failed:
+            raise CommandError(f'{failed} databases failed the check.')
+        self.stdout.write(self.style.SUCCESS('All databases OK.'))
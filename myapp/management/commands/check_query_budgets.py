@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.models import Post
+from myapp.testing import QueryBudgetExceeded, measure_view
+
+
+class Command(BaseCommand):
+    help = 'Render the main views with cold caches and check them against myapp.testing.QUERY_BUDGETS'
+
+    def handle(self, *args, **options):
+        post = Post.objects.filter(status='published').select_related('author').order_by('-created_at').first()
+        if post is None:
+            raise CommandError('Needs at least one published post.')
+        # Profiles are only shown to staff
+        staff = get_user_model().objects.filter(is_active=True, is_staff=True).order_by('pk').first()
+        if staff is None:
+            raise CommandError('Needs an active staff user.')
+
+        # (view name, URL kwargs, logged-in user)
+        checks = [
+            ('myapp:home', None, None),
+            ('myapp:all_posts', None, None),
+            ('myapp:post_detail', {'slug': post.slug}, None),
+            ('members:profile', {'username': post.author.username}, staff),
+        ]
+        failed = 0
+        for view_name, kwargs, user in checks:
+            try:
+                response, recorder = measure_view(view_name, kwargs, user=user)
+            except QueryBudgetExceeded as exc:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'{view_name}: {exc}'))
+                continue
+            if response.status_code != 200:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'{view_name}: status {response.status_code}'))
+            else:
+                self.stdout.write(f'{view_name}: {recorder.report()}')
+
+        if failed:
+            raise CommandError(f'{failed} views failed their budget.')
+        self.stdout.write(self.style.SUCCESS('All views within budget.'))
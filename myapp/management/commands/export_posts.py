@@ -0,0 +1,32 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp import transfer
+from myapp.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Stream posts to a JSONL or CSV file (or stdout), for import_posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help='Output file, "-" for stdout (default)')
+        parser.add_argument('--format', choices=transfer.FORMATS, help='Defaults to the file extension, else jsonl')
+        parser.add_argument('--status', choices=[value for value, _ in Post.STATUS_CHOICES], help='Only posts with this status')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or (transfer.guess_format(path) if path != '-' else 'jsonl')
+        if fmt not in transfer.FORMATS:
+            raise CommandError(f'Unsupported format {fmt!r}, use --format')
+
+        posts = Post.objects.all()
+        if options['status']:
+            posts = posts.filter(status=options['status'])
+        records = transfer.export_records(posts)
+        if path == '-':
+            count = transfer.WRITERS[fmt](records, sys.stdout)
+        else:
+            with open(path, 'w', encoding='utf-8', newline='') as stream:
+                count = transfer.WRITERS[fmt](records, stream)
+        self.stderr.write(self.style.SUCCESS(f'Exported {count} posts.'))
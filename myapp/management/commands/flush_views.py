@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from myapp.counters import flush_views
+
+
+class Command(BaseCommand):
+    help = (
+        'Write buffered post views to the database: the shared buffer with VIEW_COUNT_BUFFER = "cache", '
+        'only this process\'s own with "memory" (each web process flushes its buffer itself)'
+    )
+
+    def handle(self, *args, **options):
+        flushed = flush_views()
+        self.stdout.write(self.style.SUCCESS(f'Flushed {flushed} buffered views.'))
+        if getattr(settings, 'VIEW_COUNT_BUFFER', 'memory') != 'cache':
+            self.stdout.write(
+                'VIEW_COUNT_BUFFER is "memory": views buffered by the web processes are flushed by them, '
+                f'every VIEW_COUNT_FLUSH_INTERVAL ({getattr(settings, "VIEW_COUNT_FLUSH_INTERVAL", 10)}s).'
+            )
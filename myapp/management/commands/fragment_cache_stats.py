@@ -0,0 +1,27 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.caches import is_shared
+from myapp.templatetags.fragment_cache import get_fragment_stats, reset_fragment_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Show template fragment cache hits and misses per fragment. Needs a shared cache (CACHE_URL); '
+        'with a per-process cache, use the cache-stats page of a running web process'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Clear the counters afterwards')
+
+    def handle(self, *args, **options):
+        if not is_shared(settings.CACHES['default']):
+            raise CommandError(
+                'The default cache is per process, so this command would only see its own empty counters. '
+                'Set CACHE_URL, or read /cache-stats/ from the web process.'
+            )
+        self.stdout.write(json.dumps(get_fragment_stats(), indent=2))
+        if options['reset']:
+            reset_fragment_stats()
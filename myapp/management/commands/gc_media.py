@@ -0,0 +1,99 @@
+import os
+import time
+
+from django.apps import apps
+from django.core.files.storage import storages
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+from django.template.defaultfilters import filesizeformat
+
+from core.storage import BLOB_DIR, ContentAddressableStorage
+from myapp.images import DERIVATIVE_DIR, FORMATS, derivative_name, derivative_widths
+
+
+def file_fields():
+    for model in apps.get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, models.FileField):
+                yield model, field
+
+
+def referenced_names():
+    """Every name a FileField points to, and the image derivatives of those names"""
+    names = set()
+    for model, field in file_fields():
+        values = model._default_manager.exclude(**{field.name: ''}).values_list(field.name, flat=True)
+        names.update(name for name in values.iterator() if name)
+    names.update(
+        derivative_name(name, width, extension)
+        for name in list(names)
+        for width in derivative_widths()
+        for extension in FORMATS
+    )
+    return names
+
+
+def managed_prefixes():
+    """Directories only FileFields upload to; CKEditor's uploads are left alone"""
+    prefixes = {f'{DERIVATIVE_DIR}/'}
+    for _, field in file_fields():
+        if isinstance(field.upload_to, str) and field.upload_to:
+            prefixes.add(field.upload_to.split('%')[0])
+    return tuple(prefixes)
+
+
+class Command(BaseCommand):
+    help = (
+        'Link existing media into the content-addressed store, then delete uploads no model refers to '
+        'and blobs nothing links to'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be done')
+        parser.add_argument(
+            '--min-age', type=float, default=24,
+            help='Hours an unreferenced upload must be old before it is deleted (default: 24)',
+        )
+
+    def handle(self, *args, **options):
+        storage = storages['default']
+        if not isinstance(storage, ContentAddressableStorage):
+            raise CommandError('The default storage is not core.storage.ContentAddressableStorage.')
+        dry_run = options['dry_run']
+        cutoff = time.time() - options['min_age'] * 3600
+
+        referenced, prefixes = referenced_names(), managed_prefixes()
+        orphans, adopted, shared = 0, 0, 0
+        for name in list(storage.names()):
+            path = storage.path(name)
+            if name.startswith(prefixes) and name not in referenced and os.stat(path).st_mtime < cutoff:
+                orphans += 1
+                self.stdout.write(f'Unreferenced: {name}')
+                if not dry_run:
+                    storage.delete(name)
+            elif os.stat(path).st_nlink == 1:
+                adopted += 1
+                if not dry_run:
+                    shared += storage.adopt(name)
+
+        blobs, freed = 0, 0
+        for path, references in storage.blobs():
+            if not references:
+                blobs += 1
+                freed += os.path.getsize(path)
+                if not dry_run:
+                    os.remove(path)
+        # Left behind by uploads that crashed half-way
+        temporary = os.path.join(storage.location, BLOB_DIR, 'tmp')
+        if not dry_run and os.path.isdir(temporary):
+            for filename in os.listdir(temporary):
+                path = os.path.join(temporary, filename)
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+
+        verb = 'Would delete' if dry_run else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {orphans} unreferenced uploads and {blobs} unused blobs ({filesizeformat(freed)}); '
+            f'{"would link" if dry_run else "linked"} {adopted} existing files into the store'
+            + ('' if dry_run else f', {shared} of them duplicates') + '.'
+        ))
@@ -0,0 +1,41 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from members.models import CustomUser
+from myapp import tasks
+from myapp.images import forget_widths, generate_derivatives
+from myapp.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP/JPEG derivatives for existing featured images and profile pictures'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--overwrite', action='store_true', help='Regenerate derivatives that already exist')
+        parser.add_argument('--queue', action='store_true', help='Hand the images to the Celery workers instead')
+
+    def handle(self, *args, **options):
+        names = set(Post.objects.exclude(featured_image='').values_list('featured_image', flat=True))
+        names |= set(CustomUser.objects.exclude(profile_picture='').values_list('profile_picture', flat=True))
+        names = sorted(name for name in names if default_storage.exists(name))
+
+        if options['queue']:
+            for name in names:
+                tasks.generate_image_derivatives.delay(name, overwrite=options['overwrite'])
+            self.stdout.write(self.style.SUCCESS(f'Queued {len(names)} images.'))
+            return
+
+        failed = 0
+        for name in names:
+            try:
+                widths = generate_derivatives(name, options['overwrite'])
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f'{name}: {exc}')
+            else:
+                forget_widths(name)
+                self.stdout.write(f'{name}: {len(widths)} widths')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {len(names) - failed} images, {failed} failed.'
+        ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp import transfer
+
+
+class Command(BaseCommand):
+    help = 'Create or update posts from a JSONL or CSV file (see export_posts), resuming an interrupted run'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import')
+        parser.add_argument('--format', choices=transfer.FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, default=transfer.CHUNK_SIZE, help='Records per transaction')
+        parser.add_argument('--default-author', help='Username for records without a known author')
+        parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and start from the top')
+        parser.add_argument(
+            '--skip-related', action='store_true',
+            help="Don't rebuild related posts afterwards (run rebuild_related_posts later)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = transfer.import_posts(
+                options['path'],
+                fmt=options['format'],
+                chunk_size=options['chunk_size'],
+                default_author=options['default_author'],
+                restart=options['restart'],
+                rebuild_related=not options['skip_related'],
+                log=self.stdout.write,
+            )
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.imported} posts imported, {result.skipped} records skipped '
+            f'(finished {result.finished_at:%Y-%m-%d %H:%M}; --restart to import again).'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from members import stats
+
+
+class Command(BaseCommand):
+    help = "Recompute every author's materialized statistics from their posts and follows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Authors recomputed per transaction')
+
+    def handle(self, *args, **options):
+        count = stats.rebuild(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt statistics for {count} authors.'))
@@ -0,0 +1,20 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from myapp import feed
+
+
+class Command(BaseCommand):
+    help = "Refill every user's feed from the authors they follow"
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', help='Only these users (default: everyone)')
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['usernames']:
+            user_ids = list(get_user_model().objects.filter(
+                username__in=options['usernames']
+            ).values_list('pk', flat=True))
+        count = feed.rebuild(user_ids)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {count} feed entries.'))
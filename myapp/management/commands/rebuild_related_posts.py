@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from myapp import related
+
+
+class Command(BaseCommand):
+    help = 'Recompute the related-posts lists of every published post'
+
+    def handle(self, *args, **options):
+        count = related.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored up to {related.related_count()} related posts for {count} posts.'
+        ))
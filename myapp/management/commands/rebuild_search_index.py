@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from myapp.models import Post
+from myapp.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for published posts'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        posts = Post.objects.filter(status='published').iterator(chunk_size=500)
+        count = backend.rebuild(posts)
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {count} posts with {backend.__class__.__name__}.'
+        ))
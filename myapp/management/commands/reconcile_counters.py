@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from myapp.counters import reconcile_post_counters
+
+
+class Command(BaseCommand):
+    help = 'Backfill or repair Post.like_count and Post.comment_count'
+
+    def handle(self, *args, **options):
+        fixed = reconcile_post_counters()
+        self.stdout.write(self.style.SUCCESS(f'Reconciled counters on {fixed} posts.'))
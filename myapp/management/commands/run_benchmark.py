@@ -0,0 +1,47 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Time the public myapp/members pages and print p50/p95/p99 and queries per request as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Timed requests per scenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per scenario first')
+        parser.add_argument('--scenario', action='append', help='Only run these scenarios (repeatable)')
+        parser.add_argument('--url', help='Base URL of a running server; default is in-process via the test client')
+        parser.add_argument('--concurrency', type=int, default=1, help='Parallel requests in --url mode')
+        parser.add_argument('--cold', action='store_true', help='In-process: disable the cache for every request')
+        parser.add_argument('--output', help='Also write the JSON report to this file')
+        parser.add_argument('--compare', help='Earlier JSON report to show percentage changes against')
+
+    def handle(self, *args, **options):
+        scenarios = benchmark.default_scenarios()
+        if not scenarios:
+            raise CommandError('No published posts; run seed_benchmark first.')
+        if options['scenario']:
+            known = {scenario.name for scenario in scenarios}
+            unknown = set(options['scenario']) - known
+            if unknown:
+                raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))} (have {", ".join(sorted(known))})')
+            scenarios = [scenario for scenario in scenarios if scenario.name in options['scenario']]
+
+        report = benchmark.run(
+            scenarios,
+            requests=options['requests'],
+            warmup=options['warmup'],
+            base_url=options['url'],
+            concurrency=options['concurrency'],
+            cold=options['cold'],
+        )
+        if options['compare']:
+            report['change_pct'] = benchmark.compare(report, benchmark.load_report(options['compare']))
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+        self.stdout.write(output)
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from myapp import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Create (or with --clear, remove) synthetic benchmark data'
+
+    def add_arguments(self, parser):
+        for kind, default in benchmark.DEFAULT_SCALE.items():
+            parser.add_argument(f'--{kind}', type=int, default=default, help=f'Number of {kind} (default {default})')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk insert')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for repeatable data')
+        parser.add_argument('--clear', action='store_true', help='Delete existing benchmark data first')
+        parser.add_argument('--clear-only', action='store_true', help='Delete benchmark data and stop')
+
+    def handle(self, *args, **options):
+        if options['clear'] or options['clear_only']:
+            benchmark.clear()
+            self.stdout.write('Removed existing benchmark data.')
+            if options['clear_only']:
+                return
+
+        scale = {kind: options[kind] for kind in benchmark.DEFAULT_SCALE}
+        created = benchmark.seed(
+            scale,
+            batch_size=options['batch_size'],
+            seed_value=options['seed'],
+            log=lambda step: self.stdout.write(f'Creating {step}...'),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            'Created ' + ', '.join(f'{count} {kind}' for kind, count in created.items()) + '.'
+        ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.models import NewsletterIssue, Post
+from myapp.newsletter import create_issue, deliver_issue
+
+
+class Command(BaseCommand):
+    help = 'Send the newsletter issue for a post, or resume every unfinished issue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slug', nargs='?', help='Published post to send (creates its issue if needed)')
+        parser.add_argument('--batch-size', type=int, help='Subscribers per batch (default NEWSLETTER_BATCH_SIZE)')
+        parser.add_argument('--rate', type=float, help='Messages per second (default NEWSLETTER_RATE_LIMIT)')
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches; rerun to resume')
+
+    def handle(self, *args, **options):
+        if options['slug']:
+            post = Post.objects.filter(slug=options['slug'], status='published').first()
+            if post is None:
+                raise CommandError(f'No published post with slug "{options["slug"]}".')
+            issues = [create_issue(post)]
+        else:
+            issues = NewsletterIssue.objects.exclude(status='sent').order_by('pk')
+
+        for issue in issues:
+            sent = deliver_issue(
+                issue,
+                batch_size=options['batch_size'],
+                rate=options['rate'],
+                max_batches=options['max_batches'],
+            )
+            self.stdout.write(
+                f'{issue.subject}: sent {sent} (checkpoint at subscriber {issue.last_subscriber_id}, {issue.status})'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Done.'))
@@ -0,0 +1,36 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.routers import replica_aliases
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database onto each SQLite replica (for local replica setups)'
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('Only SQLite replicas are copied; other databases replicate themselves.')
+        aliases = replica_aliases()
+        if not aliases:
+            raise CommandError('No replicas configured; set DATABASE_REPLICA_URLS.')
+
+        primary.ensure_connection()
+        for alias in aliases:
+            replica = connections[alias]
+            if replica.vendor != 'sqlite':
+                self.stdout.write(f'{alias}: skipped ({replica.vendor})')
+                continue
+            replica.close()
+            target = sqlite3.connect(replica.settings_dict['NAME'])
+            try:
+                # The online backup API copies a consistent snapshot while
+                # the primary stays writable.
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(f"{alias}: copied to {replica.settings_dict['NAME']}")
+
+        self.stdout.write(self.style.SUCCESS(f'Synced {len(aliases)} replicas.'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from myapp import trending
+from myapp.counters import flush_views
+
+
+class Command(BaseCommand):
+    help = 'Recompute the trending and "this week" lists, site-wide and per category'
+
+    def handle(self, *args, **options):
+        flush_views()
+        count = trending.update()
+        self.stdout.write(self.style.SUCCESS(f'Stored {count} trending entries.'))
@@ -0,0 +1,237 @@
+import hashlib
+import logging
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.middleware.csrf import _unmask_cipher_token, get_token
+from django.urls import Resolver404, resolve
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from . import generations
+from .counters import record_view
+from .models import Post
+from .queries import record_queries
+
+logger = logging.getLogger('myapp.queries')
+
+CSRF_PLACEHOLDER = '__page_cache_csrf_token__'
+MASKED_TOKEN_RE = re.compile(r'\b[a-zA-Z0-9]{64}\b')
+CACHED_VIEWS = ('myapp:home', 'myapp:all_posts', 'myapp:post_detail', 'myapp:category_posts')
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Full-page cache for anonymous GET requests to the public post pages.
+
+    Pages are keyed on the full URL plus the generation counters they
+    depend on (see myapp.generations): saving a post only invalidates its
+    own detail page, its category page and the sitewide listings. Cached
+    pages carry an ETag of their content, and If-None-Match requests get
+    a 304 without touching the view. There is no Last-Modified: comments
+    and likes change a page without changing any post's updated_at.
+    Detail hits served from the cache are still counted through the view
+    counter.
+
+    CSRF tokens are swapped for a placeholder before a page is stored and
+    a token for the current visitor is put back when it is served.
+    Must come after the CSRF, authentication and message middleware.
+    Under ASGI the lookup and the store, which query the database, run
+    through sync_to_async.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', 300)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        scope, key, cached = self.lookup(request)
+        if cached is not None:
+            return cached
+        response = self.get_response(request)
+        if scope is not None:
+            self.store(request, response, scope, key)
+        return response
+
+    async def __acall__(self, request):
+        scope, key, cached = await sync_to_async(self.lookup)(request)
+        if cached is not None:
+            return cached
+        response = await self.get_response(request)
+        if scope is not None:
+            await sync_to_async(self.store)(request, response, scope, key)
+        return response
+
+    def lookup(self, request):
+        """(scope, cache key, cached response or None); all None for uncached requests"""
+        scope = self.get_scope(request)
+        if scope is None:
+            return None, None, None
+        key = self.cache_key(request, scope)
+        entry = cache.get(key)
+        if entry is None:
+            return scope, key, None
+        if entry['post_id']:
+            record_view(entry['post_id'])
+        return scope, key, self.cached_response(request, entry)
+
+    def store(self, request, response, scope, key):
+        if self.should_store(request, response):
+            entry = self.make_entry(request, response, scope)
+            cache.set(key, entry, self.timeout)
+            self.set_validators(response, entry)
+            response['X-Page-Cache'] = 'MISS'
+
+    def get_scope(self, request):
+        """
+        Return (generation names, published posts shown on the page,
+        whether it's a detail page), or None when the request mustn't be
+        served from the cache.
+        """
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        # Resolved first so other paths (static files) never touch the session
+        if match.view_name not in CACHED_VIEWS:
+            return None
+        if request.user.is_authenticated or len(get_messages(request)):
+            return None
+
+        published = Post.objects.filter(status='published')
+        if match.view_name == 'myapp:post_detail':
+            slug = match.kwargs['slug']
+            return [generations.post_generation(slug)], published.filter(slug=slug), True
+        if match.view_name == 'myapp:category_posts':
+            slug = match.kwargs['slug']
+            return [generations.category_generation(slug)], published.filter(category__slug=slug), False
+        if match.view_name in ('myapp:home', 'myapp:all_posts'):
+            return [generations.POSTS, generations.CATEGORIES, generations.COMMENTS], published, False
+        return None
+
+    def cache_key(self, request, scope):
+        names, _, _ = scope
+        generation = ':'.join(str(value) for _, value in sorted(generations.get_generations(names).items()))
+        url = hashlib.md5(request.get_full_path().encode(), usedforsecurity=False).hexdigest()
+        return f'page:{request.method}:{url}:{generation}'
+
+    def should_store(self, request, response):
+        session = getattr(request, 'session', None)
+        return (
+            response.status_code == 200 and
+            not response.streaming and
+            not response.cookies and
+            not (session is not None and session.modified)
+        )
+
+    def make_entry(self, request, response, scope):
+        _, posts, is_detail = scope
+        content = response.content.decode(response.charset)
+        secret = request.META.get('CSRF_COOKIE')
+        if secret:
+            content = MASKED_TOKEN_RE.sub(
+                lambda m: CSRF_PLACEHOLDER if _unmask_cipher_token(m.group()) == secret else m.group(),
+                content,
+            )
+
+        post_id = posts.values_list('pk', flat=True).first() if is_detail else None
+
+        return {
+            'content': content,
+            'content_type': response['Content-Type'],
+            'etag': quote_etag(hashlib.md5(content.encode(), usedforsecurity=False).hexdigest()),
+            'post_id': post_id,
+        }
+
+    def set_validators(self, response, entry):
+        response['ETag'] = entry['etag']
+
+    def cached_response(self, request, entry):
+        response = get_conditional_response(request, etag=entry['etag'])
+        if response is None:
+            content = entry['content']
+            if CSRF_PLACEHOLDER in content:
+                content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+            response = HttpResponse(content, content_type=entry['content_type'])
+        self.set_validators(response, entry)
+        response['X-Page-Cache'] = 'HIT'
+        return response
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Records the SQL each request runs (see myapp.queries) and reports it
+    in a Server-Timing header: ``db`` with the query count and time, and
+    ``app`` for the whole request. N+1 patterns, and requests over
+    QUERY_COUNT_WARNING queries, are logged to ``myapp.queries``.
+
+    Counting and fingerprinting are cheap enough to leave on; tracing
+    each query back to its template line walks the stack, so it follows
+    QUERY_INSTRUMENTATION_ORIGINS (DEBUG by default). Put it first so the
+    session and auth queries are included.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSTRUMENTATION', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.origins = getattr(settings, 'QUERY_INSTRUMENTATION_ORIGINS', settings.DEBUG)
+        self.warning_count = getattr(settings, 'QUERY_COUNT_WARNING', 50)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with record_queries(origins=self.origins) as recorder:
+            response = self.get_response(request)
+        return self.report(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        # Connections are per thread: wrap the ones of the thread that
+        # runs this request's sync_to_async (and a*() ORM) calls.
+        started = time.perf_counter()
+        recording = record_queries(origins=self.origins)
+        recorder = await sync_to_async(recording.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(recording.__exit__)(None, None, None)
+        return self.report(request, response, recorder, started)
+
+    def report(self, request, response, recorder, started):
+        elapsed = time.perf_counter() - started
+        request.query_stats = recorder
+
+        timing = (
+            f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries", '
+            f'app;dur={elapsed * 1000:.1f}'
+        )
+        if response.has_header('Server-Timing'):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response['Server-Timing'] = timing
+
+        if recorder.n_plus_ones() or recorder.count > self.warning_count:
+            logger.warning('%s %s: %s', request.method, request.get_full_path(), recorder.report())
+        return response
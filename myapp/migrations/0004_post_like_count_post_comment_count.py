@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-17 04:18
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Post = apps.get_model('myapp', 'Post')
+    Comment = apps.get_model('myapp', 'Comment')
+    Like = apps.get_model('myapp', 'Like')
+
+    likes = Like.objects.filter(post=OuterRef('pk')).values('post').annotate(n=Count('id')).values('n')
+    comments = Comment.objects.filter(
+        post=OuterRef('pk'), is_approved=True
+    ).values('post').annotate(n=Count('id')).values('n')
+    Post.objects.update(
+        like_count=Coalesce(Subquery(likes), 0),
+        comment_count=Coalesce(Subquery(comments), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0003_comment_guest_email_comment_guest_name_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-comment_count'], name='myapp_post_comment_3ceb54_idx'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+from html import unescape
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Post = apps.get_model('myapp', 'Post')
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE IF NOT EXISTS myapp_post_search USING fts5('
+        "title, tags, excerpt, content, tokenize = 'porter unicode61')"
+    )
+    for post in Post.objects.filter(status='published').iterator():
+        tags = ' '.join(tag.strip() for tag in post.tags.split(',') if tag.strip())
+        schema_editor.execute(
+            'INSERT INTO myapp_post_search (rowid, title, tags, excerpt, content) '
+            'VALUES (%s, %s, %s, %s, %s)',
+            [
+                post.pk,
+                post.title,
+                tags,
+                unescape(strip_tags(post.excerpt or '')),
+                unescape(strip_tags(post.content or '')),
+            ],
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS myapp_post_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0004_post_like_count_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
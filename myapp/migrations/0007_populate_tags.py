@@ -0,0 +1,49 @@
+from django.db import migrations
+from django.utils.text import slugify
+
+
+def populate_tags(apps, schema_editor):
+    Post = apps.get_model('myapp', 'Post')
+    Tag = apps.get_model('myapp', 'Tag')
+    PostTag = apps.get_model('myapp', 'PostTag')
+
+    tags = {}
+    links = []
+    counts = {}
+    for post in Post.objects.exclude(tags='').only('pk', 'tags', 'status').iterator():
+        seen = set()
+        for name in post.tags.split(','):
+            name = name.strip()[:50]
+            slug = slugify(name)[:60]
+            if not slug or slug in seen:
+                continue
+            seen.add(slug)
+            tags.setdefault(slug, name)
+            links.append((post.pk, slug))
+            if post.status == 'published':
+                counts[slug] = counts.get(slug, 0) + 1
+
+    Tag.objects.bulk_create(
+        [Tag(name=name, slug=slug, post_count=counts.get(slug, 0)) for slug, name in tags.items()],
+        batch_size=500,
+    )
+    tag_ids = dict(Tag.objects.values_list('slug', 'pk'))
+    PostTag.objects.bulk_create(
+        [PostTag(post_id=post_id, tag_id=tag_ids[slug]) for post_id, slug in links],
+        batch_size=500,
+    )
+
+
+def clear_tags(apps, schema_editor):
+    apps.get_model('myapp', 'Tag').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0006_tag_posttag'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_tags, clear_tags),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-17 04:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0009_relatedpost'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('likes', models.PositiveIntegerField(default=0)),
+                ('comments', models.PositiveIntegerField(default=0)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='myapp.post')),
+            ],
+            options={
+                'verbose_name_plural': 'Post activity',
+                'indexes': [models.Index(fields=['bucket'], name='myapp_posta_bucket_a26ef1_idx')],
+                'unique_together': {('post', 'bucket')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TrendingPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('trending', 'Trending'), ('week', 'This week')], max_length=10)),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='myapp.category')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trending_entries', to='myapp.post')),
+            ],
+            options={
+                'ordering': ['kind', 'category', 'rank'],
+                'indexes': [models.Index(fields=['kind', 'category', 'rank'], name='myapp_trend_kind_eac1fd_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-17 05:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0012_timelineentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsletterissue',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='newsletterissue',
+            name='last_subscriber_id',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-17 05:29
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_category_counts(apps, schema_editor):
+    Category = apps.get_model('myapp', 'Category')
+    Post = apps.get_model('myapp', 'Post')
+
+    published = Post.objects.filter(
+        category=OuterRef('pk'), status='published'
+    ).values('category').annotate(n=Count('id')).values('n')
+    Category.objects.update(post_count=Coalesce(Subquery(published), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0013_newsletterissue_claim'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_category_counts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', 'published_at', 'id'], name='post_published_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', 'views', 'id'], name='post_views_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', 'comment_count', 'id'], name='post_comments_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', 'title', 'id'], name='post_title_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['category', 'status', 'created_at', 'id'], name='post_category_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def seed_trending(apps, schema_editor):
+    """Most viewed posts as the first lists, until update_trending has activity to rank"""
+    Category = apps.get_model('myapp', 'Category')
+    Post = apps.get_model('myapp', 'Post')
+    TrendingPost = apps.get_model('myapp', 'TrendingPost')
+
+    size = getattr(settings, 'TRENDING_LIST_SIZE', 10)
+    published = Post.objects.filter(status='published')
+    scopes = [(None, published)] + [
+        (category_id, published.filter(category_id=category_id))
+        for category_id in Category.objects.values_list('pk', flat=True)
+    ]
+    entries = []
+    for category_id, posts in scopes:
+        top = posts.order_by('-views', '-id').values_list('pk', 'views')[:size]
+        for kind in ('trending', 'week'):
+            entries += [
+                TrendingPost(kind=kind, category_id=category_id, post_id=post_id, rank=rank, score=views)
+                for rank, (post_id, views) in enumerate(top)
+            ]
+    TrendingPost.objects.all().delete()
+    TrendingPost.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0014_category_post_count_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_trending, migrations.RunPython.noop),
+    ]
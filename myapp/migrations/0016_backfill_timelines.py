@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_timelines(apps, schema_editor):
+    """Each follower gets the FEED_BACKFILL newest posts of everyone they follow, as myapp.feed.backfill()"""
+    Post = apps.get_model('myapp', 'Post')
+    TimelineEntry = apps.get_model('myapp', 'TimelineEntry')
+    UserFollowing = apps.get_model('members', 'UserFollowing')
+
+    newest = getattr(settings, 'FEED_BACKFILL', 20)
+    batch_size = getattr(settings, 'FEED_FANOUT_BATCH', 1000)
+    # Authors above the fan-out limit are read on demand, never copied
+    authors = (
+        UserFollowing.objects.values('following_user')
+        .annotate(followers=Count('id'))
+        .filter(followers__lt=getattr(settings, 'FEED_FANOUT_LIMIT', 5000))
+        .values_list('following_user', flat=True)
+    )
+    batch = []
+    for author_id in authors.iterator():
+        posts = list(
+            Post.objects.filter(author_id=author_id, status='published', published_at__isnull=False)
+            .order_by('-published_at').values_list('pk', 'published_at')[:newest]
+        )
+        if not posts:
+            continue
+        follower_ids = UserFollowing.objects.filter(following_user_id=author_id).values_list('user_id', flat=True)
+        for follower_id in follower_ids.iterator():
+            batch.extend(
+                TimelineEntry(owner_id=follower_id, post_id=post_id, author_id=author_id, published_at=published_at)
+                for post_id, published_at in posts
+            )
+            if len(batch) >= batch_size:
+                TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+    TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0015_seed_trending'),
+        ('members', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
@@ -20,6 +20,8 @@ class Category(models.Model):
     slug = models.SlugField(max_length=100, unique=True)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Published posts, kept current by myapp.counters.update_category_counts()
+    post_count = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         verbose_name_plural = 'Categories'
@@ -58,6 +60,8 @@ class Post(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(null=True, blank=True)
     views = models.PositiveIntegerField(default=0)
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
 
     tags = models.CharField(max_length=200, blank=True, help_text="Enter tags separated by commas")
     
@@ -67,6 +71,13 @@ class Post(models.Model):
             models.Index(fields=['-created_at']),
             models.Index(fields=['status']),
             models.Index(fields=['is_featured']),
+            models.Index(fields=['-comment_count']),
+            # Keyset pagination (myapp.pagination): one per (status filter, sort, pk) ordering
+            models.Index(fields=['status', 'published_at', 'id'], name='post_published_keyset_idx'),
+            models.Index(fields=['status', 'views', 'id'], name='post_views_keyset_idx'),
+            models.Index(fields=['status', 'comment_count', 'id'], name='post_comments_keyset_idx'),
+            models.Index(fields=['status', 'title', 'id'], name='post_title_keyset_idx'),
+            models.Index(fields=['category', 'status', 'created_at', 'id'], name='post_category_keyset_idx'),
         ]
     
     def __str__(self):
@@ -81,23 +92,150 @@ class Post(models.Model):
             return [tag.strip() for tag in self.tags.split(',') if tag.strip()]
         return []
     
+    def get_tag_pairs(self):
+        """(name, slug) pairs for linking tags without touching the Tag table"""
+        from .tags import parse_tags
+        return parse_tags(self.tags)
+    
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
 
-        if self.status == 'published' and not self.published_at:
+        # Read by myapp.signals to announce the post to subscribers.
+        self._just_published = self.status == 'published' and not self.published_at
+        if self._just_published:
             self.published_at = timezone.now()
         
-        if not self.excerpt and self.content:
-            from django.utils.html import strip_tags
-            self.excerpt = strip_tags(self.content)[:297] + '...'
-        
+        # The excerpt, when left blank, is derived by myapp.tasks after the commit.
         super().save(*args, **kwargs)
     
     def increment_views(self):
-        """Increment post views"""
+        """Increment post views (buffered, see myapp.counters)"""
+        from .counters import record_view
+        record_view(self.pk)
         self.views += 1
-        self.save(update_fields=['views'])
+
+class TimelineEntry(models.Model):
+    """A post fanned out to one follower's feed (see myapp.feed)"""
+    owner = models.ForeignKey(User, related_name='timeline_entries', on_delete=models.CASCADE)
+    post = models.ForeignKey(Post, related_name='timeline_entries', on_delete=models.CASCADE)
+    # Copied from the post so the feed is a range read on one index
+    author = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+    published_at = models.DateTimeField()
+    
+    class Meta:
+        unique_together = ('owner', 'post')
+        indexes = [
+            models.Index(fields=['owner', '-published_at', '-post']),
+            models.Index(fields=['owner', 'author']),
+        ]
+        verbose_name_plural = 'Timeline entries'
+    
+    def __str__(self):
+        return f'{self.post} for {self.owner}'
+
+class PostImport(models.Model):
+    """Progress of an import_posts run over one file, so it can resume (see myapp.transfer)"""
+    source = models.CharField(max_length=500, unique=True)
+    position = models.PositiveBigIntegerField(default=0, help_text="Bytes of the file already imported")
+    imported = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return self.source
+
+class Tag(models.Model):
+
+    name = models.CharField(max_length=50)
+    slug = models.SlugField(max_length=60, unique=True)
+    posts = models.ManyToManyField(Post, through='PostTag', related_name='tag_set')
+    post_count = models.PositiveIntegerField(default=0)
+    
+    # Lets tag pages reuse the category page layout.
+    icon = 'tag'
+    
+    class Meta:
+        ordering = ['name']
+        indexes = [
+            models.Index(fields=['-post_count']),
+        ]
+    
+    def __str__(self):
+        return self.name
+    
+    def get_absolute_url(self):
+        return reverse('myapp:tag_posts', kwargs={'slug': self.slug})
+
+class PostTag(models.Model):
+    post = models.ForeignKey(Post, related_name='post_tags', on_delete=models.CASCADE)
+    tag = models.ForeignKey(Tag, related_name='post_tags', on_delete=models.CASCADE)
+    
+    class Meta:
+        unique_together = ('post', 'tag')
+        indexes = [
+            models.Index(fields=['tag', 'post']),
+        ]
+    
+    def __str__(self):
+        return f'{self.post} tagged {self.tag}'
+
+class RelatedPost(models.Model):
+    """A post's precomputed nearest neighbours, best first (see myapp.related)"""
+    post = models.ForeignKey(Post, related_name='related_links', on_delete=models.CASCADE)
+    related = models.ForeignKey(Post, related_name='linked_from', on_delete=models.CASCADE)
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    
+    class Meta:
+        unique_together = ('post', 'rank')
+        ordering = ['post', 'rank']
+    
+    def __str__(self):
+        return f'{self.post} -> {self.related} ({self.score:.3f})'
+
+class PostActivity(models.Model):
+    """Views, likes and comments a post got in one hourly bucket (see myapp.trending)"""
+    post = models.ForeignKey(Post, related_name='activity', on_delete=models.CASCADE)
+    bucket = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+    likes = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ('post', 'bucket')
+        indexes = [
+            models.Index(fields=['bucket']),
+        ]
+        verbose_name_plural = 'Post activity'
+    
+    def __str__(self):
+        return f'{self.post} at {self.bucket:%Y-%m-%d %H:00}'
+
+class TrendingPost(models.Model):
+    """One entry of a precomputed trending list, best first (see myapp.trending)"""
+    KIND_CHOICES = [
+        ('trending', 'Trending'),
+        ('week', 'This week'),
+    ]
+    
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    # Null for the site-wide lists
+    category = models.ForeignKey(Category, null=True, blank=True, related_name='+', on_delete=models.CASCADE)
+    post = models.ForeignKey(Post, related_name='trending_entries', on_delete=models.CASCADE)
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    
+    class Meta:
+        ordering = ['kind', 'category', 'rank']
+        indexes = [
+            models.Index(fields=['kind', 'category', 'rank']),
+        ]
+    
+    def __str__(self):
+        return f'{self.get_kind_display()} #{self.rank + 1}: {self.post}'
 
 class Comment(models.Model):
 
@@ -130,6 +268,9 @@ class Comment(models.Model):
         return f"Comment by {self.guest_name or 'Guest'} on {self.post.title}"
 
     def get_replies(self):
+        # Already loaded by myapp.comments.load_comment_thread()
+        if hasattr(self, 'thread_children'):
+            return self.thread_children
         return Comment.objects.filter(parent=self, is_approved=True)
 
 class Like(models.Model):
@@ -149,4 +290,36 @@ class Newsletter(models.Model):
     subscribed_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
-        return self.email
\ No newline at end of file
+        return self.email
+
+class NewsletterIssue(models.Model):
+    """
+    One newsletter mailing for a published post, rendered once. Delivery
+    (myapp.newsletter) checkpoints last_subscriber_id after every batch
+    so an interrupted send resumes where it stopped; claimed_at marks the
+    sender currently working on it.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+    ]
+
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, related_name='newsletter_issue')
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    # Newsletter's pk is a BigAutoField
+    last_subscriber_id = models.PositiveBigIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.subject
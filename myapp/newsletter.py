@@ -0,0 +1,182 @@
+"""
+Newsletter delivery.
+
+Each published post becomes one NewsletterIssue whose subject and body
+are rendered once. deliver_issue() then walks the active subscribers in
+primary-key order, NEWSLETTER_BATCH_SIZE at a time (keyset batches, so
+memory stays flat however long the list is), sends every batch over the
+worker's single SMTP connection, throttled to NEWSLETTER_RATE_LIMIT
+messages a second, and records the last subscriber id it reached. A
+failed or interrupted delivery picks up from that checkpoint.
+
+Only one sender works on an issue at a time, whichever worker or
+send_newsletter run gets there first. It claims the issue with a single
+conditional UPDATE on the row (claimed_at empty, or older than
+CLAIM_TIMEOUT because its sender died), renews the claim with every
+checkpoint and gives it up when it stops. A sender whose claim was taken
+over stops at its next checkpoint.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from celery.signals import worker_process_shutdown
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Newsletter, NewsletterIssue
+
+logger = logging.getLogger(__name__)
+
+CLAIM_TIMEOUT = 60 * 60
+
+_connection = None
+
+
+def get_worker_connection():
+    """The email connection this process reuses for every batch"""
+    global _connection
+    if _connection is None:
+        _connection = get_connection()
+        _connection.open()
+    return _connection
+
+
+def close_worker_connection(**kwargs):
+    global _connection
+    if _connection is not None:
+        try:
+            _connection.close()
+        finally:
+            _connection = None
+
+
+worker_process_shutdown.connect(close_worker_connection, dispatch_uid='myapp.close_newsletter_connection')
+
+
+class RateLimiter:
+    """Spaces out sends to at most ``rate`` messages per second (0 disables)"""
+
+    def __init__(self, rate, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1 / rate if rate else 0
+        self.clock = clock
+        self.sleep = sleep
+        self.next_at = clock()
+
+    def wait(self, count=1):
+        if not self.interval:
+            return
+        delay = self.next_at - self.clock()
+        if delay > 0:
+            self.sleep(delay)
+        self.next_at = max(self.next_at, self.clock()) + count * self.interval
+
+
+def create_issue(post):
+    """The post's issue, rendering it the first time"""
+    issue = NewsletterIssue.objects.filter(post=post).first()
+    if issue is not None:
+        return issue
+    body = render_to_string('myapp/email/post_announcement.txt', {
+        'post': post,
+        'post_url': settings.SITE_URL.rstrip('/') + post.get_absolute_url(),
+        'site_url': settings.SITE_URL,
+    })
+    issue, _ = NewsletterIssue.objects.get_or_create(
+        post=post, defaults={'subject': post.title, 'body': body},
+    )
+    return issue
+
+
+def subscriber_batches(after_id=0, batch_size=None):
+    """Yield lists of (id, email) for active subscribers with id > ``after_id``"""
+    batch_size = batch_size or getattr(settings, 'NEWSLETTER_BATCH_SIZE', 100)
+    while True:
+        batch = list(
+            Newsletter.objects.filter(is_active=True, pk__gt=after_id)
+            .order_by('pk')
+            .values_list('pk', 'email')[:batch_size]
+        )
+        if not batch:
+            return
+        yield batch
+        after_id = batch[-1][0]
+
+
+def deliver_issue(issue, batch_size=None, rate=None, max_batches=None):
+    """
+    Send ``issue`` to every subscriber past its checkpoint, returns the
+    number of messages sent by this call. Stops early, leaving the issue
+    in 'sending', after ``max_batches`` batches.
+    """
+    if issue.status == 'sent':
+        return 0
+    if not claim_issue(issue):
+        logger.info('Issue %s is already being delivered', issue.pk)
+        return 0
+    try:
+        return _deliver(issue, batch_size, rate, max_batches)
+    finally:
+        NewsletterIssue.objects.filter(pk=issue.pk, claimed_at=issue.claimed_at).update(claimed_at=None)
+
+
+def claim_issue(issue):
+    """
+    Make this process the issue's only sender, returns False if another
+    sender holds it. Reloads ``issue`` so delivery starts from the latest
+    checkpoint.
+    """
+    now = timezone.now()
+    claimed = NewsletterIssue.objects.filter(
+        Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - timedelta(seconds=CLAIM_TIMEOUT)),
+        pk=issue.pk, status__in=['pending', 'sending'],
+    ).update(status='sending', claimed_at=now, started_at=Coalesce('started_at', now))
+    if claimed:
+        issue.refresh_from_db()
+    return bool(claimed)
+
+
+def _deliver(issue, batch_size, rate, max_batches):
+    if rate is None:
+        rate = getattr(settings, 'NEWSLETTER_RATE_LIMIT', 0)
+    limiter = RateLimiter(rate)
+
+    sent = 0
+    for number, batch in enumerate(subscriber_batches(issue.last_subscriber_id, batch_size), 1):
+        connection = get_worker_connection()
+        messages = [
+            EmailMessage(issue.subject, issue.body, None, [email], connection=connection)
+            for _, email in batch
+        ]
+        limiter.wait(len(messages))
+        try:
+            delivered = connection.send_messages(messages) or 0
+        except Exception:
+            # Drop the connection so a retry starts with a fresh one.
+            close_worker_connection()
+            raise
+        renewed = timezone.now()
+        checkpointed = NewsletterIssue.objects.filter(pk=issue.pk, claimed_at=issue.claimed_at).update(
+            last_subscriber_id=batch[-1][0],
+            sent_count=F('sent_count') + delivered,
+            claimed_at=renewed,
+        )
+        sent += delivered
+        if not checkpointed:
+            logger.warning('Lost the claim on issue %s, another sender took over', issue.pk)
+            return sent
+        issue.last_subscriber_id, issue.claimed_at = batch[-1][0], renewed
+        if max_batches and number >= max_batches:
+            logger.info('Paused issue %s at subscriber %s', issue.pk, issue.last_subscriber_id)
+            return sent
+
+    issue.status, issue.finished_at = 'sent', timezone.now()
+    NewsletterIssue.objects.filter(pk=issue.pk, claimed_at=issue.claimed_at).update(
+        status=issue.status, finished_at=issue.finished_at,
+    )
+    logger.info('Delivered issue %s (%d messages this run)', issue.pk, sent)
+    return sent
@@ -0,0 +1,168 @@
+"""
+Keyset (cursor) pagination for list views.
+
+A page is addressed by an opaque ``cursor`` token holding the sort value
+and primary key of the row at the edge of the page it was linked from, so
+a page is a ``(sort value, pk) > (cursor)`` range read: no COUNT(*) and
+no OFFSET, however deep the page. Post has a (status, sort field, id)
+index for each of AllPostsView's sorts and a (category, status,
+created_at, id) one for category pages, so those are index range scans;
+other orderings and extra filters (tags, a category on the all-posts
+page) still work, just without a matching index. Totals shown next to a
+list come from counters (Category.post_count, Tag.post_count,
+AuthorStats). Requests that carry ``?page=N`` keep using Django's
+Paginator, so existing page-number URLs still work.
+"""
+import base64
+import json
+
+from django.db.models import Q
+from django.http import Http404
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage:
+    is_cursor = True
+
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.next_url = self.previous_url = self.first_url = None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+
+class CursorPaginator:
+    """
+    Paginates ``queryset`` on ``(ordering, pk)``.
+
+    ``ordering`` is a single model field name, optionally prefixed with
+    '-'. Rows where that field is NULL can't be placed on a keyset and
+    are left out.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.descending = ordering.startswith('-')
+        self.field_name = ordering.lstrip('-')
+        self.field = queryset.model._meta.get_field(self.field_name)
+        self.queryset = queryset.filter(**{f'{self.field_name}__isnull': False})
+        self.per_page = per_page
+
+    def encode_cursor(self, obj, direction):
+        # value_to_string keeps full precision, unlike DjangoJSONEncoder
+        # which truncates datetimes to milliseconds.
+        data = [direction, self.field.value_to_string(obj), obj.pk]
+        raw = json.dumps(data).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, value, pk = json.loads(raw)
+            if direction not in ('next', 'prev'):
+                raise ValueError(direction)
+            return direction, self.field.to_python(value), int(pk)
+        except Exception as exc:
+            raise InvalidCursor(cursor) from exc
+
+    def _ordered(self, reverse):
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        return self.queryset.order_by(f'{prefix}{self.field_name}', f'{prefix}pk'), descending
+
+    def _after(self, queryset, descending, value, pk):
+        op = 'lt' if descending else 'gt'
+        return queryset.filter(
+            Q(**{f'{self.field_name}__{op}': value}) |
+            Q(**{self.field_name: value, f'pk__{op}': pk})
+        )
+
+    def page(self, cursor=None):
+        direction, value, pk = self.decode_cursor(cursor) if cursor else ('next', None, None)
+        backwards = direction == 'prev'
+        queryset, descending = self._ordered(reverse=backwards)
+        if cursor:
+            queryset = self._after(queryset, descending, value, pk)
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+
+        return CursorPage(
+            rows,
+            has_next=has_next,
+            has_previous=has_previous,
+            next_cursor=self.encode_cursor(rows[-1], 'next') if rows and has_next else None,
+            previous_cursor=self.encode_cursor(rows[0], 'prev') if rows and has_previous else None,
+        )
+
+
+class CursorPaginationMixin:
+    """
+    Switches a ListView to cursor pagination unless ``?page=`` is given.
+
+    Views set ``cursor_ordering`` (or override get_cursor_ordering()) to
+    the field their queryset is ordered by; returning None falls back to
+    page numbers.
+    """
+    cursor_ordering = None
+    cursor_query_param = 'cursor'
+
+    def get_cursor_ordering(self):
+        return self.cursor_ordering
+
+    def _page_url(self, cursor):
+        params = self.request.GET.copy()
+        params.pop(self.page_kwarg, None)
+        params.pop(self.cursor_query_param, None)
+        if cursor:
+            params[self.cursor_query_param] = cursor
+        return f'?{params.urlencode()}'
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = self.get_cursor_ordering()
+        if (
+            ordering is None or
+            self.page_kwarg in self.request.GET or
+            self.page_kwarg in self.kwargs
+        ):
+            return super().paginate_queryset(queryset, page_size)
+        return self.paginate_by_cursor(CursorPaginator(queryset, ordering, page_size))
+
+    def paginate_by_cursor(self, paginator):
+        """Page through any paginator with a page(cursor) method returning a CursorPage"""
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_query_param))
+        except InvalidCursor:
+            raise Http404('Invalid cursor.')
+        page.first_url = self._page_url(None)
+        page.next_url = self._page_url(page.next_cursor) if page.next_cursor else None
+        page.previous_url = self._page_url(page.previous_cursor) if page.previous_cursor else None
+        return paginator, page, page.object_list, page.has_other_pages()
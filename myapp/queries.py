@@ -0,0 +1,128 @@
+"""
+Per-request SQL instrumentation.
+
+QueryRecorder is installed with ``connection.execute_wrapper()`` and
+keeps a count, the total database time and a tally per query
+fingerprint (the SQL with literals and IN-lists collapsed). When origins
+are enabled it also notes where each query came from: the innermost
+template node being rendered (template name and line) or else the
+innermost frame in project code. A fingerprint repeated at least
+QUERY_N_PLUS_ONE_THRESHOLD times from one origin is reported as an N+1.
+
+QueryInstrumentationMiddleware records every request (see
+QUERY_INSTRUMENTATION), adds a Server-Timing header and logs N+1s;
+myapp.testing builds query budget assertions on the same recorder.
+"""
+import hashlib
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\bIN \(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)', re.IGNORECASE)
+
+PROJECT_ROOT = str(Path(settings.BASE_DIR).resolve())
+SKIP_PATHS = (str(Path(__file__).resolve()), f'{Path(sys.prefix).resolve()}', 'site-packages')
+
+
+def normalize_sql(sql):
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    return ' '.join(sql.split())
+
+
+def fingerprint(sql):
+    return hashlib.md5(normalize_sql(sql).encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+def query_origin():
+    """'template.html:42' for queries issued while rendering, else 'file.py:42'"""
+    frame = sys._getframe(2)
+    code_line = None
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            token = getattr(node, 'token', None)
+            origin = getattr(node, 'origin', None)
+            if token is not None and origin is not None:
+                return f'{origin.template_name or origin.name}:{token.lineno}'
+        elif code_line is None:
+            filename = code.co_filename
+            if filename.startswith(PROJECT_ROOT) and not any(path in filename for path in SKIP_PATHS):
+                code_line = f'{Path(filename).relative_to(PROJECT_ROOT)}:{frame.f_lineno}'
+        frame = frame.f_back
+    return code_line or 'unknown'
+
+
+@dataclass
+class NPlusOne:
+    origin: str
+    count: int
+    sql: str
+
+
+class QueryRecorder:
+    """Execute wrapper that tallies the queries run through it"""
+
+    def __init__(self, origins=False, threshold=None):
+        self.origins = origins
+        self.threshold = threshold or getattr(settings, 'QUERY_N_PLUS_ONE_THRESHOLD', 3)
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.samples = {}
+        self.by_origin = defaultdict(Counter)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            key = fingerprint(sql)
+            self.fingerprints[key] += 1
+            self.samples.setdefault(key, sql)
+            if self.origins:
+                self.by_origin[key][query_origin()] += 1
+
+    def duplicates(self):
+        """{fingerprint: count} for queries that ran more than once"""
+        return {key: count for key, count in self.fingerprints.items() if count > 1}
+
+    def n_plus_ones(self):
+        found = []
+        for key, origins in self.by_origin.items():
+            for origin, count in origins.items():
+                if count >= self.threshold:
+                    found.append(NPlusOne(origin, count, self.samples[key]))
+        return sorted(found, key=lambda item: -item.count)
+
+    def report(self):
+        lines = [f'{self.count} queries in {self.duration * 1000:.1f}ms']
+        for item in self.n_plus_ones():
+            lines.append(f'  N+1 x{item.count} at {item.origin}: {normalize_sql(item.sql)[:200]}')
+        for key, count in sorted(self.duplicates().items(), key=lambda item: -item[1]):
+            where = f" ({', '.join(self.by_origin[key])})" if key in self.by_origin else ''
+            lines.append(f'  duplicate x{count}{where}: {normalize_sql(self.samples[key])[:200]}')
+        return '\n'.join(lines)
+
+
+@contextmanager
+def record_queries(origins=False, using=None):
+    """Record the queries run inside the block, on every connection unless ``using`` is given"""
+    recorder = QueryRecorder(origins=origins)
+    with ExitStack() as stack:
+        for alias in [using] if using else connections:
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+        yield recorder
@@ -0,0 +1,348 @@
+"""
+Related posts.
+
+Every published post is turned into one vector made of three L2-normalised
+blocks: TF-IDF over the title and body terms, its tags, and its category,
+each block scaled by the square root of its weight so that the dot product
+of two vectors is the weighted sum of the three cosine similarities. The
+RELATED_POSTS_COUNT best matches per post are stored in RelatedPost, so
+the detail page reads them with one indexed query.
+
+Vectors are sparse: a post only stores its non-zero columns, and scoring
+one post against the corpus only touches the corpus's non-zeros.
+
+rebuild() recomputes every list (the rebuild_related_posts command; run
+it now and then so IDF weights follow the corpus). refresh() is the
+incremental path used when a post is published, edited or withdrawn: it
+recomputes the post's own list and only those of posts whose lists it
+enters or leaves. It doesn't reread the corpus: each worker keeps the
+vectors in memory and only re-vectorizes the posts saved since it last
+used them, until a rebuild (generations.RELATED) or CORPUS_MAX_AGE makes
+it load them again.
+
+Until a post has a list (before the first rebuild, or while its refresh
+is queued) related_posts() shows the newest posts of its category, as
+the detail page did before.
+"""
+import math
+import re
+import threading
+from collections import Counter
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from . import generations
+from .models import Post, RelatedPost
+from .tags import parse_tags
+
+TOKEN_RE = re.compile(r'[a-z][a-z0-9]{2,}')
+STOP_WORDS = frozenset('''
+    about after again also and any are because been before being between both but can could did
+    does doing down during each few for from further had has have having her here hers him his how
+    into its itself just more most not now off once only other our out over own same she should some
+    such than that the their them then there these they this those through too under until very was
+    were what when where which while who whom why will with would you your yours
+'''.split())
+
+# Block weights for text, tags and category similarity
+WEIGHTS = {'text': 0.6, 'tags': 0.3, 'category': 0.1}
+MAX_TERMS = 2000
+TITLE_BOOST = 3
+BLOCK_ROWS = 512
+# Up to this many rows are scored against the sparse vectors directly
+SPARSE_QUERY_ROWS = 8
+# Saves this close to a sync are looked at again by the next one (clock skew)
+SYNC_MARGIN = timedelta(minutes=1)
+CORPUS_MAX_AGE = timedelta(hours=24)
+
+
+def related_count():
+    return getattr(settings, 'RELATED_POSTS_COUNT', 4)
+
+
+def tokenize(text):
+    return [term for term in TOKEN_RE.findall(text.lower()) if term not in STOP_WORDS]
+
+
+def post_terms(title, content):
+    terms = Counter(tokenize(strip_tags(content or '')))
+    for term in tokenize(title or ''):
+        terms[term] += TITLE_BOOST
+    return terms
+
+
+class Corpus:
+    """
+    Sparse vectors for the published posts: post id -> (columns, values).
+
+    Columns are allocated per (block, key) as they are first seen. The
+    text vocabulary and its IDF are fixed when the corpus is built; tags
+    and categories met later get new columns, so they match at once.
+    """
+
+    def __init__(self, rows):
+        # rows: (id, title, content, tags string, category id)
+        self.columns = {}
+        self.idf = {}
+        self.vectors = {}
+        self._index = None
+        self.generation = None
+        self.synced_at = timezone.now()
+
+        term_counts = [post_terms(title, content) for _, title, content, _, _ in rows]
+        document_frequency = Counter(term for terms in term_counts for term in terms)
+        self.document_count = len(rows)
+        vocabulary = [
+            term for term, df in document_frequency.most_common()
+            if df > 1 or len(rows) < 50
+        ][:MAX_TERMS]
+        for term in vocabulary:
+            column = self.columns[('text', term)] = len(self.columns)
+            self.idf[column] = math.log((1 + len(rows)) / (1 + document_frequency[term])) + 1
+        for row, terms in zip(rows, term_counts, strict=True):
+            self.vectors[row[0]] = self.vectorize(terms, row[3], row[4])
+
+    @classmethod
+    def load(cls):
+        rows = list(
+            Post.objects.filter(status='published')
+            .order_by('pk')
+            .values_list('pk', 'title', 'content', 'tags', 'category_id')
+        )
+        return cls(rows)
+
+    def _column(self, block, key):
+        column = self.columns.get((block, key))
+        if column is None and block != 'text':
+            column = self.columns[(block, key)] = len(self.columns)
+        return column
+
+    def vectorize(self, terms, tags, category_id):
+        """(columns, values) for one post, each block L2-normalised and weighted"""
+        blocks = {'text': {}, 'tags': {}, 'category': {}}
+        for term, count in terms.items():
+            column = self._column('text', term)
+            if column is not None:
+                blocks['text'][column] = (1 + math.log(count)) * self.idf[column]
+        for _, slug in parse_tags(tags):
+            blocks['tags'][self._column('tags', slug)] = 1
+        if category_id:
+            blocks['category'][self._column('category', category_id)] = 1
+
+        columns, values = [], []
+        for name, block in blocks.items():
+            norm = math.sqrt(sum(value * value for value in block.values()))
+            if norm:
+                columns.extend(block)
+                values.extend(value * math.sqrt(WEIGHTS[name]) / norm for value in block.values())
+        return np.array(columns, dtype=np.int32), np.array(values, dtype=np.float32)
+
+    def sync(self, post_ids=()):
+        """
+        Re-vectorize the posts saved since the last sync (and ``post_ids``),
+        dropping those that are no longer published.
+        """
+        since, self.synced_at = self.synced_at, timezone.now()
+        changed = Post.objects.filter(
+            Q(updated_at__gte=since - SYNC_MARGIN) | Q(pk__in=list(post_ids))
+        ).values_list('pk', 'title', 'content', 'tags', 'category_id', 'status')
+        for pk, title, content, tags, category_id, status in changed:
+            if status == 'published':
+                self.vectors[pk] = self.vectorize(post_terms(title, content), tags, category_id)
+            else:
+                self.vectors.pop(pk, None)
+            self._index = None
+        published = Post.objects.filter(status='published')
+        if published.count() != len(self.vectors):
+            # Deleted posts, or status changes made with queryset.update()
+            keep = set(published.values_list('pk', flat=True))
+            self.vectors = {pk: vector for pk, vector in self.vectors.items() if pk in keep}
+            self._index = None
+
+    def _matrix(self):
+        """(ids, position, row of each non-zero, columns, values), rebuilt after changes"""
+        if self._index is None:
+            ids = np.fromiter(self.vectors, dtype=np.int64, count=len(self.vectors))
+            vectors = list(self.vectors.values())
+            lengths = [len(columns) for columns, _ in vectors]
+            self._index = (
+                ids,
+                {post_id: index for index, post_id in enumerate(ids.tolist())},
+                np.repeat(np.arange(len(ids)), lengths),
+                np.concatenate([columns for columns, _ in vectors]) if vectors else np.zeros(0, np.int32),
+                np.concatenate([values for _, values in vectors]) if vectors else np.zeros(0, np.float32),
+            )
+        return self._index
+
+    @property
+    def ids(self):
+        return self._matrix()[0]
+
+    @property
+    def position(self):
+        return self._matrix()[1]
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def dense(self, positions):
+        """The given rows as a dense matrix"""
+        ids = self.ids
+        matrix = np.zeros((len(positions), len(self.columns)), dtype=np.float32)
+        for index, row in enumerate(positions):
+            columns, values = self.vectors[int(ids[row])]
+            matrix[index, columns] = values
+        return matrix
+
+    def similarities(self, positions):
+        """Scores of the given rows against every post, self-matches masked out"""
+        positions = np.asarray(positions)
+        _, _, rows, columns, values = self._matrix()
+        queries = self.dense(positions)
+        if len(positions) <= SPARSE_QUERY_ROWS:
+            # Only the non-zeros of the corpus are touched.
+            scores = np.stack([
+                np.bincount(rows, weights=values * query[columns], minlength=len(self)) for query in queries
+            ]).astype(np.float32)
+        else:
+            # rebuild(): a block of rows against the corpus, densified BLOCK_ROWS at a time
+            scores = np.empty((len(positions), len(self)), dtype=np.float32)
+            for start in range(0, len(self), BLOCK_ROWS):
+                end = min(start + BLOCK_ROWS, len(self))
+                scores[:, start:end] = queries @ self.dense(range(start, end)).T
+        scores[np.arange(len(positions)), positions] = -np.inf
+        return scores
+
+    def neighbours(self, positions, k):
+        """[(post id, [(related id, score), ...]), ...] for the given rows"""
+        results = []
+        ids = self.ids
+        k = min(k, len(self) - 1)
+        for start in range(0, len(positions), BLOCK_ROWS):
+            block = np.asarray(positions[start:start + BLOCK_ROWS])
+            if k <= 0:
+                results.extend((int(ids[row]), []) for row in block)
+                continue
+            scores = self.similarities(block)
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            for index, row in enumerate(block):
+                row_scores = scores[index]
+                ordered = top[index][np.argsort(-row_scores[top[index]])]
+                results.append((int(ids[row]), [
+                    (int(ids[column]), float(row_scores[column]))
+                    for column in ordered
+                    if row_scores[column] > 0
+                ]))
+        return results
+
+
+_corpus = None
+_corpus_lock = threading.RLock()
+
+
+def current_corpus(post_ids=()):
+    """
+    This process's corpus, caught up with the posts saved since it was
+    last used (and ``post_ids``). Reloaded after a rebuild anywhere, or
+    once it is CORPUS_MAX_AGE old. Call with _corpus_lock held.
+    """
+    global _corpus
+    generation = generations.get_generations([generations.RELATED])[generations.RELATED]
+    if (
+        _corpus is None or _corpus.generation != generation
+        or timezone.now() - _corpus.synced_at > CORPUS_MAX_AGE
+    ):
+        _corpus = Corpus.load()
+        _corpus.generation = generation
+    else:
+        _corpus.sync(post_ids)
+    return _corpus
+
+
+def _store(results, replace=True):
+    with transaction.atomic():
+        if replace:
+            RelatedPost.objects.filter(post_id__in=[post_id for post_id, _ in results]).delete()
+        RelatedPost.objects.bulk_create([
+            RelatedPost(post_id=post_id, related_id=related_id, rank=rank, score=score)
+            for post_id, neighbours in results
+            for rank, (related_id, score) in enumerate(neighbours)
+        ], batch_size=1000)
+
+
+def rebuild():
+    """Recompute every published post's list, returns the number of posts"""
+    global _corpus
+    with _corpus_lock:
+        corpus = Corpus.load()
+        results = corpus.neighbours(list(range(len(corpus))), related_count())
+        with transaction.atomic():
+            RelatedPost.objects.all().delete()
+            _store(results, replace=False)
+        # Every process reloads its corpus with the new vocabulary and IDF.
+        generations.bump_generation(generations.RELATED)
+        corpus.generation = generations.get_generations([generations.RELATED])[generations.RELATED]
+        _corpus = corpus
+    return len(corpus)
+
+
+def refresh(post_id):
+    """
+    Update the lists touched by ``post_id`` being published, edited or
+    withdrawn, returns the number of lists rewritten.
+    """
+    k = related_count()
+    # Lists the post is on now (it may have changed or left).
+    affected = set(RelatedPost.objects.filter(related_id=post_id).values_list('post_id', flat=True))
+    with _corpus_lock:
+        corpus = current_corpus([post_id])
+        if post_id not in corpus.position:
+            RelatedPost.objects.filter(post_id=post_id).delete()
+            return _refresh_lists(corpus, affected)
+
+        affected.add(post_id)
+        scores = corpus.similarities([corpus.position[post_id]])[0]
+        # Lists the post now beats the weakest entry of (or that aren't full).
+        weakest = dict(RelatedPost.objects.filter(rank=k - 1).values_list('post_id', 'score'))
+        ids = corpus.ids
+        for row in np.nonzero(scores > 0)[0]:
+            other = int(ids[row])
+            if scores[row] > weakest.get(other, 0):
+                affected.add(other)
+        return _refresh_lists(corpus, affected)
+
+
+def refresh_lists(post_ids):
+    """Recompute the lists of the given posts, returns how many were rewritten"""
+    if not post_ids:
+        return 0
+    with _corpus_lock:
+        return _refresh_lists(current_corpus(), post_ids)
+
+
+def _refresh_lists(corpus, post_ids):
+    positions = [corpus.position[pk] for pk in post_ids if pk in corpus.position]
+    if positions:
+        _store(corpus.neighbours(positions, related_count()))
+    return len(positions)
+
+
+def related_posts(post):
+    """
+    The stored neighbours of ``post``, in rank order, in one query; the
+    newest posts of its category while it has no list yet.
+    """
+    posts = Post.objects.filter(status='published').select_related('author', 'category')
+    related = list(posts.filter(linked_from__post=post).order_by('linked_from__rank'))
+    if not related and post.category_id:
+        related = list(
+            posts.filter(category_id=post.category_id).exclude(pk=post.pk)
+            .order_by('-created_at', '-id')[:related_count()]
+        )
+    return related
@@ -0,0 +1,165 @@
+"""
+Full-text search over published posts.
+
+On SQLite the posts are indexed in an FTS5 table (``myapp_post_search``,
+created by migration 0005) and ranked with BM25. Other databases use
+DatabaseSearchBackend, a plain icontains scan. SEARCH_BACKEND can point at
+any other BaseSearchBackend subclass.
+
+The index is kept up to date from post_save/post_delete (myapp.signals),
+and the rebuild_search_index command repopulates it from scratch.
+"""
+import re
+from collections import namedtuple
+from html import unescape
+
+from django.conf import settings
+from django.db import connection, connections, router
+from django.db.models import Q
+from django.utils.html import escape, strip_tags
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+SearchHit = namedtuple('SearchHit', ['post_id', 'rank', 'snippet'])
+
+# Control characters used to mark matches so the snippet can be escaped
+# before the <mark> tags are put in.
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def post_document(post):
+    """The searchable text of a post, with markup stripped"""
+    return {
+        'title': post.title,
+        'tags': ' '.join(post.get_tags_list()),
+        'excerpt': unescape(strip_tags(post.excerpt or '')),
+        'content': unescape(strip_tags(post.content or '')),
+    }
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet).replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
+    )
+
+
+class BaseSearchBackend:
+
+    def index(self, post):
+        raise NotImplementedError
+
+    def remove(self, post_id):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def search(self, query, limit=200):
+        """Return up to ``limit`` SearchHits, best match first"""
+        raise NotImplementedError
+
+    def rebuild(self, posts):
+        self.clear()
+        count = 0
+        for post in posts:
+            self.index(post)
+            count += 1
+        return count
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    table = 'myapp_post_search'
+    columns = ('title', 'tags', 'excerpt', 'content')
+    # BM25 weights, in column order.
+    weights = (10.0, 5.0, 2.0, 1.0)
+    snippet_tokens = 24
+
+    def index(self, post):
+        if post.status != 'published':
+            self.remove(post.pk)
+            return
+        document = post_document(post)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [post.pk])
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, {", ".join(self.columns)}) '
+                f'VALUES (%s, {", ".join(["%s"] * len(self.columns))})',
+                [post.pk] + [document[column] for column in self.columns],
+            )
+
+    def remove(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [post_id])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def match_expression(self, query):
+        # Quote every term so user input can't inject FTS5 syntax, and
+        # prefix-match the terms so partially typed words still hit.
+        terms = TOKEN_RE.findall(query)
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def search(self, query, limit=200):
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        from .models import Post
+
+        weights = ', '.join(str(weight) for weight in self.weights)
+        # Reads may be routed to a replica (see core.routers).
+        with connections[router.db_for_read(Post)].cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, bm25({self.table}, {weights}) AS rank, '
+                f"snippet({self.table}, -1, %s, %s, '…', %s) "
+                f'FROM {self.table} WHERE {self.table} MATCH %s '
+                f'ORDER BY rank LIMIT %s',
+                [MATCH_START, MATCH_END, self.snippet_tokens, expression, limit],
+            )
+            return [
+                SearchHit(post_id, rank, highlight(snippet))
+                for post_id, rank, snippet in cursor.fetchall()
+            ]
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """Unindexed fallback for databases without an FTS backend."""
+
+    def index(self, post):
+        pass
+
+    def remove(self, post_id):
+        pass
+
+    def clear(self):
+        pass
+
+    def rebuild(self, posts):
+        return 0
+
+    def search(self, query, limit=200):
+        from .models import Post
+
+        posts = Post.objects.filter(
+            Q(title__icontains=query) |
+            Q(content__icontains=query) |
+            Q(tags__icontains=query),
+            status='published'
+        ).values_list('pk', 'excerpt')[:limit]
+        return [
+            SearchHit(post_id, position, escape(excerpt))
+            for position, (post_id, excerpt) in enumerate(posts)
+        ]
+
+
+def get_search_backend():
+    backend = getattr(settings, 'SEARCH_BACKEND', None)
+    if backend:
+        return import_string(backend)()
+    if connection.vendor == 'sqlite':
+        return SQLiteFTSBackend()
+    return DatabaseSearchBackend()
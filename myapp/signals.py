@@ -0,0 +1,165 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import generations, tasks
+from .counters import adjust_like_count
+from .images import image_changed, remember_images
+from .models import Category, Comment, Like, Newsletter, Post, PostTag, RelatedPost
+from .tags import sync_post_tags, update_tag_counts
+from .stats import invalidate_site_stats
+from .trending import record_activity
+
+
+@receiver(post_save, sender=Category, dispatch_uid='myapp.stats_category_saved')
+@receiver(post_delete, sender=Category, dispatch_uid='myapp.stats_category_deleted')
+@receiver(post_save, sender=Newsletter, dispatch_uid='myapp.stats_newsletter_saved')
+@receiver(post_delete, sender=Newsletter, dispatch_uid='myapp.stats_newsletter_deleted')
+def invalidate_stats(sender, **kwargs):
+    invalidate_site_stats()
+
+
+@receiver(post_save, sender=Like, dispatch_uid='myapp.like_count_saved')
+def like_saved(sender, instance, created, **kwargs):
+    if created:
+        adjust_like_count(instance.post_id, 1)
+        record_activity({instance.post_id: 1}, 'likes')
+
+
+@receiver(post_delete, sender=Like, dispatch_uid='myapp.like_count_deleted')
+def like_deleted(sender, instance, **kwargs):
+    adjust_like_count(instance.post_id, -1)
+
+
+@receiver(post_init, sender=Comment, dispatch_uid='myapp.remember_comment_approval')
+def remember_comment_approval(sender, instance, **kwargs):
+    instance._was_approved = instance.__dict__.get('is_approved', False) and instance.pk is not None
+
+
+@receiver(post_save, sender=Comment, dispatch_uid='myapp.comment_saved')
+def comment_saved(sender, instance, **kwargs):
+    # Change in the number of approved comments: creation, approval or hiding
+    delta = int(instance.is_approved) - int(instance._was_approved)
+    instance._was_approved = instance.is_approved
+    tasks.process_comment_change.delay_on_commit(instance.post_id, delta)
+
+
+@receiver(post_delete, sender=Comment, dispatch_uid='myapp.comment_deleted')
+def comment_deleted(sender, instance, **kwargs):
+    tasks.process_comment_change.delay_on_commit(instance.post_id, -int(instance._was_approved))
+
+
+@receiver(post_save, sender=Comment, dispatch_uid='myapp.comment_activity')
+def comment_activity(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.is_approved:
+        record_activity({instance.post_id: 1}, 'comments')
+
+
+@receiver(post_save, sender=Post, dispatch_uid='myapp.sync_post_tags')
+def post_tags_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_post_tags(instance)
+
+
+@receiver(pre_delete, sender=Post, dispatch_uid='myapp.remember_post_tags')
+def remember_post_tags(sender, instance, **kwargs):
+    instance._tag_ids = list(PostTag.objects.filter(post=instance).values_list('tag_id', flat=True))
+
+
+@receiver(pre_delete, sender=Post, dispatch_uid='myapp.remember_related_lists')
+def remember_related_lists(sender, instance, **kwargs):
+    # The lists the post is on lose a slot once its rows cascade away.
+    instance._related_list_ids = list(
+        RelatedPost.objects.filter(related=instance).values_list('post_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Post, dispatch_uid='myapp.related_lists_deleted')
+def related_lists_deleted(sender, instance, **kwargs):
+    post_ids = getattr(instance, '_related_list_ids', [])
+    if post_ids:
+        tasks.refresh_related_lists.delay_on_commit(post_ids)
+
+
+@receiver(post_delete, sender=Post, dispatch_uid='myapp.post_tags_deleted')
+def post_tags_deleted(sender, instance, **kwargs):
+    update_tag_counts(getattr(instance, '_tag_ids', []))
+
+
+@receiver(post_save, sender=Category, dispatch_uid='myapp.bump_categories_saved')
+@receiver(post_delete, sender=Category, dispatch_uid='myapp.bump_categories_deleted')
+def bump_categories_generation(sender, **kwargs):
+    generations.bump_generation(generations.CATEGORIES)
+
+
+@receiver(post_init, sender=Post, dispatch_uid='myapp.remember_post_location')
+def remember_post_location(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields aren't loaded one by one.
+    instance._original_location = (
+        instance.__dict__.get('slug'),
+        instance.__dict__.get('category_id'),
+    )
+    instance._original_author_id = instance.__dict__.get('author_id')
+
+
+def _post_locations(instance):
+    """Slugs and category ids the post was and is listed under"""
+    original_slug, original_category_id = getattr(instance, '_original_location', (None, None))
+    slugs = sorted({slug for slug in (original_slug, instance.slug) if slug})
+    category_ids = sorted({pk for pk in (original_category_id, instance.category_id) if pk})
+    instance._original_location = (instance.slug, instance.category_id)
+    return slugs, category_ids
+
+
+def _post_authors(instance):
+    """Ids of the authors the post was and is by"""
+    author_ids = sorted({pk for pk in (getattr(instance, '_original_author_id', None), instance.author_id) if pk})
+    instance._original_author_id = instance.author_id
+    return author_ids
+
+
+@receiver(post_save, sender=Post, dispatch_uid='myapp.post_saved')
+def post_saved(sender, instance, raw=False, **kwargs):
+    """Queue the excerpt, search index and cache work for after the commit."""
+    if raw:
+        return
+    slugs, category_ids = _post_locations(instance)
+    just_published = getattr(instance, '_just_published', False)
+    tasks.process_saved_post.delay_on_commit(instance.pk, slugs, category_ids, announce=just_published)
+    tasks.refresh_related_posts.delay_on_commit(instance.pk)
+    tasks.refresh_author_stats.delay_on_commit(_post_authors(instance))
+    if just_published:
+        tasks.fan_out_post.delay_on_commit(instance.pk)
+        instance._just_published = False
+
+
+@receiver(post_delete, sender=Post, dispatch_uid='myapp.post_deleted')
+def post_deleted(sender, instance, **kwargs):
+    slugs, category_ids = _post_locations(instance)
+    tasks.process_deleted_post.delay_on_commit(instance.pk, slugs, category_ids)
+    tasks.refresh_author_stats.delay_on_commit(_post_authors(instance))
+
+
+@receiver(post_save, sender=Category, dispatch_uid='myapp.bump_category_page_saved')
+@receiver(post_delete, sender=Category, dispatch_uid='myapp.bump_category_page_deleted')
+def bump_category_page_generation(sender, instance, **kwargs):
+    generations.bump_generation(generations.category_generation(instance.slug))
+
+
+@receiver(post_init, sender=Post, dispatch_uid='myapp.remember_featured_image')
+def remember_featured_image(sender, instance, **kwargs):
+    remember_images(instance, 'featured_image')
+
+
+@receiver(post_save, sender=Post, dispatch_uid='myapp.featured_image_derivatives')
+def featured_image_saved(sender, instance, raw=False, **kwargs):
+    if raw or not image_changed(instance, 'featured_image'):
+        return
+    if instance.featured_image:
+        tasks.generate_image_derivatives.delay_on_commit(instance.featured_image.name, instance.slug)
+    remember_images(instance, 'featured_image')
+
+
+@receiver(post_save, sender=Newsletter, dispatch_uid='myapp.newsletter_welcome')
+def newsletter_subscribed(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        tasks.send_welcome_email.delay_on_commit(instance.pk)
@@ -0,0 +1,89 @@
+// Add some interactive effects
+document.addEventListener('DOMContentLoaded', function() {
+    // Glitch effect on 404 number
+    const errorNumber = document.querySelector('.error-number');
+    let glitchInterval;
+
+    errorNumber.addEventListener('mouseenter', function() {
+        glitchInterval = setInterval(() => {
+            this.style.textShadow = `
+                ${Math.random() * 10 - 5}px ${Math.random() * 10 - 5}px 0 #ff0000,
+                ${Math.random() * 10 - 5}px ${Math.random() * 10 - 5}px 0 #00ff00,
+                ${Math.random() * 10 - 5}px ${Math.random() * 10 - 5}px 0 #0000ff
+            `;
+        }, 50);
+    });
+
+    errorNumber.addEventListener('mouseleave', function() {
+        clearInterval(glitchInterval);
+        this.style.textShadow = '0 4px 8px rgba(37, 99, 235, 0.3)';
+    });
+
+    // Particle animation
+    const particles = document.querySelectorAll('.particle');
+    particles.forEach((particle, index) => {
+        particle.style.left = Math.random() * 100 + '%';
+        particle.style.animationDelay = Math.random() * 6 + 's';
+        particle.style.animationDuration = (Math.random() * 3 + 4) + 's';
+    });
+
+    // Search input focus enhancement
+    const searchInput = document.querySelector('.search-input');
+    if (searchInput) {
+        searchInput.addEventListener('focus', function() {
+            this.parentElement.style.transform = 'scale(1.02)';
+        });
+
+        searchInput.addEventListener('blur', function() {
+            this.parentElement.style.transform = 'scale(1)';
+        });
+    }
+
+    // Link hover effects
+    const linkItems = document.querySelectorAll('.link-item');
+    linkItems.forEach(link => {
+        link.addEventListener('mouseenter', function() {
+            const icon = this.querySelector('.link-icon');
+            icon.style.transform = 'scale(1.2) rotate(10deg)';
+        });
+
+        link.addEventListener('mouseleave', function() {
+            const icon = this.querySelector('.link-icon');
+            icon.style.transform = 'scale(1) rotate(0deg)';
+        });
+    });
+});
+
+// Konami Code Easter Egg
+let konamiCode = [];
+const konamiSequence = [
+    'ArrowUp', 'ArrowUp', 'ArrowDown', 'ArrowDown',
+    'ArrowLeft', 'ArrowRight', 'ArrowLeft', 'ArrowRight',
+    'KeyB', 'KeyA'
+];
+
+document.addEventListener('keydown', function(e) {
+    konamiCode.push(e.code);
+    if (konamiCode.length > konamiSequence.length) {
+        konamiCode.shift();
+    }
+
+    if (JSON.stringify(konamiCode) === JSON.stringify(konamiSequence)) {
+        // Easter egg activated!
+        document.body.style.animation = 'rainbow 2s infinite';
+        setTimeout(() => {
+            document.body.style.animation = '';
+            alert('🎉 Konami Code activated! You found the easter egg!');
+        }, 2000);
+    }
+});
+
+// Rainbow animation for easter egg
+const style = document.createElement('style');
+style.textContent = `
+    @keyframes rainbow {
+        0% { filter: hue-rotate(0deg); }
+        100% { filter: hue-rotate(360deg); }
+    }
+`;
+document.head.appendChild(style);
@@ -0,0 +1,226 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const postsGrid = document.getElementById('posts-grid');
+    const gridViewBtn = document.getElementById('grid-view');
+    const listViewBtn = document.getElementById('list-view');
+    const sortSelect = document.getElementById('sort-select');
+    const searchInput = document.getElementById('search-input');
+
+    let searchTimeout;
+
+    // View toggle functionality
+    gridViewBtn.addEventListener('click', function() {
+        setView('grid');
+    });
+
+    listViewBtn.addEventListener('click', function() {
+        setView('list');
+    });
+
+    function setView(viewType) {
+        // Update button states
+        document.querySelectorAll('.view-btn').forEach(btn => btn.classList.remove('active'));
+        document.getElementById(viewType + '-view').classList.add('active');
+
+        // Update grid class
+        postsGrid.className = `posts-grid ${viewType}-view`;
+
+        // Update post cards
+        document.querySelectorAll('.post-card').forEach(card => {
+            if (viewType === 'list') {
+                card.classList.add('list-view');
+            } else {
+                card.classList.remove('list-view');
+            }
+        });
+
+        // Store preference
+        localStorage.setItem('preferredView', viewType);
+    }
+
+    // Load saved view preference
+    const savedView = localStorage.getItem('preferredView');
+    if (savedView) {
+        setView(savedView);
+    }
+
+    // Sort functionality
+    sortSelect.addEventListener('change', function() {
+        const currentUrl = new URL(window.location);
+        currentUrl.searchParams.set('sort', this.value);
+        currentUrl.searchParams.delete('page'); // Reset to first page
+        window.location.href = currentUrl.toString();
+    });
+
+    // Search functionality
+    searchInput.addEventListener('input', function() {
+        clearTimeout(searchTimeout);
+        const query = this.value.trim();
+
+        searchTimeout = setTimeout(() => {
+            if (query.length >= 2 || query.length === 0) {
+                performSearch(query);
+            }
+        }, 300);
+    });
+
+    function performSearch(query) {
+        const currentUrl = new URL(window.location);
+        if (query) {
+            currentUrl.searchParams.set('search', query);
+        } else {
+            currentUrl.searchParams.delete('search');
+        }
+        currentUrl.searchParams.delete('page'); // Reset to first page
+        window.location.href = currentUrl.toString();
+    }
+
+    // Set search input value from URL
+    const urlParams = new URLSearchParams(window.location.search);
+    const searchQuery = urlParams.get('search');
+    if (searchQuery) {
+        searchInput.value = searchQuery;
+    }
+
+    // Post card click handlers
+    document.querySelectorAll('.post-card').forEach(card => {
+        card.addEventListener('click', function(e) {
+            // Don't navigate if clicking on links or buttons
+            if (e.target.tagName === 'A' || e.target.tagName === 'BUTTON' || e.target.closest('a, button')) {
+                return;
+            }
+
+            const link = this.querySelector('.post-title a');
+            if (link) {
+                window.location.href = link.href;
+            }
+        });
+    });
+
+    // Smooth scrolling for pagination
+    document.querySelectorAll('.page-btn').forEach(btn => {
+        btn.addEventListener('click', function(e) {
+            if (!this.classList.contains('active') && this.href) {
+                // Smooth scroll to top before navigation
+                window.scrollTo({
+                    top: 0,
+                    behavior: 'smooth'
+                });
+            }
+        });
+    });
+
+    // Fade-in animation for posts
+    const observerOptions = {
+        threshold: 0.1,
+        rootMargin: '0px 0px -50px 0px'
+    };
+
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach((entry, index) => {
+            if (entry.isIntersecting) {
+                setTimeout(() => {
+                    entry.target.style.opacity = '1';
+                    entry.target.style.transform = 'translateY(0)';
+                }, index * 100);
+            }
+        });
+    }, observerOptions);
+
+    // Apply fade-in to post cards
+    document.querySelectorAll('.post-card').forEach((card, index) => {
+        card.style.opacity = '0';
+        card.style.transform = 'translateY(20px)';
+        card.style.transition = 'all 0.6s ease';
+        observer.observe(card);
+    });
+
+    // Apply fade-in to other elements
+    document.querySelectorAll('.fade-in').forEach((el, index) => {
+        el.style.opacity = '0';
+        el.style.transform = 'translateY(20px)';
+        el.style.transition = `all 0.6s ease ${index * 0.1}s`;
+        observer.observe(el);
+    });
+
+    // Keyboard shortcuts
+    document.addEventListener('keydown', function(e) {
+        // Press '/' to focus search
+        if (e.key === '/' && !e.ctrlKey && !e.metaKey) {
+            e.preventDefault();
+            searchInput.focus();
+        }
+
+        // Press 'g' then 'v' to toggle grid view
+        if (e.key === 'g' && !e.ctrlKey && !e.metaKey) {
+            setTimeout(() => {
+                document.addEventListener('keydown', function gridToggle(e) {
+                    if (e.key === 'v') {
+                        setView('grid');
+                    } else if (e.key === 'l') {
+                        setView('list');
+                    }
+                    document.removeEventListener('keydown', gridToggle);
+                }, { once: true });
+            }, 100);
+        }
+    });
+
+    // Add loading states for better UX
+    window.addEventListener('beforeunload', function() {
+        document.body.style.cursor = 'wait';
+        document.querySelectorAll('a, button').forEach(el => {
+            el.style.pointerEvents = 'none';
+        });
+    });
+
+    // Stats counter animation
+    const stats = document.querySelectorAll('.stat-number');
+    const statsObserver = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                const target = entry.target;
+                const finalValue = target.textContent;
+                if (!isNaN(finalValue)) {
+                    animateCounter(target, 0, parseInt(finalValue));
+                }
+            }
+        });
+    }, { threshold: 0.5 });
+
+    stats.forEach(stat => statsObserver.observe(stat));
+
+    function animateCounter(element, start, end) {
+        const duration = 1500;
+        const startTime = performance.now();
+
+        function updateCounter(currentTime) {
+            const elapsed = currentTime - startTime;
+            const progress = Math.min(elapsed / duration, 1);
+            const current = Math.floor(start + (end - start) * progress);
+
+            element.textContent = current;
+
+            if (progress < 1) {
+                requestAnimationFrame(updateCounter);
+            }
+        }
+
+        requestAnimationFrame(updateCounter);
+    }
+
+    // Handle empty search results
+    const searchParams = new URLSearchParams(window.location.search);
+    if (searchParams.get('search') && document.querySelectorAll('.post-card').length === 0) {
+        const emptyState = document.querySelector('.empty-state');
+        if (emptyState) {
+            emptyState.innerHTML = `
+                <div class="empty-icon">
+                    <i class="fas fa-search"></i>
+                </div>
+                <h3>No Results Found</h3>
+                <p>No posts found for "${searchParams.get('search')}". Try a different search term or browse all posts.</p>
+                <a href="${window.location.pathname}" class="btn-primary-custom">Clear Search</a>
+            `;
+        }
+    }
+});
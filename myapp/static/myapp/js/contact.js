@@ -0,0 +1,154 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // FAQ Accordion functionality
+    const faqQuestions = document.querySelectorAll('.faq-question');
+    faqQuestions.forEach(question => {
+        question.addEventListener('click', function() {
+            const answer = this.nextElementSibling;
+            const isActive = this.classList.contains('active');
+
+            // Close all other FAQ items
+            faqQuestions.forEach(q => {
+                q.classList.remove('active');
+                q.nextElementSibling.classList.remove('active');
+            });
+
+            // Toggle current item
+            if (!isActive) {
+                this.classList.add('active');
+                answer.classList.add('active');
+            }
+        });
+    });
+
+    // Form validation and submission
+    const contactForm = document.getElementById('contact-form');
+    const formInputs = contactForm.querySelectorAll('input, textarea, select');
+
+    // Real-time validation
+    formInputs.forEach(input => {
+        input.addEventListener('blur', validateField);
+        input.addEventListener('input', clearError);
+    });
+
+    function validateField(e) {
+        const field = e.target;
+        const errorElement = document.getElementById(field.id + '-error');
+
+        if (!field.value.trim()) {
+            showError(field, errorElement, 'This field is required');
+            return false;
+        }
+
+        if (field.type === 'email' && !isValidEmail(field.value)) {
+            showError(field, errorElement, 'Please enter a valid email address');
+            return false;
+        }
+
+        clearError(field, errorElement);
+        return true;
+    }
+
+    function showError(field, errorElement, message) {
+        field.style.borderColor = '#ef4444';
+        field.style.background = 'rgba(239, 68, 68, 0.05)';
+        errorElement.textContent = message;
+        errorElement.style.display = 'block';
+    }
+
+    function clearError(field, errorElement) {
+        if (typeof field === 'object' && field.target) {
+            field = field.target;
+            errorElement = document.getElementById(field.id + '-error');
+        }
+
+        field.style.borderColor = '';
+        field.style.background = '';
+        if (errorElement) {
+            errorElement.style.display = 'none';
+        }
+    }
+
+    function isValidEmail(email) {
+        const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+        return emailRegex.test(email);
+    }
+
+    // Form submission
+    contactForm.addEventListener('submit', function(e) {
+        e.preventDefault();
+
+        // Validate all fields
+        let isValid = true;
+        formInputs.forEach(input => {
+            if (!validateField({target: input})) {
+                isValid = false;
+            }
+        });
+
+        if (!isValid) {
+            return;
+        }
+
+        // Show loading state
+        const submitBtn = contactForm.querySelector('.btn-send');
+        const originalText = submitBtn.innerHTML;
+        submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin me-2"></i>Sending...';
+        submitBtn.disabled = true;
+
+        // Simulate form submission (replace with actual submission logic)
+        setTimeout(() => {
+            // Reset form
+            contactForm.reset();
+
+            // Show success message
+            const successMessage = document.getElementById('form-success');
+            successMessage.style.display = 'block';
+
+            // Reset button
+            submitBtn.innerHTML = originalText;
+            submitBtn.disabled = false;
+
+            // Hide success message after 5 seconds
+            setTimeout(() => {
+                successMessage.style.display = 'none';
+            }, 5000);
+
+            // Scroll to success message
+            successMessage.scrollIntoView({
+                behavior: 'smooth',
+                block: 'center'
+            });
+        }, 2000);
+    });
+
+    // Fade-in animation
+    const observerOptions = {
+        threshold: 0.1,
+        rootMargin: '0px 0px -50px 0px'
+    };
+
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                entry.target.style.opacity = '1';
+                entry.target.style.transform = 'translateY(0)';
+            }
+        });
+    }, observerOptions);
+
+    document.querySelectorAll('.fade-in').forEach((el, index) => {
+        el.style.opacity = '0';
+        el.style.transform = 'translateY(20px)';
+        el.style.transition = `all 0.6s ease ${index * 0.1}s`;
+        observer.observe(el);
+    });
+
+    // Parallax effect for hero section
+    window.addEventListener('scroll', () => {
+        const scrolled = window.pageYOffset;
+        const hero = document.querySelector('.contact-hero');
+        if (hero) {
+            hero.style.transform = `translateY(${scrolled * 0.5}px)`;
+        }
+    });
+});
@@ -0,0 +1,204 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Enhanced post card interactions
+    document.querySelectorAll('.post-card-enhanced').forEach(card => {
+        card.addEventListener('click', function(e) {
+            // Don't navigate if clicking on links
+            if (e.target.tagName === 'A' || e.target.closest('a')) {
+                return;
+            }
+
+            const postSlug = this.dataset.postSlug;
+            if (postSlug) {
+                const postUrl = `/post/${postSlug}/`;
+
+                // Add loading state
+                this.style.opacity = '0.8';
+                this.style.transform = 'scale(0.98)';
+
+                // Navigate after a short delay for visual feedback
+                setTimeout(() => {
+                    window.location.href = postUrl;
+                }, 150);
+            }
+        });
+
+        // Enhanced hover effects
+        card.addEventListener('mouseenter', function() {
+            this.querySelector('.reading-indicator').style.transform = 'translateY(-5px)';
+        });
+
+        card.addEventListener('mouseleave', function() {
+            this.querySelector('.reading-indicator').style.transform = 'translateY(0)';
+        });
+    });
+
+    // Intersection Observer for animations
+    const observerOptions = {
+        threshold: 0.1,
+        rootMargin: '0px 0px -50px 0px'
+    };
+
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach((entry, index) => {
+            if (entry.isIntersecting) {
+                setTimeout(() => {
+                    entry.target.style.opacity = '1';
+                    entry.target.style.transform = 'translateY(0)';
+                }, index * 100);
+                observer.unobserve(entry.target);
+            }
+        });
+    }, observerOptions);
+
+    // Apply animations to all fade-in elements
+    document.querySelectorAll('.fade-in').forEach((el, index) => {
+        el.style.opacity = '0';
+        el.style.transform = 'translateY(20px)';
+        el.style.transition = `all 0.6s cubic-bezier(0.23, 1, 0.320, 1) ${index * 0.1}s`;
+        observer.observe(el);
+    });
+
+    // Stats counter animation
+    const stats = document.querySelectorAll('.stat-number');
+    const statsObserver = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                const target = entry.target;
+                const finalValue = parseInt(target.textContent) || 0;
+                animateCounter(target, 0, finalValue);
+                statsObserver.unobserve(target);
+            }
+        });
+    }, { threshold: 0.5 });
+
+    stats.forEach(stat => statsObserver.observe(stat));
+
+    function animateCounter(element, start, end) {
+        const duration = 2000;
+        const startTime = performance.now();
+
+        function updateCounter(currentTime) {
+            const elapsed = currentTime - startTime;
+            const progress = Math.min(elapsed / duration, 1);
+            const current = Math.floor(start + (end - start) * progress);
+
+            element.textContent = current;
+
+            if (progress < 1) {
+                requestAnimationFrame(updateCounter);
+            }
+        }
+
+        requestAnimationFrame(updateCounter);
+    }
+
+    // Smooth scrolling for internal links
+    document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+        anchor.addEventListener('click', function (e) {
+            e.preventDefault();
+            const target = document.querySelector(this.getAttribute('href'));
+            if (target) {
+                target.scrollIntoView({
+                    behavior: 'smooth',
+                    block: 'start'
+                });
+            }
+        });
+    });
+
+    // Enhanced newsletter form submission
+    const newsletterForm = document.querySelector('.newsletter-form');
+    if (newsletterForm) {
+        newsletterForm.addEventListener('submit', function(e) {
+            const submitBtn = this.querySelector('button[type="submit"]');
+            const originalText = submitBtn.innerHTML;
+
+            submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin me-2"></i>Subscribing...';
+            submitBtn.disabled = true;
+
+            // The form will submit normally, but we provide visual feedback
+            setTimeout(() => {
+                submitBtn.innerHTML = originalText;
+                submitBtn.disabled = false;
+            }, 3000);
+        });
+    }
+
+    // Reading time calculation enhancement
+    document.querySelectorAll('.reading-indicator').forEach(indicator => {
+        const card = indicator.closest('.post-card-enhanced');
+        const contentText = card.querySelector('.card-text').textContent;
+        const wordCount = contentText.split(/\s+/).length;
+        const readingTime = Math.ceil(wordCount / 200); // 200 words per minute
+
+        indicator.innerHTML = `<i class="fas fa-clock me-1"></i>${readingTime} min read`;
+    });
+
+    // Parallax effect for hero section
+    window.addEventListener('scroll', () => {
+        const scrolled = window.pageYOffset;
+        const hero = document.querySelector('.hero-section');
+        if (hero && scrolled < window.innerHeight) {
+            hero.style.transform = `translateY(${scrolled * 0.3}px)`;
+        }
+    });
+
+    // Auto-hide messages after 5 seconds
+    setTimeout(() => {
+        document.querySelectorAll('.alert').forEach(alert => {
+            if (window.bootstrap && window.bootstrap.Alert) {
+                const bsAlert = new window.bootstrap.Alert(alert);
+                bsAlert.close();
+            } else {
+                alert.style.opacity = '0';
+                setTimeout(() => alert.remove(), 300);
+            }
+        });
+    }, 5000);
+
+    // Keyboard shortcuts
+    document.addEventListener('keydown', function(e) {
+        // Press 'h' to go to top
+        if (e.key === 'h' && !e.ctrlKey && !e.metaKey && e.target.tagName !== 'INPUT' && e.target.tagName !== 'TEXTAREA') {
+            e.preventDefault();
+            window.scrollTo({ top: 0, behavior: 'smooth' });
+        }
+
+        // Press 'b' to go to blog posts
+        if (e.key === 'b' && !e.ctrlKey && !e.metaKey && e.target.tagName !== 'INPUT' && e.target.tagName !== 'TEXTAREA') {
+            e.preventDefault();
+            const allPostsLink = document.querySelector('a[href*="all_posts"], a[href*="blog"]');
+            if (allPostsLink) {
+                window.location.href = allPostsLink.href;
+            }
+        }
+    });
+
+    // Add loading states for better UX
+    document.addEventListener('click', function(e) {
+        if (e.target.tagName === 'A' && !e.target.getAttribute('href').startsWith('#')) {
+            e.target.style.opacity = '0.7';
+        }
+    });
+
+    // Performance: Lazy loading for images if Intersection Observer is supported
+    if ('IntersectionObserver' in window) {
+        const imageObserver = new IntersectionObserver((entries) => {
+            entries.forEach(entry => {
+                if (entry.isIntersecting) {
+                    const img = entry.target;
+                    if (img.dataset.src) {
+                        img.src = img.dataset.src;
+                        img.classList.add('loaded');
+                        imageObserver.unobserve(img);
+                    }
+                }
+            });
+        });
+
+        // Apply to any images with data-src attribute
+        document.querySelectorAll('img[data-src]').forEach(img => {
+            imageObserver.observe(img);
+        });
+    }
+});
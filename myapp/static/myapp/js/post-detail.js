@@ -0,0 +1,64 @@
+function likePost(postId) {
+    fetch(document.querySelector('.like-btn').dataset.url, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
+        },
+        body: 'post_id=' + postId
+    })
+    .then(response => response.json())
+    .then(data => {
+        const likeBtn = document.querySelector('.like-btn');
+        const likesCount = document.getElementById('likes-count');
+
+        if (data.liked) {
+            likeBtn.classList.add('liked');
+        } else {
+            likeBtn.classList.remove('liked');
+        }
+
+        likesCount.textContent = data.likes_count;
+    })
+    .catch(error => console.error('Error:', error));
+}
+
+function toggleReplyForm(commentId) {
+    const replyForm = document.getElementById(`reply-form-${commentId}`);
+    const allReplyForms = document.querySelectorAll('.reply-form');
+
+    // Hide all other reply forms
+    allReplyForms.forEach(form => {
+        if (form.id !== `reply-form-${commentId}`) {
+            form.classList.remove('active');
+        }
+    });
+
+    // Toggle current form
+    if (replyForm.classList.contains('active')) {
+        replyForm.classList.remove('active');
+    } else {
+        replyForm.classList.add('active');
+        // Focus on the content textarea
+        const textarea = replyForm.querySelector('.reply-content');
+        if (textarea) {
+            textarea.focus();
+        }
+    }
+}
+
+function hideReplyForm(commentId) {
+    const replyForm = document.getElementById(`reply-form-${commentId}`);
+    replyForm.classList.remove('active');
+}
+
+// Auto-resize textareas
+document.addEventListener('DOMContentLoaded', function() {
+    const textareas = document.querySelectorAll('.reply-content');
+    textareas.forEach(textarea => {
+        textarea.addEventListener('input', function() {
+            this.style.height = 'auto';
+            this.style.height = this.scrollHeight + 'px';
+        });
+    });
+});
@@ -0,0 +1,76 @@
+const postForm = document.getElementById('post-form');
+
+// Image preview functionality
+document.getElementById(postForm.dataset.imageField).addEventListener('change', function(e) {
+    const file = e.target.files[0];
+    const preview = document.getElementById('image-preview');
+
+    if (file) {
+        const reader = new FileReader();
+        reader.onload = function(e) {
+            preview.src = e.target.result;
+            preview.classList.remove('d-none');
+        };
+        reader.readAsDataURL(file);
+    }
+});
+
+// Auto-save draft functionality (optional)
+let autoSaveTimeout;
+const formInputs = document.querySelectorAll('#post-form input, #post-form textarea, #post-form select');
+
+formInputs.forEach(input => {
+    input.addEventListener('input', function() {
+        clearTimeout(autoSaveTimeout);
+        autoSaveTimeout = setTimeout(function() {
+            // Auto-save logic can be implemented here
+            console.log('Auto-saving draft...');
+        }, 30000); // Save after 30 seconds of inactivity
+    });
+});
+
+// Form validation
+postForm.addEventListener('submit', function(e) {
+    const title = document.getElementById(postForm.dataset.titleField);
+    const content = document.getElementById(postForm.dataset.contentField);
+
+    if (!title.value.trim()) {
+        e.preventDefault();
+        title.classList.add('is-invalid');
+        title.focus();
+        return;
+    }
+
+    if (!content.value.trim()) {
+        e.preventDefault();
+        content.classList.add('is-invalid');
+        content.focus();
+        return;
+    }
+});
+
+// Remove validation errors on input
+formInputs.forEach(input => {
+    input.addEventListener('input', function() {
+        this.classList.remove('is-invalid');
+    });
+});
+
+// Character counter for title
+const titleInput = document.getElementById(postForm.dataset.titleField);
+if (titleInput) {
+    const maxLength = 200;
+    const counter = document.createElement('div');
+    counter.className = 'form-help-text';
+    counter.style.textAlign = 'right';
+    titleInput.parentNode.appendChild(counter);
+
+    function updateCounter() {
+        const remaining = maxLength - titleInput.value.length;
+        counter.textContent = `${remaining} characters remaining`;
+        counter.style.color = remaining < 20 ? '#dc3545' : 'var(--text-gray)';
+    }
+
+    titleInput.addEventListener('input', updateCounter);
+    updateCounter();
+}
@@ -0,0 +1,61 @@
+// Highlight search terms in results
+document.addEventListener('DOMContentLoaded', function() {
+    const query = document.getElementById('search-page').dataset.query;
+    if (query && query.trim()) {
+        const searchTerms = query.trim().split(/\s+/);
+        const resultItems = document.querySelectorAll('.search-result-item');
+
+        resultItems.forEach(item => {
+            const title = item.querySelector('.result-title a');
+            const excerpt = item.querySelector('.result-excerpt');
+
+            searchTerms.forEach(term => {
+                if (term.length > 2) { // Only highlight terms longer than 2 characters
+                    const regex = new RegExp(`(${term})`, 'gi');
+
+                    if (title) {
+                        title.innerHTML = title.innerHTML.replace(regex, '<span class="highlight">$1</span>');
+                    }
+
+                    if (excerpt) {
+                        excerpt.innerHTML = excerpt.innerHTML.replace(regex, '<span class="highlight">$1</span>');
+                    }
+                }
+            });
+        });
+    }
+});
+
+// Fade-in animation
+const observerOptions = {
+    threshold: 0.1,
+    rootMargin: '0px 0px -50px 0px'
+};
+
+const observer = new IntersectionObserver((entries) => {
+    entries.forEach(entry => {
+        if (entry.isIntersecting) {
+            entry.target.style.opacity = '1';
+            entry.target.style.transform = 'translateY(0)';
+        }
+    });
+}, observerOptions);
+
+document.querySelectorAll('.fade-in').forEach((el, index) => {
+    el.style.opacity = '0';
+    el.style.transform = 'translateY(20px)';
+    el.style.transition = `all 0.6s ease ${index * 0.1}s`;
+    observer.observe(el);
+});
+
+// Search input focus enhancement
+const searchInput = document.querySelector('.search-input');
+if (searchInput) {
+    searchInput.addEventListener('focus', function() {
+        this.parentElement.style.transform = 'scale(1.02)';
+    });
+
+    searchInput.addEventListener('blur', function() {
+        this.parentElement.style.transform = 'scale(1)';
+    });
+}
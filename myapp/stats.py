@@ -0,0 +1,54 @@
+"""
+Sitewide statistics shown on the home, all posts, about and profile pages.
+
+The figures are computed together and cached as a single snapshot, which
+is dropped whenever a Post, Category or Newsletter row is saved or deleted
+(see myapp.signals). View counts are flushed with queryset updates that
+don't send signals, so the snapshot also expires after
+SITE_STATS_CACHE_TIMEOUT seconds to pick those up.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+# Bump when the shape of the snapshot changes.
+STATS_VERSION = 1
+STATS_CACHE_KEY = f'site_stats:v{STATS_VERSION}'
+
+
+def _start_of_month(now=None):
+    now = now or timezone.now()
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def compute_site_stats():
+    from .models import Post, Category, Newsletter
+
+    start_of_month = _start_of_month()
+    posts = Post.objects.filter(status='published').aggregate(
+        total_posts=Count('id'),
+        total_views=Sum('views'),
+        this_month_posts=Count('id', filter=Q(published_at__gte=start_of_month)),
+    )
+    return {
+        'total_posts': posts['total_posts'],
+        'total_views': posts['total_views'] or 0,
+        'this_month_posts': posts['this_month_posts'],
+        'total_categories': Category.objects.count(),
+        'total_subscribers': Newsletter.objects.filter(is_active=True).count(),
+        'month': start_of_month.strftime('%Y-%m'),
+    }
+
+
+def get_site_stats():
+    """Return the cached stats snapshot, recomputing it on a miss"""
+    stats = cache.get(STATS_CACHE_KEY)
+    if stats is None or stats['month'] != _start_of_month().strftime('%Y-%m'):
+        stats = compute_site_stats()
+        cache.set(STATS_CACHE_KEY, stats, getattr(settings, 'SITE_STATS_CACHE_TIMEOUT', 300))
+    return stats
+
+
+def invalidate_site_stats():
+    cache.delete(STATS_CACHE_KEY)
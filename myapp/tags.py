@@ -0,0 +1,92 @@
+"""
+Normalized tags.
+
+Post.tags stays the free-text field authors type into; on every save the
+comma-separated names are synced into Tag/PostTag rows so tag pages and
+filters are index lookups, and Tag.post_count holds the number of
+published posts per tag.
+"""
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.text import slugify
+
+TAG_NAME_LENGTH = 50
+TAG_SLUG_LENGTH = 60
+
+
+def parse_tags(value):
+    """Split a comma-separated tag string into unique (name, slug) pairs"""
+    pairs = {}
+    for name in (value or '').split(','):
+        name = name.strip()[:TAG_NAME_LENGTH]
+        slug = slugify(name)[:TAG_SLUG_LENGTH]
+        if slug and slug not in pairs:
+            pairs[slug] = name
+    return [(name, slug) for slug, name in pairs.items()]
+
+
+def update_tag_counts(tag_ids):
+    from .models import PostTag, Tag
+
+    if not tag_ids:
+        return
+    published = PostTag.objects.filter(
+        tag=OuterRef('pk'), post__status='published'
+    ).values('tag').annotate(n=Count('id')).values('n')
+    Tag.objects.filter(pk__in=tag_ids).update(post_count=Coalesce(Subquery(published), 0))
+
+
+def sync_post_tags(post):
+    """Make the post's Tag links match its tags string"""
+    from .models import PostTag, Tag
+
+    pairs = dict((slug, name) for name, slug in parse_tags(post.tags))
+    Tag.objects.bulk_create(
+        [Tag(name=name, slug=slug) for slug, name in pairs.items()],
+        ignore_conflicts=True,
+    )
+    wanted = set(Tag.objects.filter(slug__in=pairs).values_list('pk', flat=True))
+    current = set(PostTag.objects.filter(post=post).values_list('tag_id', flat=True))
+
+    removed = current - wanted
+    if removed:
+        PostTag.objects.filter(post=post, tag_id__in=removed).delete()
+    added = wanted - current
+    if added:
+        PostTag.objects.bulk_create(
+            [PostTag(post=post, tag_id=tag_id) for tag_id in added],
+            ignore_conflicts=True,
+        )
+    # Status changes move the post in or out of every tag's count.
+    update_tag_counts(current | wanted)
+
+
+def sync_tags(posts):
+    """sync_post_tags for many posts at once: ``posts`` is [(post_id, tags string), ...]"""
+    from .models import PostTag, Tag
+
+    wanted_slugs = {post_id: {slug for _, slug in parse_tags(value)} for post_id, value in posts}
+    names = {slug: name for _, value in posts for name, slug in parse_tags(value)}
+    Tag.objects.bulk_create(
+        [Tag(name=name, slug=slug) for slug, name in names.items()],
+        ignore_conflicts=True,
+    )
+    tag_ids = dict(Tag.objects.filter(slug__in=names).values_list('slug', 'pk'))
+    wanted = {(post_id, tag_ids[slug]) for post_id, slugs in wanted_slugs.items() for slug in slugs}
+    current = set(PostTag.objects.filter(post_id__in=wanted_slugs).values_list('post_id', 'tag_id'))
+
+    removed = {}
+    for post_id, tag_id in current - wanted:
+        removed.setdefault(post_id, []).append(tag_id)
+    for post_id, removed_ids in removed.items():
+        PostTag.objects.filter(post_id=post_id, tag_id__in=removed_ids).delete()
+    PostTag.objects.bulk_create(
+        [PostTag(post_id=post_id, tag_id=tag_id) for post_id, tag_id in wanted - current],
+        ignore_conflicts=True,
+    )
+    update_tag_counts({tag_id for _, tag_id in current | wanted})
+
+
+def tag_filter(slug):
+    """Q object selecting posts carrying the tag, via the (tag, post) index"""
+    return Q(post_tags__tag__slug=slug)
@@ -0,0 +1,174 @@
+"""
+Background tasks for the side effects of writes.
+
+Requests only do the primary write; the signal handlers in myapp.signals
+queue these with ``delay_on_commit`` so they see committed rows. Post
+saves derive the excerpt, refresh the search index, expire cached
+stats/fragments/pages, refresh related-post lists (myapp.related) and
+recompute the authors' totals (members.stats); comment changes recount
+and expire the post's pages and add to the author's comment total. Trending lists are recomputed
+periodically (CELERY_BEAT_SCHEDULE); uploaded images get their
+derivatives; new subscribers get a welcome mail; newly published posts
+get a newsletter issue (delivered by myapp.newsletter) and a place in
+their author's followers' feeds (myapp.feed), which follows and
+unfollows backfill or prune.
+"""
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.core.mail import send_mail
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+
+from members import stats as author_stats
+
+from . import feed, generations, related, trending
+from .counters import flush_views, update_category_counts, update_comment_count
+from .images import forget_widths, generate_derivatives
+from .models import Category, Newsletter, NewsletterIssue, Post
+from .newsletter import create_issue, deliver_issue
+from .search import get_search_backend
+from .stats import invalidate_site_stats
+
+logger = logging.getLogger(__name__)
+
+EXCERPT_LENGTH = 297
+
+
+def make_excerpt(content):
+    return strip_tags(content)[:EXCERPT_LENGTH] + '...'
+
+
+def expire_post_caches(slugs=(), category_ids=()):
+    """Invalidate site stats and the cached fragments/pages a post appears on"""
+    invalidate_site_stats()
+    category_slugs = Category.objects.filter(pk__in=category_ids).values_list('slug', flat=True)
+    generations.bump_generation(
+        generations.POSTS,
+        *[generations.post_generation(slug) for slug in slugs],
+        *[generations.category_generation(slug) for slug in category_slugs],
+    )
+
+
+@shared_task
+def process_saved_post(post_id, slugs, category_ids, announce=False):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        if not post.excerpt and post.content:
+            # update() so the derived excerpt doesn't re-trigger post_save.
+            post.excerpt = make_excerpt(post.content)
+            Post.objects.filter(pk=post_id, excerpt='').update(excerpt=post.excerpt)
+        get_search_backend().index(post)
+        if announce:
+            # Queued from here so the issue is rendered with the excerpt.
+            announce_post.delay(post_id)
+    update_category_counts(category_ids)
+    expire_post_caches(slugs, category_ids)
+
+
+@shared_task
+def refresh_related_posts(post_id):
+    return related.refresh(post_id)
+
+
+@shared_task
+def refresh_related_lists(post_ids):
+    return related.refresh_lists(post_ids)
+
+
+@shared_task
+def flush_post_views():
+    """Drain the shared view buffer (VIEW_COUNT_BUFFER = 'cache')"""
+    return flush_views()
+
+
+@shared_task
+def update_trending():
+    flush_views()
+    return trending.update()
+
+
+@shared_task
+def process_deleted_post(post_id, slugs, category_ids):
+    get_search_backend().remove(post_id)
+    update_category_counts(category_ids)
+    expire_post_caches(slugs, category_ids)
+
+
+@shared_task
+def process_comment_change(post_id, delta=0):
+    """``delta`` is the change in the post's approved comments"""
+    update_comment_count(post_id)
+    author_stats.add_activity({post_id: delta}, 'comments')
+    post = Post.objects.filter(pk=post_id).values('slug').first()
+    generations.bump_generation(
+        generations.COMMENTS,
+        *([generations.post_generation(post['slug'])] if post else []),
+    )
+
+
+@shared_task
+def refresh_author_stats(author_ids):
+    return author_stats.refresh_authors(author_ids)
+
+
+@shared_task
+def generate_image_derivatives(name, post_slug=None, overwrite=False):
+    """Resize ``name``, then expire cached markup still lacking its srcset"""
+    widths = generate_derivatives(name, overwrite)
+    forget_widths(name)
+    if post_slug:
+        generations.bump_generation(generations.POSTS, generations.post_generation(post_slug))
+    return widths
+
+
+@shared_task
+def send_welcome_email(newsletter_id):
+    subscriber = Newsletter.objects.filter(pk=newsletter_id, is_active=True).first()
+    if subscriber is None:
+        return
+    context = {'site_url': settings.SITE_URL}
+    send_mail(
+        'Welcome to the newsletter',
+        render_to_string('myapp/email/newsletter_welcome.txt', context),
+        None,
+        [subscriber.email],
+    )
+
+
+@shared_task
+def announce_post(post_id):
+    """Render the post's newsletter issue once and queue its delivery"""
+    post = Post.objects.select_related('author').filter(pk=post_id, status='published').first()
+    if post is not None:
+        deliver_newsletter_issue.delay(create_issue(post).pk)
+
+
+@shared_task
+def fan_out_post(post_id):
+    return feed.fan_out_post(post_id)
+
+
+@shared_task
+def backfill_timelines(pairs):
+    """Backfill feeds for new (follower id, author id) pairs"""
+    return sum(feed.backfill(follower_id, author_id) for follower_id, author_id in pairs)
+
+
+@shared_task
+def remove_from_timeline(follower_id, author_id):
+    return feed.remove_author(follower_id, author_id)
+
+
+@shared_task
+def remove_from_timelines(pairs):
+    """remove_from_timeline() for removed (follower id, author id) pairs"""
+    return sum(feed.remove_author(follower_id, author_id) for follower_id, author_id in pairs)
+
+
+@shared_task(autoretry_for=(OSError,), retry_backoff=True, max_retries=8)
+def deliver_newsletter_issue(issue_id):
+    """Send an issue from its checkpoint; retries resume where it failed"""
+    issue = NewsletterIssue.objects.filter(pk=issue_id).first()
+    return deliver_issue(issue) if issue is not None else 0
@@ -0,0 +1,125 @@
+"""
+{% fragment %}: template fragment caching keyed on generation counters.
+
+    {% load fragment_cache %}
+    {% fragment 'all_posts_grid' 'posts comments' request.get_full_path %}
+        ...
+    {% endfragment %}
+
+The first argument names the fragment, the second lists the generations
+(see myapp.generations) the fragment depends on, and any further
+arguments vary the key like they do for Django's {% cache %} tag. Hits
+and misses are counted per fragment in the default cache, see
+get_fragment_stats(); they only add up across processes when that cache
+is shared (CACHE_URL, see core.caches).
+"""
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+
+from myapp.generations import get_generations
+
+register = template.Library()
+
+# Fragment names are appended to a log of slots (an incr per new name),
+# so concurrent first misses can't overwrite each other's registrations.
+NAMES_KEY = 'fragment_cache:names'
+
+
+def _metric_key(kind, name):
+    return f'fragment_cache:{kind}:{name}'
+
+
+def _count(kind, name):
+    key = _metric_key(kind, name)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            pass
+
+
+def _register_name(name):
+    if cache.add(f'{NAMES_KEY}:registered:{name}', True, timeout=None):
+        cache.add(f'{NAMES_KEY}:count', 0, timeout=None)
+        try:
+            slot = cache.incr(f'{NAMES_KEY}:count')
+        except ValueError:
+            return
+        cache.set(f'{NAMES_KEY}:{slot}', name, timeout=None)
+
+
+def _registered_names():
+    count = cache.get(f'{NAMES_KEY}:count', 0)
+    return set(cache.get_many([f'{NAMES_KEY}:{slot}' for slot in range(1, count + 1)]).values())
+
+
+def get_fragment_stats():
+    """Return {fragment name: {'hits', 'misses', 'hit_rate'}}"""
+    names = sorted(_registered_names())
+    keys = [_metric_key(kind, name) for name in names for kind in ('hits', 'misses')]
+    values = cache.get_many(keys)
+    stats = {}
+    for name in names:
+        hits = values.get(_metric_key('hits', name), 0)
+        misses = values.get(_metric_key('misses', name), 0)
+        total = hits + misses
+        stats[name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else None,
+        }
+    return stats
+
+
+def reset_fragment_stats():
+    names = _registered_names()
+    cache.delete_many([_metric_key(kind, name) for name in names for kind in ('hits', 'misses')])
+
+
+class FragmentNode(template.Node):
+
+    def __init__(self, nodelist, name, dependencies, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.dependencies = dependencies
+        self.vary_on = vary_on
+
+    def cache_key(self, context):
+        name = self.name.resolve(context)
+        generations = get_generations(self.dependencies.resolve(context).split())
+        parts = [f'{key}={value}' for key, value in sorted(generations.items())]
+        parts += [str(var.resolve(context)) for var in self.vary_on]
+        digest = hashlib.md5(':'.join(parts).encode(), usedforsecurity=False).hexdigest()
+        return name, f'fragment:{name}:{digest}'
+
+    def render(self, context):
+        name, key = self.cache_key(context)
+        value = cache.get(key)
+        if value is not None:
+            _count('hits', name)
+            return value
+        _count('misses', name)
+        _register_name(name)
+        value = self.nodelist.render(context)
+        cache.set(key, value, getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 600))
+        return value
+
+
+@register.tag
+def fragment(parser, token):
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            "'fragment' tag requires a name and a list of generations."
+        )
+    nodelist = parser.parse(('endfragment',))
+    parser.delete_first_token()
+    return FragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
@@ -0,0 +1,28 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from myapp.images import srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(image, sizes='100vw', **attrs):
+    """
+    An <img> for an ImageField file, wrapped in a <picture> with WebP and
+    JPEG srcsets once its derivatives exist.
+
+        {% responsive_image post.featured_image sizes="(max-width: 768px) 100vw, 400px" alt=post.title class="card-img-top" %}
+    """
+    attrs.setdefault('loading', 'lazy')
+    extra = format_html_join(' ', '{}="{}"', sorted(attrs.items()))
+    webp = srcset(image.name, 'webp')
+    if not webp:
+        return format_html('<img src="{}" {}>', image.url, extra)
+    return format_html(
+        '<picture style="display: contents">'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" {}>'
+        '</picture>',
+        webp, sizes, image.url, srcset(image.name, 'jpg'), sizes, extra,
+    )
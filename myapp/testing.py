@@ -0,0 +1,82 @@
+"""
+Query budget assertions for tests.
+
+    from myapp.testing import QueryBudgetMixin
+
+    class HomeViewTests(QueryBudgetMixin, TestCase):
+        def test_home(self):
+            self.assertViewQueryBudget('myapp:home')
+
+A budget is the most queries a view may run with cold caches; the
+assertion also fails on any N+1 pattern, naming the template line. The
+check_query_budgets command runs the same checks against a live
+database.
+"""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from .queries import record_queries
+
+# Worst-case (cold cache) queries per view, anonymous unless noted
+QUERY_BUDGETS = {
+    'myapp:home': 8,
+    'myapp:all_posts': 8,
+    'myapp:post_detail': 8,
+    'members:profile': 8,  # logged in as staff
+}
+
+PAGE_CACHE_MIDDLEWARE = 'myapp.middleware.AnonymousPageCacheMiddleware'
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def assert_query_budget(budget, label='block'):
+    """Fail if the block runs more than ``budget`` queries or any N+1"""
+    with record_queries(origins=True) as recorder:
+        yield recorder
+    if recorder.count > budget:
+        raise QueryBudgetExceeded(f'{label} ran {recorder.count} queries, budget is {budget}\n{recorder.report()}')
+    if recorder.n_plus_ones():
+        raise QueryBudgetExceeded(f'{label} has N+1 queries\n{recorder.report()}')
+
+
+@contextmanager
+def cold_caches():
+    """Dummy cache and no page cache, so every view runs its real queries"""
+    with override_settings(
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        MIDDLEWARE=[name for name in settings.MIDDLEWARE if name != PAGE_CACHE_MIDDLEWARE],
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+    ):
+        yield
+
+
+def measure_view(view_name, kwargs=None, user=None, budget=None):
+    """
+    GET ``view_name`` with cold caches inside assert_query_budget, returns
+    (response, recorder). ``budget`` defaults to QUERY_BUDGETS.
+    """
+    budget = QUERY_BUDGETS[view_name] if budget is None else budget
+    with cold_caches():
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        url = reverse(view_name, kwargs=kwargs)
+        with assert_query_budget(budget, label=url) as recorder:
+            response = client.get(url)
+    return response, recorder
+
+
+class QueryBudgetMixin:
+    """TestCase mixin with assertViewQueryBudget()"""
+
+    def assertViewQueryBudget(self, view_name, budget=None, user=None, **kwargs):
+        response, recorder = measure_view(view_name, kwargs or None, user=user, budget=budget)
+        self.assertEqual(response.status_code, 200)
+        return recorder
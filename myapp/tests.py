@@ -1,3 +1,312 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from members.models import UserFollowing
+
+from . import newsletter, transfer
+from .benchmark import refresh_derived
+from .counters import CacheViewBuffer, flush_views
+from .models import Category, Comment, Like, Newsletter, NewsletterIssue, Post, PostImport
+from .pagination import CursorPaginator, InvalidCursor
+from .testing import QueryBudgetMixin
+
+User = get_user_model()
+
+
+# Tests run without DEBUG, and {% static %} would need collectstatic's manifest
+@override_settings(STORAGES={
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """The main views stay within myapp.testing.QUERY_BUDGETS with a page of posts"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', 'author@example.com', 'password')
+        cls.reader = User.objects.create_user('reader', 'reader@example.com', 'password')
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'password', is_staff=True)
+        UserFollowing.objects.create(user=cls.reader, following_user=cls.author)
+        categories = [
+            Category.objects.create(name=f'Category {n}', slug=f'category-{n}') for n in range(3)
+        ]
+        posts = [
+            Post.objects.create(
+                title=f'Post {n}', slug=f'post-{n}', author=cls.author, category=categories[n % 3],
+                content=f'<p>Post {n} about budgets and queries</p>', tags='django, budgets',
+                status='published', published_at=timezone.now(),
+            )
+            for n in range(12)
+        ]
+        cls.post = posts[0]
+        for n, user in enumerate((cls.reader, cls.staff)):
+            Like.objects.create(user=user, post=cls.post)
+            comment = Comment.objects.create(post=cls.post, author=user, content=f'Comment {n}')
+            Comment.objects.create(post=cls.post, author=cls.author, content='Reply', parent=comment)
+        # Tasks queued on commit never run inside a TestCase
+        refresh_derived(Post.objects.all())
+
+    def tearDown(self):
+        # Write the recorded views while the test database is still there
+        flush_views()
+
+    def test_home(self):
+        self.assertViewQueryBudget('myapp:home')
+
+    def test_all_posts(self):
+        self.assertViewQueryBudget('myapp:all_posts')
+
+    def test_post_detail(self):
+        self.assertViewQueryBudget('myapp:post_detail', slug=self.post.slug)
+
+    def test_post_detail_logged_in(self):
+        self.assertViewQueryBudget('myapp:post_detail', user=self.reader, slug=self.post.slug)
+
+    def test_profile(self):
+        self.assertViewQueryBudget('members:profile', user=self.staff, username=self.author.username)
+
+
+class CacheViewBufferTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.buffer = CacheViewBuffer()
+
+    def test_drain_returns_and_clears_counts(self):
+        self.buffer.add(1)
+        self.buffer.add(1, 2)
+        self.buffer.add(2)
+        self.assertEqual(self.buffer.size(), 4)
+        self.assertEqual(self.buffer.drain(), {1: 3, 2: 1})
+        self.assertEqual((self.buffer.pending(1), self.buffer.size()), (0, 0))
+        self.assertEqual(self.buffer.drain(), {})
+
+    def test_views_after_a_drain_are_logged_again(self):
+        self.buffer.add(1)
+        self.buffer.drain()
+        self.buffer.add(1, 5)
+        self.assertEqual(self.buffer.drain(), {1: 5})
+
+    def test_slot_written_late_is_picked_up_by_a_later_drain(self):
+        # A worker counted post 1 and reserved slot 1, but hasn't written the slot yet
+        cache.add(self.buffer._key(1), 3)
+        cache.add(f'{self.buffer.marker_prefix}1', True)
+        cache.add(self.buffer.tail_key, 0)
+        slot = cache.incr(self.buffer.tail_key)
+        self.buffer.add(2)
+        self.assertEqual(self.buffer.drain(), {2: 1})
+        cache.set(self.buffer._slot_key(slot), 1)
+        self.assertEqual(self.buffer.drain(), {1: 3})
+
+    def test_a_slot_never_written_is_skipped_once_revisited(self):
+        cache.add(self.buffer.tail_key, 0)
+        cache.incr(self.buffer.tail_key)
+        self.buffer.add(2)
+        self.assertEqual(self.buffer.drain(), {2: 1})
+        self.buffer.drain()
+        self.buffer.add(3)
+        self.assertEqual(self.buffer.drain(), {3: 1})
+        self.assertEqual(cache.get(self.buffer.head_key), cache.get(self.buffer.tail_key))
+
+    def test_concurrent_drain_gets_nothing(self):
+        self.buffer.add(1)
+        cache.add(self.buffer.lock_key, True)
+        self.assertEqual(self.buffer.drain(), {})
+        cache.delete(self.buffer.lock_key)
+        self.assertEqual(self.buffer.drain(), {1: 1})
+
+    def test_restore_puts_counts_back(self):
+        self.buffer.add(1, 2)
+        self.buffer.restore(self.buffer.drain())
+        self.assertEqual(self.buffer.drain(), {1: 2})
+
+
+class CursorPaginatorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author', 'author@example.com', 'password')
+        # Views with ties, so pages split inside runs of equal values
+        cls.posts = Post.objects.bulk_create([
+            Post(title=f'Post {n}', slug=f'post-{n}', author=author, content='x', status='published', views=views)
+            for n, views in enumerate([5, 3, 3, 3, 3, 1, 1, 0])
+        ])
+        cls.expected = [post.pk for post in sorted(cls.posts, key=lambda post: (-post.views, -post.pk))]
+
+    def paginator(self, per_page=3):
+        return CursorPaginator(Post.objects.filter(status='published'), '-views', per_page)
+
+    def walk(self, paginator):
+        pages, page = [], paginator.page()
+        while True:
+            pages.append(page)
+            if not page.has_next():
+                return pages
+            page = paginator.page(page.next_cursor)
+
+    def test_forward_pages_cover_every_row_once(self):
+        pages = self.walk(self.paginator())
+        self.assertEqual([post.pk for page in pages for post in page], self.expected)
+        self.assertEqual([len(page) for page in pages], [3, 3, 2])
+        self.assertFalse(pages[0].has_previous())
+        self.assertTrue(all(page.has_previous() for page in pages[1:]))
+
+    def test_previous_pages_mirror_next_pages(self):
+        paginator = self.paginator()
+        pages = self.walk(paginator)
+        for earlier, later in zip(pages, pages[1:]):
+            previous = paginator.page(later.previous_cursor)
+            self.assertEqual([post.pk for post in previous], [post.pk for post in earlier])
+            self.assertTrue(previous.has_next())
+        first = paginator.page(pages[1].previous_cursor)
+        self.assertFalse(first.has_previous())
+        self.assertIsNone(first.previous_cursor)
+
+    def test_ascending_order(self):
+        paginator = CursorPaginator(Post.objects.all(), 'views', 3)
+        pages = self.walk(paginator)
+        self.assertEqual([post.pk for page in pages for post in page], self.expected[::-1])
+
+    def test_exact_multiple_of_page_size(self):
+        pages = self.walk(self.paginator(per_page=4))
+        self.assertEqual([len(page) for page in pages], [4, 4])
+        self.assertIsNone(pages[-1].next_cursor)
+
+    def test_bad_cursors(self):
+        paginator = self.paginator()
+        for cursor in ('garbage', 'WyJzaWRld2F5cyIsIDEsIDFd', 'WyJuZXh0Il0', '!!!'):
+            with self.subTest(cursor), self.assertRaises(InvalidCursor):
+                paginator.page(cursor)
+
+    @override_settings(STORAGES={
+        **settings.STORAGES,
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    })
+    def test_bad_cursor_is_a_404(self):
+        self.assertEqual(self.client.get('/posts/', {'cursor': 'garbage'}).status_code, 404)
+
+
+class ImportResumeTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', 'author@example.com', 'password')
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.jsonl')
+        self.addCleanup(os.remove, self.path)
+        with os.fdopen(handle, 'w') as stream:
+            for n in range(5):
+                stream.write(json.dumps({
+                    'slug': f'imported-{n}', 'title': f'Imported {n}', 'author': 'author',
+                    'category': 'Imports', 'status': 'published', 'content': f'<p>Body {n}</p>', 'tags': 'a, b',
+                }) + '\n')
+            stream.write('not json\n')
+
+    def test_resumes_after_the_last_saved_chunk(self):
+        import_chunk = transfer.import_chunk
+        calls = []
+
+        def failing_second_chunk(records, lookups, now=None):
+            calls.append(records)
+            if len(calls) == 2:
+                raise RuntimeError('worker died')
+            return import_chunk(records, lookups, now)
+
+        with mock.patch.object(transfer, 'import_chunk', failing_second_chunk), self.assertRaises(RuntimeError):
+            transfer.import_posts(self.path, chunk_size=2, rebuild_related=False)
+        checkpoint = PostImport.objects.get()
+        self.assertEqual((checkpoint.imported, checkpoint.finished_at), (2, None))
+        self.assertEqual(Post.objects.count(), 2)
+
+        checkpoint = transfer.import_posts(self.path, chunk_size=2, rebuild_related=False)
+        self.assertEqual((checkpoint.imported, checkpoint.skipped), (5, 1))
+        self.assertEqual(checkpoint.position, os.path.getsize(self.path))
+        self.assertIsNotNone(checkpoint.finished_at)
+        self.assertEqual(
+            sorted(Post.objects.values_list('slug', flat=True)), [f'imported-{n}' for n in range(5)]
+        )
+        self.assertEqual(Category.objects.get(name='Imports').post_count, 5)
+
+    def test_finished_imports_are_not_repeated_unless_restarted(self):
+        transfer.import_posts(self.path, rebuild_related=False)
+        Post.objects.filter(slug='imported-0').update(title='Edited')
+        transfer.import_posts(self.path, rebuild_related=False)
+        self.assertEqual(Post.objects.get(slug='imported-0').title, 'Edited')
+        checkpoint = transfer.import_posts(self.path, restart=True, rebuild_related=False)
+        self.assertEqual(Post.objects.get(slug='imported-0').title, 'Imported 0')
+        self.assertEqual((checkpoint.imported, Post.objects.count()), (5, 5))
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', NEWSLETTER_RATE_LIMIT=0)
+class NewsletterDeliveryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author', 'author@example.com', 'password')
+        cls.post = Post.objects.create(
+            title='News', slug='news', author=author, content='<p>News</p>', status='published',
+            published_at=timezone.now(),
+        )
+        Newsletter.objects.bulk_create(
+            [Newsletter(email=f'reader{n}@example.com') for n in range(5)]
+            + [Newsletter(email='gone@example.com', is_active=False)]
+        )
+
+    def setUp(self):
+        newsletter.close_worker_connection()
+        self.addCleanup(newsletter.close_worker_connection)
+        self.issue = newsletter.create_issue(self.post)
+
+    def recipients(self):
+        return sorted(message.to[0] for message in mail.outbox)
+
+    def test_delivers_to_active_subscribers_once(self):
+        self.assertEqual(newsletter.deliver_issue(self.issue, batch_size=2), 5)
+        self.issue.refresh_from_db()
+        self.assertEqual((self.issue.status, self.issue.sent_count, self.issue.claimed_at), ('sent', 5, None))
+        self.assertEqual(self.recipients(), [f'reader{n}@example.com' for n in range(5)])
+        self.assertEqual(newsletter.deliver_issue(self.issue), 0)
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_paused_delivery_resumes_from_the_checkpoint(self):
+        self.assertEqual(newsletter.deliver_issue(self.issue, batch_size=2, max_batches=1), 2)
+        self.issue.refresh_from_db()
+        self.assertEqual((self.issue.status, self.issue.claimed_at), ('sending', None))
+        # Another process resumes it from the database row
+        self.assertEqual(newsletter.deliver_issue(NewsletterIssue.objects.get(pk=self.issue.pk), batch_size=2), 3)
+        self.assertEqual(self.recipients(), [f'reader{n}@example.com' for n in range(5)])
+
+    def test_claimed_issue_is_left_to_its_sender(self):
+        NewsletterIssue.objects.filter(pk=self.issue.pk).update(status='sending', claimed_at=timezone.now())
+        self.assertEqual(newsletter.deliver_issue(self.issue), 0)
+        self.assertEqual(mail.outbox, [])
+
+    def test_stale_claim_is_taken_over(self):
+        stale = timezone.now() - timedelta(seconds=newsletter.CLAIM_TIMEOUT + 60)
+        NewsletterIssue.objects.filter(pk=self.issue.pk).update(status='sending', claimed_at=stale)
+        self.assertEqual(newsletter.deliver_issue(self.issue), 5)
+
+    def test_sender_stops_when_its_claim_is_taken_over(self):
+        connection = newsletter.get_worker_connection()
+        send_messages = connection.send_messages
+
+        def taken_over(messages):
+            NewsletterIssue.objects.filter(pk=self.issue.pk).update(claimed_at=timezone.now() + timedelta(hours=1))
+            return send_messages(messages)
+
+        with mock.patch.object(connection, 'send_messages', taken_over), self.assertLogs(newsletter.logger, 'WARNING'):
+            self.assertEqual(newsletter.deliver_issue(self.issue, batch_size=2), 2)
+        self.issue.refresh_from_db()
+        self.assertEqual((self.issue.status, self.issue.last_subscriber_id), ('sending', 0))
@@ -0,0 +1,397 @@
+"""
+Bulk post import and export.
+
+export_records() streams every post as a flat dict (FIELDS), which
+write_jsonl()/write_csv() write out one row at a time; import_posts()
+reads the same formats back. Nothing is held in memory beyond one chunk
+of CHUNK_SIZE records and the author/category lookup maps, so files of
+any size import in bounded memory.
+
+Each chunk is one transaction: posts whose slug already exists are
+updated with bulk_update, the rest are created with bulk_create, their
+Tag links and search entries are synced, and the byte offset reached in
+the file is saved in the file's PostImport row. A run that stops part way
+picks up from that offset next time.
+
+Per-object Post.save() work is done in bulk instead: excerpts are derived
+inline, slugs missing from a record are generated from the title and
+made unique a chunk at a time, and post_save signals don't fire, so
+imported posts aren't announced to newsletter subscribers. Records
+without a slug can't be matched on a later import; exported files always
+carry one. Once the whole file is in, finish_import() refreshes what
+spans many posts: related lists, the imported posts' authors' stats,
+their followers' feeds, category post counts, the site stats and the
+page caches.
+"""
+import csv
+import json
+import os
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import slugify
+
+from members import stats as author_stats
+
+from . import feed, generations, related
+from .counters import update_category_counts
+from .models import Category, Post, PostImport
+from .search import get_search_backend
+from .stats import invalidate_site_stats
+from .tags import sync_tags
+from .tasks import make_excerpt
+
+FIELDS = [
+    'slug', 'title', 'author', 'category', 'status', 'is_featured', 'tags',
+    'excerpt', 'content', 'published_at', 'created_at', 'views',
+]
+# Fields an import overwrites on posts that already exist
+UPDATE_FIELDS = [
+    'title', 'author', 'category', 'status', 'is_featured', 'tags',
+    'excerpt', 'content', 'published_at', 'views', 'updated_at',
+]
+FORMATS = ('jsonl', 'csv')
+CHUNK_SIZE = 1000
+SLUG_LENGTH = Post._meta.get_field('slug').max_length
+
+
+class InvalidRecord(ValueError):
+    pass
+
+
+def guess_format(path):
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    return 'jsonl' if extension in ('json', 'jsonl', 'ndjson') else extension
+
+
+# Export
+
+def export_records(queryset=None, chunk_size=CHUNK_SIZE):
+    """Yield one dict of FIELDS per post, in primary key order"""
+    queryset = Post.objects.all() if queryset is None else queryset
+    rows = queryset.order_by('pk').values_list(
+        'slug', 'title', 'author__username', 'category__name', 'status', 'is_featured', 'tags',
+        'excerpt', 'content', 'published_at', 'created_at', 'views',
+    )
+    for row in rows.iterator(chunk_size=chunk_size):
+        record = dict(zip(FIELDS, row))
+        for name in ('published_at', 'created_at'):
+            if record[name] is not None:
+                record[name] = record[name].isoformat()
+        yield record
+
+
+def write_jsonl(records, stream):
+    count = 0
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        count += 1
+    return count
+
+
+def write_csv(records, stream):
+    writer = csv.DictWriter(stream, fieldnames=FIELDS)
+    writer.writeheader()
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+    return count
+
+
+WRITERS = {'jsonl': write_jsonl, 'csv': write_csv}
+
+
+# Import
+
+def _lines(stream, progress):
+    for line in stream:
+        progress['position'] += len(line)
+        yield line
+
+
+def read_records(path, fmt, start=0):
+    """
+    Yield (record, position) for each record in ``path`` from byte
+    ``start`` on; ``position`` is the offset just after the record. A
+    record that can't be parsed comes back as the InvalidRecord instead.
+    """
+    with open(path, 'rb') as stream:
+        progress = {'position': 0}
+        if fmt == 'jsonl':
+            stream.seek(start)
+            progress['position'] = start
+            for line in _lines(stream, progress):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as error:
+                    record = InvalidRecord(f'bad JSON: {error}')
+                yield record, progress['position']
+        elif fmt == 'csv':
+            # csv pulls one line at a time, so after each row the position
+            # is exactly the end of that row, multi-line fields included.
+            reader = csv.reader(
+                (line.decode('utf-8') for line in _lines(stream, progress)),
+            )
+            header = next(reader, None)
+            if header is None:
+                return
+            if start > progress['position']:
+                stream.seek(start)
+                progress['position'] = start
+            for row in reader:
+                if len(row) != len(header):
+                    yield InvalidRecord(f'expected {len(header)} columns, got {len(row)}'), progress['position']
+                else:
+                    yield dict(zip(header, row)), progress['position']
+        else:
+            raise ValueError(f'Unsupported format: {fmt!r}')
+
+
+def _boolean(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'y')
+    return bool(value)
+
+
+def _datetime(value, name):
+    if value in (None, ''):
+        return None
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        raise InvalidRecord(f'{name} is not an ISO 8601 datetime: {value!r}')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class Lookups:
+    """Author and category ids by name, loaded once and grown as categories are created"""
+
+    def __init__(self, default_author=None):
+        User = get_user_model()
+        self.authors = dict(User.objects.values_list('username', 'pk'))
+        self.default_author = default_author
+        if default_author is not None and default_author not in self.authors:
+            raise ValueError(f'Unknown default author {default_author!r}')
+        self.categories = {name.lower(): pk for name, pk in Category.objects.values_list('name', 'pk')}
+
+    def author_id(self, username):
+        pk = self.authors.get(username)
+        if pk is None and self.default_author:
+            pk = self.authors[self.default_author]
+        if pk is None:
+            raise InvalidRecord(f'unknown author {username!r}')
+        return pk
+
+    def add_categories(self, names):
+        """Create the categories in ``names`` that don't exist yet"""
+        missing = {name.lower(): name for name in names if name and name.lower() not in self.categories}
+        if not missing:
+            return
+        taken = set(Category.objects.values_list('slug', flat=True))
+        new = []
+        for name in missing.values():
+            slug = base = slugify(name)[:90] or 'category'
+            number = 2
+            while slug in taken:
+                slug, number = f'{base}-{number}', number + 1
+            taken.add(slug)
+            new.append(Category(name=name, slug=slug))
+        Category.objects.bulk_create(new, ignore_conflicts=True)
+        self.categories.update(
+            (name.lower(), pk)
+            for name, pk in Category.objects.filter(name__in=missing.values()).values_list('name', 'pk')
+        )
+
+
+def clean_record(record, lookups, now):
+    """A Post (not saved) for one record, raises InvalidRecord"""
+    if isinstance(record, InvalidRecord):
+        raise record
+    if not isinstance(record, dict):
+        raise InvalidRecord('record is not an object')
+    title = (record.get('title') or '').strip()
+    content = record.get('content') or ''
+    if not title:
+        raise InvalidRecord('title is required')
+    status = record.get('status') or 'draft'
+    if status not in dict(Post.STATUS_CHOICES):
+        raise InvalidRecord(f'unknown status {status!r}')
+    category = (record.get('category') or '').strip()
+    try:
+        views = int(record.get('views') or 0)
+    except (TypeError, ValueError):
+        raise InvalidRecord(f'views is not a number: {record.get("views")!r}') from None
+
+    published_at = _datetime(record.get('published_at'), 'published_at')
+    if status == 'published' and published_at is None:
+        published_at = now
+    return Post(
+        slug=slugify(record.get('slug') or '')[:SLUG_LENGTH],
+        title=title[:200],
+        author_id=lookups.author_id(record.get('author')),
+        category_id=lookups.categories.get(category.lower()) if category else None,
+        content=content,
+        excerpt=record.get('excerpt') or (make_excerpt(content) if content else ''),
+        status=status,
+        is_featured=_boolean(record.get('is_featured')),
+        tags=(record.get('tags') or '')[:200],
+        published_at=published_at,
+        created_at=_datetime(record.get('created_at'), 'created_at'),
+        updated_at=now,
+        views=max(views, 0),
+    )
+
+
+def unique_slugs(posts, taken):
+    """Give slug-less posts a slug from their title that isn't in ``taken`` or the database"""
+    untitled = [post for post in posts if not post.slug]
+    bases = [slugify(post.title)[:SLUG_LENGTH - 8] or 'post' for post in untitled]
+    # Only bases that are already used need a look at their numbered variants.
+    used = set(Post.objects.filter(slug__in=set(bases)).values_list('slug', flat=True))
+    for base in list(used):
+        used.update(Post.objects.filter(slug__startswith=f'{base}-').values_list('slug', flat=True))
+    taken = taken | used
+    for post, base in zip(untitled, bases):
+        slug, number = base, 2
+        while slug in taken:
+            slug, number = f'{base}-{number}', number + 1
+        post.slug = slug
+        taken.add(slug)
+
+
+def import_chunk(records, lookups, now=None):
+    """
+    Create or update the posts for ``records``, a list of (number,
+    record) pairs, in one transaction. Returns (posts saved, [(number,
+    InvalidRecord), ...]).
+    """
+    now = now or timezone.now()
+    lookups.add_categories(
+        (record.get('category') or '').strip() for _, record in records if isinstance(record, dict)
+    )
+    by_slug, generated, errors = {}, [], []
+    for number, record in records:
+        try:
+            post = clean_record(record, lookups, now)
+        except InvalidRecord as error:
+            errors.append((number, error))
+            continue
+        if post.slug:
+            by_slug[post.slug] = post  # the last record with a slug wins
+        else:
+            generated.append(post)
+
+    existing = {
+        slug: (pk, author_id)
+        for slug, pk, author_id in Post.objects.filter(slug__in=list(by_slug)).values_list('slug', 'pk', 'author_id')
+    }
+    unique_slugs(generated, set(by_slug))
+    updates, creates, moved_from = [], generated, set()
+    for slug, post in by_slug.items():
+        if slug in existing:
+            post.pk, author_id = existing[slug]
+            if author_id != post.author_id:
+                moved_from.add(author_id)
+            updates.append(post)
+        else:
+            creates.append(post)
+    # bulk_create applies auto_now_add, so dates from the file are put back after.
+    created_at = {post.slug: post.created_at for post in creates if post.created_at}
+
+    backend = get_search_backend()
+    with transaction.atomic():
+        Post.objects.bulk_create(creates)
+        if any(post.pk is None for post in creates):
+            # Backends that don't return ids from bulk inserts
+            ids = dict(Post.objects.filter(slug__in=[post.slug for post in creates]).values_list('slug', 'pk'))
+            for post in creates:
+                post.pk = ids[post.slug]
+        dated = [post for post in creates if post.slug in created_at]
+        for post in dated:
+            post.created_at = created_at[post.slug]
+        Post.objects.bulk_update(dated, ['created_at'])
+        Post.objects.bulk_update(updates, UPDATE_FIELDS)
+        saved = updates + creates
+        sync_tags([(post.pk, post.tags) for post in saved])
+        for post in saved:
+            backend.index(post)
+        # Rare, and finish_import() only knows the posts' current authors
+        author_stats.refresh_authors(moved_from)
+    return saved, errors
+
+
+def import_posts(path, fmt=None, chunk_size=CHUNK_SIZE, default_author=None, restart=False,
+                 rebuild_related=True, log=lambda message: None):
+    """
+    Import a JSONL or CSV file, resuming from its PostImport checkpoint.
+    Returns the PostImport; invalid records are skipped and passed to
+    ``log`` with their record number.
+    """
+    fmt = fmt or guess_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f'Unsupported format: {fmt!r}')
+    source = os.path.abspath(path)
+    checkpoint, _ = PostImport.objects.get_or_create(source=source)
+    if restart:
+        checkpoint.position = checkpoint.imported = checkpoint.skipped = 0
+        checkpoint.started_at = timezone.now()
+        checkpoint.finished_at = None
+        checkpoint.save()
+    elif checkpoint.finished_at:
+        return checkpoint
+    elif checkpoint.position:
+        log(f'Resuming at byte {checkpoint.position} after {checkpoint.imported} posts')
+
+    lookups = Lookups(default_author)
+    number = checkpoint.imported + checkpoint.skipped
+    chunk, position = [], checkpoint.position
+
+    def flush(chunk, position):
+        # The checkpoint moves in the same transaction as the chunk, so a
+        # run that dies never imports a chunk twice or skips one.
+        with transaction.atomic():
+            saved, errors = import_chunk(chunk, lookups)
+            checkpoint.position = position
+            checkpoint.imported += len(saved)
+            checkpoint.skipped += len(errors)
+            checkpoint.save(update_fields=['position', 'imported', 'skipped', 'updated_at'])
+        for record_number, error in errors:
+            log(f'Skipped record {record_number}: {error}')
+        log(f'{checkpoint.imported} posts imported')
+
+    for record, position in read_records(path, fmt, start=checkpoint.position):
+        number += 1
+        chunk.append((number, record))
+        if len(chunk) >= chunk_size:
+            flush(chunk, position)
+            chunk = []
+    if chunk:
+        flush(chunk, position)
+
+    checkpoint.finished_at = timezone.now()
+    checkpoint.save(update_fields=['finished_at', 'updated_at'])
+    finish_import(checkpoint, rebuild_related)
+    return checkpoint
+
+
+def imported_posts(checkpoint):
+    """Every post saved by the import, over all of its runs"""
+    return Post.objects.filter(updated_at__gte=checkpoint.started_at)
+
+
+def finish_import(checkpoint, rebuild_related=True):
+    """Refresh what depends on the whole set of posts"""
+    if rebuild_related:
+        related.rebuild()
+    author_stats.refresh_authors(set(imported_posts(checkpoint).values_list('author_id', flat=True)))
+    update_category_counts()
+    # Entries already in a feed are skipped, so re-imported posts cost nothing.
+    feed.fan_out_posts(imported_posts(checkpoint))
+    invalidate_site_stats()
+    generations.bump_generation(generations.POSTS, generations.CATEGORIES)
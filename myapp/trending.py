@@ -0,0 +1,150 @@
+"""
+Trending posts.
+
+Views, likes and comments are rolled up per post into hourly PostActivity
+buckets as they are written: views when the view buffer is flushed,
+likes and comments from their signal handlers (and the like queue's
+flush). update() runs every TRENDING_UPDATE_INTERVAL seconds (the
+update_trending task on Celery beat, or the update_trending command) and
+ranks the buckets of the last TRENDING_WINDOW_DAYS into TrendingPost:
+
+    trending   each bucket's weighted activity halved every
+               TRENDING_HALF_LIFE_HOURS, so new posts can overtake old ones
+    week       the same activity summed without decay
+
+both site-wide and per category. Pages read a list with one indexed
+query through trending_posts(), which fills a list shorter than asked
+for (before the first update, or without activity in the window) with
+the most viewed posts, as the site did before there were lists.
+Migration 0015 seeds the lists the same way. Buckets older than the
+window are deleted on each update.
+"""
+import heapq
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+from .models import Post, PostActivity, TrendingPost
+
+# What one view, like and comment is worth
+ACTIVITY_WEIGHTS = {'views': 1, 'likes': 5, 'comments': 10}
+
+
+def trending_setting(name, default):
+    return getattr(settings, f'TRENDING_{name}', default)
+
+
+def current_bucket(now=None):
+    return (now or timezone.now()).replace(minute=0, second=0, microsecond=0)
+
+
+def record_activity(counts, field):
+    """Add ``{post_id: n}`` to the current bucket's ``field`` ('views', 'likes' or 'comments')"""
+    counts = {post_id: n for post_id, n in counts.items() if n > 0}
+    if not counts:
+        return
+    bucket = current_bucket()
+    # Posts deleted since the activity was buffered have nowhere to go.
+    post_ids = set(Post.objects.filter(pk__in=counts).values_list('pk', flat=True))
+
+    # Create missing rows first, then increment, so concurrent writers
+    # never overwrite each other's counts.
+    by_amount = defaultdict(list)
+    for post_id in post_ids:
+        by_amount[counts[post_id]].append(post_id)
+    with transaction.atomic():
+        PostActivity.objects.bulk_create(
+            [PostActivity(post_id=post_id, bucket=bucket) for post_id in post_ids],
+            ignore_conflicts=True,
+        )
+        for n, ids in by_amount.items():
+            PostActivity.objects.filter(bucket=bucket, post_id__in=ids).update(**{field: F(field) + n})
+
+
+def score_posts(now=None):
+    """({post_id: decayed score}, {post_id: week score}) over the window"""
+    now = now or timezone.now()
+    since = current_bucket(now) - timedelta(days=trending_setting('WINDOW_DAYS', 7))
+    half_life = trending_setting('HALF_LIFE_HOURS', 24) * 3600
+    decayed, week = defaultdict(float), defaultdict(float)
+    rows = PostActivity.objects.filter(bucket__gte=since).values_list(
+        'post_id', 'bucket', 'views', 'likes', 'comments'
+    )
+    decay = {}
+    for post_id, bucket, views, likes, comments in rows.iterator(chunk_size=2000):
+        activity = (
+            views * ACTIVITY_WEIGHTS['views']
+            + likes * ACTIVITY_WEIGHTS['likes']
+            + comments * ACTIVITY_WEIGHTS['comments']
+        )
+        if bucket not in decay:
+            # Measured from the middle of the bucket
+            age = max((now - bucket).total_seconds() - 1800, 0)
+            decay[bucket] = math.pow(0.5, age / half_life)
+        decayed[post_id] += activity * decay[bucket]
+        week[post_id] += activity
+    return decayed, week
+
+
+def _ranked(kind, category_id, scores, post_ids, size):
+    best = heapq.nlargest(size, ((scores[post_id], post_id) for post_id in post_ids if scores[post_id] > 0))
+    return [
+        TrendingPost(kind=kind, category_id=category_id, post_id=post_id, rank=rank, score=score)
+        for rank, (score, post_id) in enumerate(best)
+    ]
+
+
+def update(now=None):
+    """Recompute every trending list, returns the number of entries stored"""
+    now = now or timezone.now()
+    size = trending_setting('LIST_SIZE', 10)
+    decayed, week = score_posts(now)
+    categories = dict(
+        Post.objects.filter(pk__in=decayed, status='published').values_list('pk', 'category_id')
+    )
+    by_category = defaultdict(list)
+    for post_id, category_id in categories.items():
+        if category_id:
+            by_category[category_id].append(post_id)
+
+    entries = []
+    for kind, scores in (('trending', decayed), ('week', week)):
+        entries += _ranked(kind, None, scores, categories, size)
+        for category_id, post_ids in by_category.items():
+            entries += _ranked(kind, category_id, scores, post_ids, size)
+
+    with transaction.atomic():
+        TrendingPost.objects.all().delete()
+        TrendingPost.objects.bulk_create(entries, batch_size=1000)
+        PostActivity.objects.filter(
+            bucket__lt=current_bucket(now) - timedelta(days=trending_setting('WINDOW_DAYS', 7))
+        ).delete()
+    return len(entries)
+
+
+def trending_posts(kind='trending', category=None, limit=5):
+    """
+    The stored ``kind`` list, site-wide or for ``category``, best first and
+    topped up with the most viewed posts. Only queried when first used.
+    """
+    return SimpleLazyObject(lambda: _trending_list(kind, category, limit))
+
+
+def _trending_list(kind, category, limit):
+    posts = Post.objects.filter(status='published').select_related('author', 'category')
+    ranked = list(
+        posts.filter(trending_entries__kind=kind, trending_entries__category=category)
+        .order_by('trending_entries__rank')[:limit]
+    )
+    if len(ranked) < limit:
+        most_viewed = posts.exclude(pk__in=[post.pk for post in ranked])
+        if category is not None:
+            most_viewed = most_viewed.filter(category=category)
+        ranked += most_viewed.order_by('-views', '-id')[:limit - len(ranked)]
+    return ranked
@@ -11,13 +11,17 @@ urlpatterns = [
     path('post/create/', views.PostCreateView.as_view(), name='post_create'),
     path('post/<slug:slug>/', views.PostDetailView.as_view(), name='post_detail'),
     path('category/<slug:slug>/', views.CategoryPostsView.as_view(), name='category_posts'),
+    path('tag/<slug:slug>/', views.TagPostsView.as_view(), name='tag_posts'),
     path('search/', views.SearchView.as_view(), name='search'),
+    path('feed/', views.FeedView.as_view(), name='feed'),
 
     path('about/', views.about_view, name='about'),
     path('contact/', views.contact_view, name='contact'),
 
     path('subscribe/', views.subscribe_newsletter, name='subscribe_newsletter'),
     path('like/', views.like_post, name='like_post'),
+    path('like/async/', views.like_post_async, name='like_post_async'),
     path('post/<slug:slug>/comment/', views.add_comment, name='add_comment'),
+    path('cache-stats/', views.cache_stats_view, name='cache_stats'),
 
 ]
\ No newline at end of file
@@ -1,18 +1,33 @@
-from django.shortcuts import render, get_object_or_404, redirect
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, get_object_or_404, redirect, aget_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.views.generic import ListView, DetailView, CreateView, UpdateView
-from django.db.models import Q, Count, F
+from django.db.models import F, Case, When
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from django.core.paginator import Paginator
-from django.utils import timezone
-from .models import Post, Category, Comment, Like, Newsletter
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject, cached_property
+from core.caches import is_shared
+from core.routers import ReplicaReadMixin
+from .models import Post, Category, Comment, Like, Newsletter, Tag
 from .forms import PostForm, CommentForm, NewsletterForm
-from django.db.models import Count, Sum
+from .comments import load_comment_thread
+from .counters import adjust_like_count
+from .feed import FeedPaginator
+from .pagination import CursorPaginationMixin
+from .related import related_posts
+from .search import get_search_backend
+from .stats import get_site_stats
+from .tags import tag_filter
+from .templatetags.fragment_cache import get_fragment_stats
+from .trending import record_activity, trending_posts
+from .write_queue import ToggleQueue, count_by_target
 
-class HomeView(ListView):
+class HomeView(ReplicaReadMixin, ListView):
     model = Post
     template_name = 'myapp/../home.html'
     context_object_name = 'posts'
@@ -29,28 +44,20 @@ class HomeView(ListView):
             is_featured=True
         ).select_related('author', 'category')[:3]
 
-        context['popular_posts'] = Post.objects.filter(
-            status='published'
-        ).order_by('-views')[:5]
+        context['popular_posts'] = trending_posts()
+        context['trending_week'] = trending_posts('week')
 
         context['recent_posts'] = Post.objects.filter(
             status='published'
         ).order_by('-published_at')[:5]
 
-        context['categories'] = Category.objects.annotate(
-            post_count=Count('post', filter=Q(post__status='published'))
-        ).filter(post_count__gt=0)
+        context['categories'] = Category.objects.filter(post_count__gt=0)
         
-        context['total_posts'] = Post.objects.filter(status='published').count()
-        context['total_categories'] = Category.objects.count()
-        context['total_views'] = Post.objects.filter(status='published').aggregate(
-            total=Sum('views')
-        )['total'] or 0
-        context['total_subscribers'] = Newsletter.objects.filter(is_active=True).count()
+        context.update(get_site_stats())
         
         return context
 
-class PostDetailView(DetailView):
+class PostDetailView(ReplicaReadMixin, DetailView):
     model = Post
     template_name = 'myapp/post_detail.html'
     context_object_name = 'post'
@@ -66,19 +73,13 @@ class PostDetailView(DetailView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        post = self.get_object()
+        post = self.object
 
-        context['comments'] = post.comments.filter(
-            parent=None, 
-            is_approved=True
-        ).select_related('author').prefetch_related('replies')
+        context['comments'] = load_comment_thread(post)
         
         context['comment_form'] = CommentForm(user=self.request.user)
 
-        context['related_posts'] = Post.objects.filter(
-            category=post.category,
-            status='published'
-        ).exclude(id=post.id)[:4]
+        context['related_posts'] = related_posts(post)
 
         if self.request.user.is_authenticated:
             context['user_liked'] = Like.objects.filter(
@@ -86,7 +87,7 @@ class PostDetailView(DetailView):
                 post=post
             ).exists()
 
-        context['likes_count'] = post.likes.count()
+        context['likes_count'] = post.like_count
         
         return context
 
@@ -112,11 +113,12 @@ class PostUpdateView(LoginRequiredMixin, UpdateView):
         messages.success(self.request, 'Post updated successfully!')
         return super().form_valid(form)
 
-class CategoryPostsView(ListView):
+class CategoryPostsView(ReplicaReadMixin, CursorPaginationMixin, ListView):
     model = Post
     template_name = 'myapp/category_posts.html'
     context_object_name = 'posts'
     paginate_by = 9
+    cursor_ordering = '-created_at'
     
     def get_queryset(self):
         self.category = get_object_or_404(Category, slug=self.kwargs['slug'])
@@ -128,59 +130,112 @@ class CategoryPostsView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['category'] = self.category
+        context['trending_posts'] = trending_posts(category=self.category)
+        context['post_total'] = self.category.post_count
         return context
     
-class AllPostsView(ListView):
+class TagPostsView(ReplicaReadMixin, CursorPaginationMixin, ListView):
+    model = Post
+    template_name = 'myapp/tag_posts.html'
+    context_object_name = 'posts'
+    paginate_by = 9
+    cursor_ordering = '-created_at'
+    
+    def get_queryset(self):
+        self.tag = get_object_or_404(Tag, slug=self.kwargs['slug'])
+        return Post.objects.filter(
+            post_tags__tag=self.tag,
+            status='published'
+        ).select_related('author')
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['tag'] = self.tag
+        context['category'] = self.tag
+        context['post_total'] = self.tag.post_count
+        return context
+    
+class FeedView(LoginRequiredMixin, ReplicaReadMixin, CursorPaginationMixin, ListView):
+    """Newest posts by the authors the user follows (see myapp.feed)"""
+    template_name = 'myapp/feed.html'
+    context_object_name = 'posts'
+    paginate_by = 9
+
+    def get_queryset(self):
+        # Pages come from FeedPaginator, not a queryset.
+        return Post.objects.none()
+
+    def paginate_queryset(self, queryset, page_size):
+        return self.paginate_by_cursor(FeedPaginator(self.request.user, page_size))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['category'] = {
+            'name': 'Your Feed',
+            'icon': 'rss',
+            'description': 'New posts from the authors you follow.',
+        }
+        context['following_count'] = self.request.user.following.count()
+        return context
+
+class AllPostsView(ReplicaReadMixin, CursorPaginationMixin, ListView):
     model = Post
     template_name = 'myapp/all_posts.html'
     context_object_name = 'posts'
     paginate_by = 12
     
+    SORT_ORDERINGS = {
+        'latest': '-published_at',
+        'oldest': 'published_at',
+        'popular': '-comment_count',
+        'views': '-views',
+        'title': 'title',
+    }
+    
     def get_queryset(self):
         queryset = Post.objects.filter(status='published').select_related('author', 'category')
         category = self.request.GET.get('category')
         if category:
             queryset = queryset.filter(category__slug=category)
+        tag = self.request.GET.get('tag')
+        if tag:
+            queryset = queryset.filter(tag_filter(tag))
 
-        sort = self.request.GET.get('sort', 'latest')
-        if sort == 'latest':
-            queryset = queryset.order_by('-published_at')
-        elif sort == 'oldest':
-            queryset = queryset.order_by('published_at')
-        elif sort == 'popular':
-            queryset = queryset.annotate(
-                comment_count=Count('comments')
-            ).order_by('-comment_count')
-        elif sort == 'views':
-            queryset = queryset.order_by('-views')
-        elif sort == 'title':
-            queryset = queryset.order_by('title')
+        ordering = self.get_cursor_ordering()
+        if ordering:
+            queryset = queryset.order_by(ordering, '-pk' if ordering.startswith('-') else 'pk')
         
         return queryset
     
+    def get_cursor_ordering(self):
+        return self.SORT_ORDERINGS.get(self.request.GET.get('sort', 'latest'))
+
+    def get_paginate_by(self, queryset):
+        # Paginated on demand, see get_context_data()
+        return None
+
+    @cached_property
+    def pagination(self):
+        return self.paginate_queryset(self.object_list, self.paginate_by)
+
     def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
+        # The grid is the cached all_posts_grid fragment: the page is only
+        # read when the fragment is rendered, so a hit runs no list query.
+        paginator, page, posts, is_paginated = (
+            SimpleLazyObject(lambda index=index: self.pagination[index]) for index in range(4)
+        )
+        context = super().get_context_data(
+            paginator=paginator, page_obj=page, is_paginated=is_paginated, **kwargs
+        )
+        context['object_list'] = context[self.context_object_name] = posts
 
-        context['categories'] = Category.objects.annotate(
-            post_count=Count('post', filter=Q(post__status='published'))
-        ).filter(post_count__gt=0).order_by('name')
+        context['categories'] = Category.objects.filter(post_count__gt=0).order_by('name')
         
-        context['total_posts'] = Post.objects.filter(status='published').count()
-        context['total_views'] = Post.objects.filter(status='published').aggregate(
-            total=Sum('views')
-        )['total'] or 0
-        context['total_categories'] = Category.objects.count()
- 
-        now = timezone.now()
-        start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        context['this_month_posts'] = Post.objects.filter(
-            status='published',
-            published_at__gte=start_of_month
-        ).count()
+        context.update(get_site_stats())
         
         return context
 
-class SearchView(ListView):
+class SearchView(ReplicaReadMixin, ListView):
     model = Post
     template_name = 'myapp/search_results.html'
     context_object_name = 'posts'
@@ -188,18 +243,35 @@ class SearchView(ListView):
     
     def get_queryset(self):
         query = self.request.GET.get('q')
-        if query:
-            return Post.objects.filter(
-                Q(title__icontains=query) | 
-                Q(content__icontains=query) |
-                Q(tags__icontains=query),
-                status='published'
-            ).distinct().select_related('author', 'category')
-        return Post.objects.none()
+        self.hits = {}
+        if not query:
+            return Post.objects.none()
+
+        hits = get_search_backend().search(query, limit=settings.SEARCH_RESULT_LIMIT)
+        self.hits = {hit.post_id: hit for hit in hits}
+        queryset = Post.objects.filter(
+            pk__in=self.hits.keys(),
+            status='published'
+        ).select_related('author', 'category').prefetch_related('tag_set')
+
+        sort = self.request.GET.get('sort', 'relevance')
+        if sort == 'date':
+            return queryset.order_by('-published_at')
+        elif sort == 'views':
+            return queryset.order_by('-views')
+        if not hits:
+            return queryset
+        return queryset.order_by(Case(
+            *[When(pk=hit.post_id, then=position) for position, hit in enumerate(hits)]
+        ))
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['query'] = self.request.GET.get('q', '')
+        context['result_count'] = len(self.hits)
+        context['popular_posts'] = trending_posts(limit=3)
+        for post in context['posts']:
+            post.search_snippet = self.hits[post.pk].snippet
         return context
 
 @require_POST
@@ -269,18 +341,64 @@ def like_post(request):
         else:
             liked = True
     else:
-        liked_posts = request.session.get('liked_posts', [])
-        if post_id in liked_posts:
-            liked_posts.remove(post_id)
-            liked = False
-        else:
-            liked_posts.append(post_id)
-            liked = True
-        request.session['liked_posts'] = liked_posts
+        liked = _toggle_session_like(request, post_id)
 
+    post.refresh_from_db(fields=['like_count'])
     return JsonResponse({
         'liked': liked,
-        'likes_count': post.likes.count() + len(request.session.get('liked_posts', []))
+        'likes_count': post.like_count + len(request.session.get('liked_posts', []))
+    })
+
+def _toggle_session_like(request, post_id):
+    liked_posts = request.session.get('liked_posts', [])
+    if post_id in liked_posts:
+        liked_posts.remove(post_id)
+        liked = False
+    else:
+        liked_posts.append(post_id)
+        liked = True
+    request.session['liked_posts'] = liked_posts
+    return liked
+
+def _likes_flushed(created, deleted):
+    # The queue writes without Like's signals, so both sides are counted here.
+    likes = count_by_target(created)
+    changes = likes.copy()
+    changes.subtract(count_by_target(deleted))
+    for post_id, n in changes.items():
+        if n:
+            adjust_like_count(post_id, n)
+    record_activity(likes, 'likes')
+
+like_queue = ToggleQueue(
+    Like, 'user', 'post',
+    on_flush=_likes_flushed,
+    interval=settings.WRITE_QUEUE_INTERVAL,
+    threshold=settings.WRITE_QUEUE_THRESHOLD,
+)
+
+@require_POST
+async def like_post_async(request):
+    """Async like_post: toggles go through like_queue instead of the database"""
+    post_id = request.POST.get('post_id')
+    post = await aget_object_or_404(Post, id=post_id, status='published')
+    user = await request.auser()
+
+    if user.is_authenticated:
+        exists = like_queue.state(user.pk, post.pk)
+        if exists is None:
+            exists = await Like.objects.filter(user=user, post=post).aexists()
+        liked = like_queue.toggle(user.pk, post.pk, exists)
+        session_likes = 0
+    else:
+        liked = await sync_to_async(_toggle_session_like)(request, post_id)
+        session_likes = len(await sync_to_async(request.session.get)('liked_posts', []))
+
+    return JsonResponse({
+        'liked': liked,
+        'likes_count': post.like_count + like_queue.pending_delta(post.pk) + session_likes,
+        # Written by the queue's next flush
+        'queued': user.is_authenticated,
     })
 
 
@@ -304,18 +422,7 @@ def custom_404_view(request, exception=None):
     return render(request, '404.html', status=404)
 
 def about_view(request):
-    context = {
-        'total_posts': Post.objects.filter(status='published').count(),
-        'total_categories': Category.objects.count(),
-        'total_views': Post.objects.filter(status='published').aggregate(
-            total=Sum('views')
-        )['total'] or 0,
-        'total_subscribers': Newsletter.objects.filter(is_active=True).count(),
-        'this_month_posts': Post.objects.filter(
-            status='published',
-            published_at__gte=timezone.now().replace(day=1)
-        ).count(),
-    }
+    context = get_site_stats()
     return render(request, 'myapp/about.html', context)
 
 def contact_view(request):
@@ -331,4 +438,12 @@ def contact_view(request):
         else:
             messages.error(request, 'Please fill in all required fields.')
     
-    return render(request, 'myapp/contact.html')
\ No newline at end of file
+    return render(request, 'myapp/contact.html')
+
+@staff_member_required
+def cache_stats_view(request):
+    """Fragment cache metrics; with a per-process cache, only this process's"""
+    return JsonResponse({
+        'fragments': get_fragment_stats(),
+        'shared': is_shared(settings.CACHES['default']),
+    })
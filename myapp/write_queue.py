@@ -0,0 +1,190 @@
+"""
+Coalescing write queue for toggle relations (likes, follows).
+
+A toggle only updates pending state in memory and returns the new state
+straight away, before it is written: the endpoints answer with
+``queued: true``. A background thread flushes the queue every
+``interval`` seconds, or as soon as ``threshold`` toggles are pending,
+writing all the new rows with one bulk INSERT and all the removed ones
+with one DELETE per chunk. Toggling the same pair twice inside a window
+cancels out without touching the database.
+
+Only rows the flush actually inserted or deleted are passed to
+``on_flush``, so counters stay exact when another process toggles the
+same pair: a chunk whose INSERT conflicts is retried row by row, and
+rows to delete are locked and deleted by pk. Deletes skip the model's
+signals; ``on_flush`` applies both sides, one update per target.
+
+Pending state lives in each worker process. Until a flush (at most
+``interval`` seconds), another worker answers from the database, so
+two requests for the same pair served by different workers can
+disagree.
+"""
+import atexit
+import logging
+import threading
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, close_old_connections, router, transaction
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+
+class ToggleQueue:
+
+    chunk_size = 500
+
+    def __init__(self, model, source_field, target_field, on_flush=None, interval=0.25, threshold=500):
+        self.model = model
+        self.source_field = source_field
+        self.target_field = target_field
+        self.on_flush = on_flush
+        self.interval = interval
+        self.threshold = threshold
+        # (source_id, target_id) -> [state in the database, wanted state]
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def state(self, source_id, target_id):
+        """The pending state of a pair, or None if nothing is queued for it"""
+        entry = self._pending.get((source_id, target_id))
+        return entry[1] if entry else None
+
+    def toggle(self, source_id, target_id, exists):
+        """
+        Flip the pair and return its new state. ``exists`` is whether the
+        row is in the database, only used when nothing is pending for it.
+        """
+        with self._lock:
+            entry = self._pending.setdefault((source_id, target_id), [exists, exists])
+            entry[1] = not entry[1]
+            wanted = entry[1]
+            size = len(self._pending)
+        self._ensure_worker()
+        if size >= self.threshold:
+            self._wakeup.set()
+        return wanted
+
+    def pending_delta(self, target_id):
+        """Net number of rows the queue will add to (or remove from) ``target_id``"""
+        with self._lock:
+            return sum(
+                int(wanted) - int(stored)
+                for (_, target), (stored, wanted) in self._pending.items()
+                if target == target_id
+            )
+
+    def _ensure_worker(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name=f'{self.model.__name__}-write-queue', daemon=True
+                    )
+                    self._thread.start()
+                    atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Flushing the %s write queue failed', self.model.__name__)
+            finally:
+                close_old_connections()
+
+    def _pairs_filter(self, pairs):
+        return reduce(or_, (
+            Q(**{f'{self.source_field}_id': source, f'{self.target_field}_id': target})
+            for source, target in pairs
+        ))
+
+    def _row(self, pair):
+        source, target = pair
+        return self.model(**{f'{self.source_field}_id': source, f'{self.target_field}_id': target})
+
+    def _live(self, pairs):
+        """The pairs whose two rows still exist (foreign keys are only checked on commit)"""
+        live = {}
+        for position, field in enumerate((self.source_field, self.target_field)):
+            model = self.model._meta.get_field(field).related_model
+            ids = {pair[position] for pair in pairs}
+            live[position] = set(model._default_manager.filter(pk__in=ids).values_list('pk', flat=True))
+        return [pair for pair in pairs if pair[0] in live[0] and pair[1] in live[1]]
+
+    def _insert(self, pairs):
+        """Insert the pairs' rows, returns the pairs that were inserted"""
+        try:
+            with transaction.atomic():
+                self.model.objects.bulk_create([self._row(pair) for pair in pairs])
+            return pairs
+        except IntegrityError:
+            pass
+        # Some were written meanwhile by someone else
+        inserted = []
+        for pair in pairs:
+            try:
+                with transaction.atomic():
+                    self._row(pair).save(force_insert=True)
+            except IntegrityError:
+                continue
+            inserted.append(pair)
+        return inserted
+
+    def _delete(self, pairs):
+        """Delete the pairs' rows without signals, returns the pairs that were deleted"""
+        source, target = f'{self.source_field}_id', f'{self.target_field}_id'
+        rows = (
+            self.model.objects.select_for_update()
+            .filter(self._pairs_filter(pairs)).values_list('pk', source, target)
+        )
+        found = {pk: (source_id, target_id) for pk, source_id, target_id in rows}
+        if found:
+            self.model.objects.filter(pk__in=found)._raw_delete(router.db_for_write(self.model))
+        return list(found.values())
+
+    def flush(self):
+        """Apply pending toggles, returns the (created, deleted) pairs"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        creates = [pair for pair, (stored, wanted) in pending.items() if wanted and not stored]
+        deletes = [pair for pair, (stored, wanted) in pending.items() if stored and not wanted]
+        if not creates and not deletes:
+            return [], []
+
+        try:
+            with transaction.atomic():
+                created, deleted = [], []
+                for start in range(0, len(creates), self.chunk_size):
+                    chunk = creates[start:start + self.chunk_size]
+                    existing = set(
+                        self.model.objects.filter(self._pairs_filter(chunk)).values_list(
+                            f'{self.source_field}_id', f'{self.target_field}_id'
+                        )
+                    )
+                    chunk = [pair for pair in chunk if pair not in existing]
+                    chunk = self._live(chunk)
+                    if chunk:
+                        created.extend(self._insert(chunk))
+                for start in range(0, len(deletes), self.chunk_size):
+                    deleted.extend(self._delete(deletes[start:start + self.chunk_size]))
+                if self.on_flush:
+                    self.on_flush(created, deleted)
+        except Exception:
+            # Put the toggles back unless newer ones replaced them meanwhile.
+            with self._lock:
+                for pair, entry in pending.items():
+                    self._pending.setdefault(pair, entry)
+            raise
+        return created, deleted
+
+
+def count_by_target(pairs):
+    return Counter(target for _, target in pairs)